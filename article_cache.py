@@ -0,0 +1,182 @@
+import os
+import time
+import sqlite3
+import threading
+import urllib.parse
+from contextlib import contextmanager
+import http_client
+import telemetry
+
+# 기사 본문 캐시 (정규화된 URL 기준, TTL + 용량 기반 LRU 삭제)
+DEFAULT_PATH = os.environ.get(
+    "ARTICLE_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "articles.db"),
+)
+TTL_SECONDS = float(os.environ.get("ARTICLE_CACHE_TTL_HOURS", "72")) * 3600
+FAIL_TTL_SECONDS = 6 * 3600   # 추출 실패도 잠시 기억해 매 브리핑마다 재시도하지 않음
+MAX_BYTES = int(float(os.environ.get("ARTICLE_CACHE_MAX_MB", "64")) * 1024 * 1024)
+TRACKING_PREFIXES = ("utm_",)
+TRACKING_KEYS = {"fbclid", "gclid", "ocid", "cmpid", "ref"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    text TEXT,
+    extractor TEXT,
+    fetched_at REAL,
+    last_access REAL,
+    size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_articles_access ON articles (last_access);
+CREATE TABLE IF NOT EXISTS aliases (
+    url TEXT PRIMARY KEY,
+    canonical TEXT
+);
+"""
+
+def canonical_url(url):
+    """스킴/호스트 소문자화, fragment 및 추적 파라미터 제거, 쿼리 정렬"""
+    parts = urllib.parse.urlsplit(url.strip())
+    query = [
+        (k, v) for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PREFIXES) and k.lower() not in TRACKING_KEYS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), path, urllib.parse.urlencode(sorted(query)), ""
+    ))
+
+def resolve_url(url):
+    """
+    리다이렉트 링크 -> 실제 기사 URL
+    - 빙 apiclick 링크는 url 파라미터에서 바로 추출 (네트워크 없음)
+    - 구글 뉴스 링크는 HEAD 요청으로 최종 주소 확인
+    """
+    parts = urllib.parse.urlsplit(url)
+    if "bing.com" in parts.netloc and "apiclick" in parts.path:
+        target = urllib.parse.parse_qs(parts.query).get("url")
+        if target: return target[0]
+    if "news.google.com" in parts.netloc:
+        try:
+            return http_client.head(url, timeout=3, retries=1).url
+        except: pass
+    return url
+
+class ArticleCache:
+    def __init__(self, path=DEFAULT_PATH, ttl=TTL_SECONDS, fail_ttl=FAIL_TTL_SECONDS, max_bytes=MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.fail_ttl = fail_ttl
+        self.max_bytes = max_bytes
+        self.counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def get(self, url):
+        """캐시 조회: (본문, 추출기) 또는 None (별칭 URL도 따라감)"""
+        key = canonical_url(url)
+        now = time.time()
+        with self._connect() as conn:
+            alias = conn.execute("SELECT canonical FROM aliases WHERE url = ?", (key,)).fetchone()
+            if alias: key = alias[0]
+            row = conn.execute("SELECT text, extractor, fetched_at FROM articles WHERE url = ?", (key,)).fetchone()
+            if not row: return None
+            text, extractor, fetched_at = row
+            ttl = self.ttl if text else self.fail_ttl
+            if now - fetched_at > ttl:
+                conn.execute("DELETE FROM articles WHERE url = ?", (key,))
+                self._count("expired")
+                return None
+            conn.execute("UPDATE articles SET last_access = ? WHERE url = ?", (now, key))
+        return text, extractor
+
+    def put(self, url, text, extractor, aliases=()):
+        key = canonical_url(url)
+        now = time.time()
+        size = len(text.encode("utf-8")) if text else 0
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                         (key, text, extractor, now, now, size))
+            conn.executemany("INSERT OR REPLACE INTO aliases VALUES (?, ?)",
+                             [(canonical_url(a), key) for a in aliases if canonical_url(a) != key])
+            self._evict(conn)
+
+    def add_alias(self, url, target):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (canonical_url(url), canonical_url(target)))
+
+    def _evict(self, conn):
+        """용량 초과 시 가장 오래 안 쓴 기사부터 삭제"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+        if total <= self.max_bytes: return
+        excess, victims = total - self.max_bytes, []
+        for url, size in conn.execute("SELECT url, size FROM articles ORDER BY last_access"):
+            if excess <= 0: break
+            victims.append((url,))
+            excess -= size
+        conn.executemany("DELETE FROM articles WHERE url = ?", victims)
+        conn.execute("DELETE FROM aliases WHERE canonical NOT IN (SELECT url FROM articles)")
+        self._count("evictions", len(victims))
+
+    def get_or_extract(self, url, extract, resolve=resolve_url):
+        """
+        캐시 우선 본문 조회, 없으면 실제 URL로 추출 후 저장
+        extract(url) -> (본문 또는 None, 추출기 이름)
+        """
+        hit = self.get(url)
+        if hit is None and resolve is not None:
+            target = resolve(url)
+            if canonical_url(target) != canonical_url(url):
+                hit = self.get(target)
+                if hit is not None:
+                    self.add_alias(url, target)
+        else:
+            target = url
+        telemetry.annotate(cache_hit=hit is not None)
+        if hit is not None:
+            self._count("hits")
+            return hit
+
+        self._count("misses")
+        text, extractor = extract(target)
+        if not text:
+            telemetry.annotate(ok=False)
+        self.put(target, text, extractor, aliases=[url])
+        return text, extractor
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM articles").fetchone()
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["hits"] + counters["misses"]
+        counters.update(entries=entries, bytes=size, hit_rate=counters["hits"] / lookups if lookups else 0.0)
+        return counters
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """공용 캐시 (asyncio.to_thread 스레드에서 처음 동시에 불려도 1개만 생성)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ArticleCache()
+    return _cache
@@ -0,0 +1,151 @@
+"""
+종합 점수 구간별 백테스트 (점수 시계열 + 미래 수익률을 날짜 x 종목 행렬로 한 번에 계산)
+
+  python backtest.py                          # 관심 종목 10년, 20영업일 보유
+  python backtest.py --horizon 5 --step 5     # 5일 보유, 5일마다 재편입
+  python backtest.py --tickers 005930.KS 000660.KS --period 5y
+  python backtest.py --synthetic 2500         # 합성 데이터 2500종목 x 10년 (속도 확인용)
+"""
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+import quant_analyzer as qa
+
+# 점수 구간 (get_brief_icon 기준: ≤30 경고 / 50 미만 약세 / 50 이상 강세 / 70 이상 우수)
+BUCKETS = ("0-30", "31-49", "50-69", "70-100")
+HORIZON = 20        # 보유 기간 (영업일)
+MIN_BARS = 120      # 모든 지표가 계산되는 최소 봉 수 (이평선 120일)
+CHUNK_SIZE = 500    # 한 번에 계산할 종목 수 (메모리 상한)
+
+def score_bucket(scores):
+    """점수 행렬 -> 구간 번호 (0~3, 점수 없으면 -1)"""
+    return np.select(
+        [np.isnan(scores), scores <= 30, scores < 50, scores < 70],
+        [-1, 0, 1, 2], default=3,
+    ).astype(np.int8)
+
+def _chunk_panels(data, horizon):
+    """종목 묶음 하나의 (점수, 미래 수익률, 봉 수) 날짜 x 종목 행렬"""
+    panel = qa._to_panel_fields(data)
+    if not panel or 'Close' not in panel:
+        return None
+    dates, columns = panel['Close'].index, panel['Close'].columns
+    scores = qa._score_fields(panel)
+    p, _, order = qa._align_panel(panel)
+    close = p['Close']
+    # 종목별 봉 기준으로 horizon봉 뒤 종가 (휴장일/상장 전 구간과 무관)
+    forward = (close.shift(-horizon) / close - 1).to_numpy(dtype=float)
+    bars = panel['Close'].notna().cumsum()
+    return (
+        scores.astype(np.float32),
+        pd.DataFrame(qa._unalign(forward, order), index=dates, columns=columns).astype(np.float32),
+        bars.astype(np.int32),
+    )
+
+def build_panels(data, horizon=HORIZON, chunk_size=CHUNK_SIZE):
+    """
+    {티커: OHLCV} -> (점수, 미래 수익률, 봉 수) 날짜 x 종목 행렬
+    종목 묶음 단위로 계산 후 날짜 합집합으로 이어붙임 (float32로 보관)
+    """
+    tickers = [t for t, df in data.items() if df is not None and len(df) > 0]
+    parts = []
+    for i in range(0, len(tickers), chunk_size):
+        part = _chunk_panels({t: data[t] for t in tickers[i:i + chunk_size]}, horizon)
+        if part is not None:
+            parts.append(part)
+    if not parts:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    return tuple(pd.concat([part[k] for part in parts], axis=1).sort_index() for k in range(3))
+
+def bucket_stats(scores, forward, bars, step=HORIZON, min_bars=MIN_BARS):
+    """
+    step영업일마다 점수 구간별 동일가중 포트폴리오를 구성해 다음 구간 수익률 평가
+    반환: 구간별 {관측 수, 평균 종목 수, 적중률, 평균 수익률, 초과 수익률, 회전율}
+    """
+    rows = np.arange(0, len(scores), step)
+    s = scores.to_numpy(dtype=float)[rows]
+    f = forward.to_numpy(dtype=float)[rows]
+    eligible = (bars.fillna(0).to_numpy()[rows] >= min_bars) & ~np.isnan(s)
+    bucket = np.where(eligible, score_bucket(s), -1)
+    evaluable = eligible & ~np.isnan(f)
+
+    # 같은 날짜 평가 가능 종목 전체 평균 대비 초과 수익률
+    with np.errstate(invalid='ignore', divide='ignore'):
+        market = np.nansum(np.where(evaluable, f, 0), axis=1) / evaluable.sum(axis=1)
+    excess = f - market[:, None]
+
+    def summarize(members):
+        observed = members & evaluable
+        count = observed.sum()
+        names = members.sum(axis=1)
+        # 회전율: 동일가중 비중 변화의 절반 합 (직전/현재 모두 보유 종목이 있는 재편입만)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weights = members / names[:, None]
+        both = (names[1:] > 0) & (names[:-1] > 0)
+        turnover = 0.5 * np.abs(weights[1:] - weights[:-1]).sum(axis=1)
+        return {
+            "observations": int(count),
+            "avg_names": float(names[names > 0].mean()) if (names > 0).any() else 0.0,
+            "hit_rate": float((f[observed] > 0).mean()) if count else np.nan,
+            "avg_return": float(f[observed].mean()) if count else np.nan,
+            "excess_return": float(excess[observed].mean()) if count else np.nan,
+            "turnover": float(turnover[both].mean()) if both.any() else np.nan,
+        }
+
+    result = {label: summarize(bucket == i) for i, label in enumerate(BUCKETS)}
+    result["전체"] = summarize(eligible)
+    return pd.DataFrame(result).T
+
+def run_backtest(data, horizon=HORIZON, step=None, min_bars=MIN_BARS, chunk_size=CHUNK_SIZE):
+    """{티커: OHLCV} -> 점수 구간별 성과표 (step 생략 시 보유 기간마다 재편입 = 겹치지 않는 구간)"""
+    scores, forward, bars = build_panels(data, horizon, chunk_size)
+    if scores.empty:
+        return pd.DataFrame()
+    return bucket_stats(scores, forward, bars, step or horizon, min_bars)
+
+def print_report(stats, horizon):
+    print(f"\n{'구간':<8}{'관측':>9}{'평균종목':>9}{'적중률':>9}{f'{horizon}일수익':>10}{'초과':>9}{'회전율':>9}")
+    for label, row in stats.iterrows():
+        print(f"{label:<8}{int(row['observations']):>9}{row['avg_names']:>9.1f}{row['hit_rate']:>9.1%}"
+              f"{row['avg_return']:>10.2%}{row['excess_return']:>+9.2%}{row['turnover']:>9.1%}")
+
+def load_universe(tickers=None, period="10y"):
+    from utils import get_active_targets
+    from price_store import load_histories
+    if not tickers:
+        tickers = list(dict.fromkeys(t['ticker'] for t in get_active_targets() if t.get('ticker')))
+    frames, failures = load_histories(tickers, period=period, max_age=12 * 3600)
+    for ticker, reason in failures.items():
+        print(f"⚠️ 주가 수집 실패 ({ticker}): {reason}")
+    return frames
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="종합 점수 구간별 백테스트")
+    parser.add_argument("--tickers", nargs="*", help="생략 시 활성 관심 종목")
+    parser.add_argument("--period", default="10y")
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--step", type=int, help="재편입 간격 (기본: 보유 기간)")
+    parser.add_argument("--min-bars", type=int, default=MIN_BARS)
+    parser.add_argument("--synthetic", type=int, help="합성 데이터 종목 수 (10년)")
+    args = parser.parse_args(argv)
+
+    from utils import fix_encoding
+    fix_encoding()
+    start = time.perf_counter()
+    if args.synthetic:
+        from benchmark import make_universe
+        data = make_universe(args.synthetic, 252 * 10)
+    else:
+        data = load_universe(args.tickers, args.period)
+    loaded = time.perf_counter()
+    print(f"📦 {len(data)}개 종목 준비 ({loaded - start:.1f}s)")
+    if not data:
+        return
+    stats = run_backtest(data, args.horizon, args.step, args.min_bars)
+    print_report(stats, args.horizon)
+    print(f"\n⏱️ 계산 {time.perf_counter() - loaded:.1f}s")
+
+if __name__ == "__main__":
+    main()
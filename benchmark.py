@@ -0,0 +1,239 @@
+"""
+성능 벤치마크 (합성 OHLCV 데이터, 네트워크/LLM/텔레그램은 대체 함수 사용)
+
+  python benchmark.py                    # 전체 실행 + data/benchmarks.jsonl에 기록 + 이전 커밋과 비교
+  python benchmark.py --quick            # 짧은 구간/작은 종목 수만
+  python benchmark.py --only indicators  # 그룹 선택: indicators, universe(패널/점수 시계열), parsers, pipeline
+  python benchmark.py --html page.html   # 저장한 네이버 시세 페이지로 파서 측정
+  python benchmark.py --backend pandas   # 지표 계산 백엔드 지정 (기본: QUANT_BACKEND 또는 pandas)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import tempfile
+import urllib.parse
+import numpy as np
+import pandas as pd
+
+RESULTS_PATH = os.environ.get(
+    "BENCHMARK_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmarks.jsonl"),
+)
+LENGTHS = {"1y": 252, "5y": 252 * 5, "20y": 252 * 20}
+UNIVERSES = (10, 500, 2500)
+REGRESSION_THRESHOLD = 0.10   # 중앙값 기준 10% 이상 느려지면 경고
+
+# --- 합성 데이터 ---
+def make_ohlcv(n_days, seed=0, start="2000-01-03"):
+    """기하 랜덤워크 종가 + 일중 변동폭으로 만든 OHLCV (영업일 인덱스)"""
+    rng = np.random.default_rng(seed)
+    close = 10000 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n_days)))
+    spread = np.abs(rng.normal(0, 0.015, n_days)) * close
+    open_ = close * (1 + rng.normal(0, 0.005, n_days))
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.lognormal(13, 0.6, n_days).round()
+    index = pd.bdate_range(start, periods=n_days)
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+def make_universe(n_tickers, n_days, seed=0):
+    """{티커: OHLCV} (상장 기간이 다른 종목이 섞이도록 일부는 길이를 줄임)"""
+    rng = np.random.default_rng(seed)
+    universe = {}
+    for i in range(n_tickers):
+        df = make_ohlcv(n_days, seed=seed + i + 1)
+        cut = int(rng.integers(0, n_days // 3)) if i % 5 == 0 else 0
+        universe[f"{i:06d}.KS"] = df.iloc[cut:]
+    return universe
+
+# --- 측정 ---
+def measure(func, repeat=5, warmup=1):
+    for _ in range(warmup):
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return {"min_ms": min(times), "median_ms": statistics.median(times), "mean_ms": statistics.fmean(times), "repeat": repeat}
+
+# --- 벤치마크 그룹 ---
+def bench_indicators(lengths):
+    import quant_analyzer as qa
+    cases = {
+        "calculate_rsi": lambda df: qa.calculate_rsi(df["Close"]),
+        "calculate_macd": lambda df: qa.calculate_macd(df["Close"]),
+        "calculate_bollinger_bands": lambda df: qa.calculate_bollinger_bands(df["Close"]),
+        "calculate_stochastic": lambda df: qa.calculate_stochastic(df),
+        "calculate_mfi": lambda df: qa.calculate_mfi(df),
+        "calculate_atr": lambda df: qa.calculate_atr(df),
+        "analyze_stock": lambda df: qa.analyze_stock(df),
+    }
+    for label in lengths:
+        df = make_ohlcv(LENGTHS[label])
+        for name, func in cases.items():
+            yield f"{name}[{label}]", {"rows": len(df)}, measure(lambda: func(df), repeat=20 if label != "20y" else 10)
+
+def bench_universe(sizes, length="1y"):
+    import quant_analyzer as qa
+    for n in sizes:
+        universe = make_universe(n, LENGTHS[length])
+        repeat = 3 if n <= 500 else 1
+        yield f"analyze_stock_loop[{n}x{length}]", {"tickers": n}, measure(
+            lambda: [qa.analyze_stock(df) for df in universe.values()], repeat=repeat, warmup=0)
+        yield f"analyze_panel[{n}x{length}]", {"tickers": n}, measure(
+            lambda: qa.analyze_panel(universe), repeat=repeat, warmup=0)
+        yield f"score_panel[{n}x{length}]", {"tickers": n}, measure(
+            lambda: qa.score_panel(universe), repeat=repeat, warmup=0)
+
+def bench_parsers(html_paths):
+    import listing_parser as lp
+    pages = {"synthetic_sise_upper": lp._sample_naver_page()}
+    for path in html_paths:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            pages[os.path.basename(path)] = f.read()
+    for label, html in pages.items():
+        yield f"parse_naver_listing[{label}]", {"bytes": len(html)}, measure(lambda: lp.parse_naver_listing(html), repeat=20)
+        try:
+            import bs4  # noqa: F401
+            yield f"bs4_listing[{label}]", {"bytes": len(html)}, measure(lambda: lp._bench_bs4(html), repeat=5)
+        except ImportError:
+            pass
+
+# 기사 제목/요약 조합용 단어 (항목마다 다른 제목 -> 유사 기사 묶기로 합쳐지지 않음)
+NEWS_SUBJECTS = ["외국인", "기관", "개인 투자자", "증권가", "신용평가사", "대주주", "노조", "해외 고객사", "정부", "경쟁사", "공정위", "연기금"]
+NEWS_EVENTS = ["분기 실적 발표", "신규 수주 공시", "목표주가 상향", "자사주 매입", "유상증자 결정", "배당 확대",
+               "신제품 출시", "해외 공장 증설", "임원 인사", "소송 리스크", "공급 계약 체결", "지분 매각"]
+NEWS_DETAILS = ["시장 예상 상회", "주가 급등", "거래량 폭증", "하락 마감", "보합권 등락", "52주 신고가",
+                "수급 개선 기대", "단기 조정 우려", "업황 회복 신호", "밸류에이션 부담"]
+
+def _sample_rss(keyword, n_items=10, seed=0):
+    rng = np.random.default_rng(seed)
+    subjects = rng.permutation(NEWS_SUBJECTS)
+    events = rng.permutation(NEWS_EVENTS)
+    items = "".join(
+        f"<item><title>{keyword} {events[i % len(events)]}, {subjects[i % len(subjects)]} 반응은 {rng.choice(NEWS_DETAILS)}</title>"
+        f"<link>https://news.example.com/{urllib.parse.quote(keyword)}/{i}</link>"
+        f"<description>&lt;p&gt;{subjects[(i + 3) % len(subjects)]} 관계자는 {events[(i + 5) % len(events)]} 이후 "
+        f"{rng.choice(NEWS_DETAILS)} 흐름을 언급했다&lt;/p&gt;</description></item>"
+        for i in range(n_items)
+    )
+    return f"<?xml version='1.0' encoding='UTF-8'?><rss><channel>{items}</channel></rss>"
+
+def bench_pipeline(n_keywords=10):
+    """
+    bot.process_keyword 전 구간 (RSS 파싱 -> 본문 캐시 -> 요약 -> 메시지 조립)
+    RSS 응답/본문 추출/Gemini/텔레그램은 고정 응답으로 대체
+    """
+    from types import SimpleNamespace
+    from unittest import mock
+    try:
+        import bot
+        import article_cache
+    except ImportError as e:
+        print(f"  skip pipeline ({e})")
+        return
+
+    keywords = [f"종목{i}" for i in range(n_keywords)]
+    ticker_map = {k: f"{i:06d}.KS" for i, k in enumerate(keywords)}
+    history_map = {ticker_map[k]: make_ohlcv(LENGTHS["1y"], seed=i) for i, k in enumerate(keywords)}
+    body = "기사 본문 " * 400
+
+    def fake_get(url, **kwargs):
+        keyword = next((k for k in keywords if urllib.parse.quote(k) in url), "종목")
+        return SimpleNamespace(status_code=200, text=_sample_rss(keyword, seed=keywords.index(keyword) if keyword in keywords else 0))
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            mock.patch.object(bot.http_client, "get", fake_get), \
+            mock.patch.object(bot, "extract_article", lambda url: (body, "Stub")), \
+            mock.patch.object(bot, "get_gemini_summary", lambda keyword, text: f"{keyword} 요약"), \
+            mock.patch.object(bot, "send_telegram", lambda text: True), \
+            mock.patch.object(article_cache, "_cache", article_cache.ArticleCache(os.path.join(tmp, "articles.db"))), \
+            mock.patch("builtins.print", lambda *a, **k: None):
+        result = measure(lambda: [bot.process_keyword(k, ticker_map, history_map) for k in keywords], repeat=5)
+    yield f"process_keyword[{n_keywords}kw]", {"keywords": n_keywords}, result
+
+# --- 결과 저장 / 비교 ---
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, timeout=30).stdout.strip())
+        return commit or None, dirty
+    except Exception:
+        return None, False
+
+def load_history(path=RESULTS_PATH):
+    if not os.path.exists(path): return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def save_results(records, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+def compare(records, history, threshold=REGRESSION_THRESHOLD):
+    """같은 벤치마크·백엔드의 직전 기록(다른 커밋) 대비 중앙값 변화, 임계값 이상 느려진 항목 반환"""
+    regressions = []
+    for r in records:
+        # 백엔드 기록이 없는 예전 결과는 pandas 백엔드
+        prev = next((h for h in reversed(history) if h["name"] == r["name"] and h.get("commit") != r.get("commit")
+                     and h.get("backend", "pandas") == r.get("backend", "pandas")), None)
+        if not prev: continue
+        change = r["median_ms"] / prev["median_ms"] - 1 if prev["median_ms"] else 0.0
+        flag = "⚠️" if change > threshold else "  "
+        print(f"{flag} {r['name']:<48} {prev['median_ms']:>10.2f} -> {r['median_ms']:>10.2f} ms ({change:+.1%}, vs {prev.get('commit')})")
+        if change > threshold: regressions.append(r["name"])
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BrianAI 성능 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="1y/5y, 10/500종목만")
+    parser.add_argument("--only", nargs="*", choices=["indicators", "universe", "parsers", "pipeline"])
+    parser.add_argument("--html", nargs="*", default=[], help="파서 측정용 저장 HTML")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--backend", choices=["numpy", "pandas"], help="지표 계산 백엔드")
+    args = parser.parse_args(argv)
+
+    import quant_analyzer as qa
+    if args.backend:
+        qa.set_backend(args.backend)
+
+    lengths = ("1y", "5y") if args.quick else tuple(LENGTHS)
+    sizes = UNIVERSES[:2] if args.quick else UNIVERSES
+    groups = {
+        "indicators": lambda: bench_indicators(lengths),
+        "universe": lambda: bench_universe(sizes),
+        "parsers": lambda: bench_parsers(args.html),
+        "pipeline": lambda: bench_pipeline(),
+    }
+    commit, dirty = git_revision()
+    stamp = datetime.datetime.now().isoformat(timespec="seconds")
+    records = []
+    print(f"backend: {qa.BACKEND}")
+    for group, run in groups.items():
+        if args.only and group not in args.only: continue
+        print(f"\n== {group} ==")
+        for name, params, result in run():
+            print(f"  {name:<48} median {result['median_ms']:>10.2f} ms (min {result['min_ms']:.2f})")
+            records.append({"ts": stamp, "commit": commit, "dirty": dirty, "python": platform.python_version(),
+                            "backend": qa.BACKEND, "group": group, "name": name, "params": params, **result})
+
+    print("\n== 이전 커밋 대비 ==")
+    regressions = compare(records, load_history())
+    if not args.no_save:
+        save_results(records)
+        print(f"\n💾 {len(records)}건 기록: {RESULTS_PATH}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,17 @@
 import os
-import requests
+import http_client
+import telemetry
+import news_dedup
+import prompt_compactor
 import urllib.parse
 from bs4 import BeautifulSoup
 from newspaper import Article
-from google import genai
+from gemini_client import get_summarizer
+from telegram_sender import get_sender
 from dotenv import load_dotenv
 import trafilatura
 import time
+import asyncio
 import datetime
 import yfinance as yf
 from supabase import create_client, Client
@@ -25,11 +30,16 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and
 
 # --- [유틸리티] 텔레그램 전송 ---
 def send_telegram(text):
-    if not TOKEN or not CHAT_ID: return
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-    data = {"chat_id": CHAT_ID, "text": text, "parse_mode": "HTML", "disable_web_page_preview": "true"}
-    try: requests.post(url, data=data, timeout=5)
-    except Exception as e: print(f"전송 실패: {e}")
+    """전송 큐 경유 (4096자 분할, 429 retry_after 대기, 실패 재시도) -> 성공 여부"""
+    if not TOKEN or not CHAT_ID: return False
+    try:
+        ok = get_sender(TOKEN).send(CHAT_ID, text).result()
+        telemetry.annotate(ok=bool(ok))
+        return ok
+    except Exception as e:
+        print(f"전송 실패: {e}")
+        telemetry.annotate(ok=False, error=str(e)[:200])
+        return False
 
 # --- [유틸리티] DB 조회 ---
 def get_db_data():
@@ -51,6 +61,9 @@ def get_db_data():
         return [], {}
 
 from quant_analyzer import analyze_stock
+from price_store import load_histories
+from metrics_snapshot import snapshot_metrics
+from article_cache import get_cache as get_article_cache, resolve_url
 
 # --- [유틸리티] 지표 아이콘 판별 ---
 def get_brief_icon(name, val):
@@ -62,17 +75,22 @@ def get_brief_icon(name, val):
     return ""
 
 # --- [유틸리티] 주가 정보 및 퀀트 분석 조회 ---
-def get_stock_info(keyword, ticker_map):
+def get_stock_info(keyword, ticker_map, history_map=None, metrics_map=None):
     ticker = ticker_map.get(keyword)
     if not ticker: return ""
     try:
-        # 1년치 데이터 가져오기 (퀀트 엔진용)
-        stock = yf.Ticker(ticker)
-        df = stock.history(period="1y")
+        # 1년치 데이터 가져오기 (퀀트 엔진용, 일괄 수집분이 있으면 재사용)
+        if history_map is not None and ticker in history_map:
+            df = history_map[ticker]
+        else:
+            df = yf.Ticker(ticker).history(period="1y")
         if df.empty: return ""
         
-        # 퀀트 분석 수행
-        m = analyze_stock(df)
+        # 퀀트 분석 (스냅샷이 있으면 재사용)
+        if metrics_map is not None and ticker in metrics_map:
+            m = metrics_map[ticker]['metrics']
+        else:
+            m = analyze_stock(df)
         if "error" in m: return f"\n⚠️ {keyword}: 데이터 부족으로 분석 불가\n"
 
         price = m['price']
@@ -99,54 +117,69 @@ def get_stock_info(keyword, ticker_map):
         return result + "\n"
     except Exception as e:
         print(f"Stock Info Error ({keyword}): {e}")
+        telemetry.annotate(ok=False, error=str(e)[:200])
         return ""
 
 # --- [핵심] 뉴스 수집 엔진 (구글 + 빙) ---
-def fetch_rss_items(keyword):
-    """구글 뉴스를 먼저 털고, 없으면 빙 뉴스를 텁니다."""
+MAX_NEWS_ITEMS = 4
+FEED_POOL = 12      # 피드당 읽는 후보 수 (유사 기사를 묶은 뒤에도 MAX_NEWS_ITEMS개를 채우도록 넉넉히)
+
+def get_rss_sources(keyword):
+    """검색 엔진 리스트 (우선순위: 구글 -> 빙)"""
     encoded = urllib.parse.quote(keyword)
-    items = []
-    
-    # 1. 검색 엔진 리스트 (우선순위: 구글 -> 빙)
-    search_urls = [
+    return [
         ("Google", f"https://news.google.com/rss/search?q={encoded}&hl=ko&gl=KR&ceid=KR:ko"),
         ("Bing", f"https://www.bing.com/news/search?q={encoded}&format=rss")
     ]
-    
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
 
-    for source_name, url in search_urls:
-        if len(items) >= 4: break # 이미 충분하면 중단
-        try:
-            print(f"📡 {source_name} 검색 시도...")
-            res = requests.get(url, headers=headers, timeout=5)
-            soup = BeautifulSoup(res.text, "xml")
-            found_items = soup.find_all("item")
-            
-            for item in found_items:
-                title = item.title.get_text()
-                link = item.link.get_text()
-                # RSS에 있는 요약본(description) 추출
-                snippet = ""
-                if item.description:
-                    snippet = BeautifulSoup(item.description.get_text(), "html.parser").get_text()
-                
-                items.append({"source": source_name, "title": title, "link": link, "snippet": snippet})
-                if len(items) >= 4: break
-        except Exception as e:
-            print(f"⚠️ {source_name} 검색 실패: {e}")
+def fetch_feed(source_name, url):
+    """RSS 피드 1개에서 기사 후보 목록 추출 (최대 FEED_POOL개, 개수 제한은 중복 제거 뒤 dedupe_news에서)"""
+    items = []
+    try:
+        print(f"📡 {source_name} 검색 시도...")
+        res = http_client.get(url, timeout=5, conditional=True)
+        soup = BeautifulSoup(res.text, "xml")
+        
+        for item in soup.find_all("item"):
+            title = item.title.get_text()
+            link = item.link.get_text()
+            # RSS에 있는 요약본(description) 추출
+            snippet = ""
+            if item.description:
+                snippet = BeautifulSoup(item.description.get_text(), "html.parser").get_text()
             
+            items.append({"source": source_name, "title": title, "link": link, "snippet": snippet})
+            if len(items) >= FEED_POOL: break
+    except Exception as e:
+        print(f"⚠️ {source_name} 검색 실패: {e}")
+        telemetry.annotate(ok=False, error=str(e)[:200])
     return items
 
+def dedupe_news(items):
+    """같은 기사(구글/빙 중복 보도) 묶기 -> 대표 기사 최대 MAX_NEWS_ITEMS개 (절감량은 현재 span에 기록)"""
+    unique, stats = news_dedup.cluster_items(items, limit=MAX_NEWS_ITEMS)
+    if stats["extractions_saved"]:
+        print(f"🧹 유사 기사 {stats['items']}건 -> {stats['clusters']}묶음 (추출 {stats['extractions_saved']}건, 약 {stats['tokens_saved']}토큰 절감)")
+    telemetry.annotate(news_items=stats["items"], dedup_saved=stats["extractions_saved"], tokens_saved=stats["tokens_saved"])
+    return unique
+
+def fetch_rss_items(keyword):
+    """구글 뉴스를 먼저 털고, 없으면 빙 뉴스를 텁니다. (유사 기사는 대표 1건만)"""
+    items = []
+    for source_name, url in get_rss_sources(keyword):
+        if len(items) >= FEED_POOL: break # 이미 충분하면 중단
+        items.extend(fetch_feed(source_name, url))
+    return dedupe_news(items)
+
 # --- [핵심] 본문 추출 엔진 (Trafilatura + Newspaper3k) ---
-def get_article_content(url):
-    """여러 라이브러리를 동원해 본문 추출 시도"""
+def extract_article(url):
+    """여러 라이브러리를 동원해 본문 추출 시도 -> (본문 또는 None, 추출기)"""
     # 1. Trafilatura 시도 (가장 깔끔함)
     try:
         d = trafilatura.fetch_url(url)
         if d:
             t = trafilatura.extract(d, include_comments=False, include_tables=False)
-            if t and len(t) > 50: return t[:1500]
+            if t and len(t) > 50: return t, "Trafilatura"
     except: pass
     
     # 2. Newspaper3k 시도 (전통의 강자)
@@ -155,21 +188,27 @@ def get_article_content(url):
         a = Article(url, language='ko', browser_user_agent=headers['User-Agent'])
         a.download()
         a.parse()
-        if len(a.text) > 50: return a.text[:1500]
+        if len(a.text) > 50: return a.text, "Newspaper"
     except: pass
 
-    return None # 다 실패하면 None 반환
+    return None, "Fail" # 다 실패하면 None 반환
 
-# --- [핵심] AI 요약 (한글 강제) ---
-def get_gemini_summary(keyword, text_data):
-    if not GEMINI_API_KEY: return "⚠️ API 키가 없습니다."
-    
-    try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
-        prompt = f"""
-        당신은 유능한 펀드매니저이자 시장 분석가입니다. 
-        제공된 뉴스 데이터를 바탕으로 '{keyword}' 종목에 대한 투자 브리핑을 작성하세요.
+def resolve_article_link(link):
+    """RSS 링크 -> 실제 기사 URL (이미 캐시된 링크는 네트워크 없이 그대로, 새로 해석한 주소는 별칭으로 기억)"""
+    cache = get_article_cache()
+    if cache.get(link) is not None: return link
+    target = resolve_url(link)
+    if target != link:
+        cache.add_alias(link, target)
+    return target
 
+def get_article_content(url):
+    """본문 조회 (정규화 URL 기준 디스크 캐시 우선, 여러 키워드/브리핑 간 공유)"""
+    text, _ = get_article_cache().get_or_extract(url, extract_article)
+    return text[:1500] if text else None
+
+# --- [핵심] AI 요약 (한글 강제) ---
+SUMMARY_RULES = """
         [지시 사항]
         1. 언어: **무조건 한국어(Korean)**로 작성하십시오.
         2. 어조: 전문적이고 객관적이되, 정중한 '해요체'를 사용하십시오.
@@ -178,73 +217,309 @@ def get_gemini_summary(keyword, text_data):
         [출력 양식]
         Part 1: ⚡ **3줄 핵심 요약** (이모지 활용, 핵심 이슈 위주)
         Part 2: 📝 **상세 시장 흐름** (300자 내외, 등락의 원인과 배경 설명)
+"""
 
+def get_gemini_summary(keyword, text_data):
+    if not GEMINI_API_KEY: return "⚠️ API 키가 없습니다."
+    
+    try:
+        prompt = f"""
+        당신은 유능한 펀드매니저이자 시장 분석가입니다. 
+        제공된 뉴스 데이터를 바탕으로 '{keyword}' 종목에 대한 투자 브리핑을 작성하세요.
+{SUMMARY_RULES}
         [뉴스 데이터]
         {text_data}
         """
-        return client.models.generate_content(model="gemini-2.0-flash", contents=prompt).text
-    except Exception as e: return f"AI Error: {e}"
+        return get_summarizer(GEMINI_API_KEY).generate(prompt)
+    except Exception as e:
+        telemetry.annotate(ok=False, error=str(e)[:200])
+        return f"AI Error: {e}"
+
+def get_gemini_batch_summary(entries):
+    """
+    뉴스가 적은 여러 키워드를 한 번의 요청으로 요약
+    entries: {키워드: 뉴스 데이터} -> {키워드: 요약} (누락분은 개별 요청으로 보충)
+    """
+    if not GEMINI_API_KEY: return {k: "⚠️ API 키가 없습니다." for k in entries}
+
+    sections = "\n".join(f"### {k}\n{text}\n" for k, text in entries.items())
+    prompt = f"""
+        당신은 유능한 펀드매니저이자 시장 분석가입니다. 
+        아래 {len(entries)}개 종목 각각에 대해 제공된 뉴스 데이터만 사용하여 투자 브리핑을 작성하세요.
+{SUMMARY_RULES}
+        [응답 형식]
+        JSON 객체 하나로만 답하십시오. 키는 종목명 그대로({", ".join(entries)}), 값은 해당 종목의 브리핑 문자열입니다.
+
+        [종목별 뉴스 데이터]
+        {sections}
+        """
+    results = {}
+    try:
+        results = get_summarizer(GEMINI_API_KEY).generate_batch(prompt, list(entries))
+    except Exception as e:
+        print(f"⚠️ 묶음 요약 실패, 개별 요청으로 전환: {e}")
+    for keyword, text in entries.items():
+        if keyword not in results:
+            results[keyword] = get_gemini_summary(keyword, text)
+    return results
 
 # --- 메인 로직 ---
-def process_keyword(keyword, ticker_map):
-    print(f"🚀 Analyzing: {keyword}")
-    today = datetime.datetime.now().strftime("%y/%m/%d")
-    stock_msg = get_stock_info(keyword, ticker_map)
-    
-    # 1. 뉴스 수집 (구글 -> 빙)
-    news_items = fetch_rss_items(keyword)
-    
-    if not news_items: 
-        return f"💤 {keyword}: 뉴스 없음 (Google & Bing 모두 실패)"
+def compact_contents(keyword, contents):
+    """본문을 키워드별 토큰 예산으로 압축 (전후 토큰 수는 현재 span에 기록)"""
+    compacted, stats = prompt_compactor.compact_contents(keyword, contents)
+    if stats["after"] < stats["before"]:
+        print(f"✂️ {keyword}: 본문 {stats['before']} -> {stats['after']}토큰")
+    telemetry.annotate(prompt_tokens_before=stats["before"], prompt_tokens_after=stats["after"])
+    return compacted
 
+def build_llm_input(news_items, contents):
+    """기사 목록 + 추출 본문 -> (AI 입력 텍스트, 뉴스 링크 목록)"""
     llm_input = []
     news_links = []
     
-    # 2. 본문 추출 및 데이터 조립
-    for i, item in enumerate(news_items):
+    for i, (item, content) in enumerate(zip(news_items, contents)):
         title = item['title']
         link = item['link']
         snippet = item['snippet']
         source = item['source']
+        # 같은 기사가 여러 곳에 실렸으면 묶음 크기 표시 (AI가 비중 판단에 사용)
+        size = item.get('cluster_size', 1)
+        similar = f" (유사 {size}건)" if size > 1 else ""
         
-        news_links.append(f"{i+1}. [{source}] <a href='{link}'>{title}</a>")
-        
-        # 본문 추출 시도
-        content = get_article_content(link)
+        news_links.append(f"{i+1}. [{source}] <a href='{link}'>{title}</a>{similar}")
         
         if content:
             # 본문 성공 시
-            llm_input.append(f"[기사 {i+1}] 제목: {title}\n내용: {content}\n")
+            llm_input.append(f"[기사 {i+1}]{similar} 제목: {title}\n내용: {content}\n")
         else:
             # 본문 실패 시 -> RSS Snippet(요약) 사용
-            llm_input.append(f"[기사 {i+1}] 제목: {title}\n요약(접속불가): {snippet}\n")
+            llm_input.append(f"[기사 {i+1}]{similar} 제목: {title}\n요약(접속불가): {snippet}\n")
+    return "\n".join(llm_input), news_links
+
+def format_briefing(keyword, today, stock_msg, summary, news_links):
+    return f"🔥 <b>[{today}] {keyword} 브리핑</b> 🔥\n{stock_msg}{summary}\n\n<b>📰 주요 뉴스</b>\n" + "\n".join(news_links)
+
+def process_keyword(keyword, ticker_map, history_map=None):
+    print(f"🚀 Analyzing: {keyword}")
+    today = datetime.datetime.now().strftime("%y/%m/%d")
+    stock_msg = get_stock_info(keyword, ticker_map, history_map)
+    
+    # 1. 뉴스 수집 (구글 -> 빙)
+    news_items = fetch_rss_items(keyword)
+    
+    if not news_items: 
+        return f"💤 {keyword}: 뉴스 없음 (Google & Bing 모두 실패)"
+
+    # 2. 본문 추출 및 데이터 조립
+    contents = compact_contents(keyword, [get_article_content(item['link']) for item in news_items])
+    full_text, news_links = build_llm_input(news_items, contents)
 
     # 3. AI 분석
     # 데이터가 너무 적으면 경고하지만, snippet이라도 있으면 진행
-    full_text = "\n".join(llm_input)
     if len(full_text) < 30:
         return f"⚠️ {keyword}: 분석할 데이터 부족"
 
     summary = get_gemini_summary(keyword, full_text)
     
-    msg = f"🔥 <b>[{today}] {keyword} 브리핑</b> 🔥\n{stock_msg}{summary}\n\n<b>📰 주요 뉴스</b>\n" + "\n".join(news_links)
-    send_telegram(msg)
+    send_telegram(format_briefing(keyword, today, stock_msg, summary, news_links))
     return f"✅ {keyword} 브리핑 완료"
 
-# --- 앱 연동용 ---
-def run_batch_briefing():
-    targets, ticker_map = get_db_data()
-    logs = []
-    if not targets: return ["⚠️ 활성화된 타겟이 없습니다."]
-    
-    for word in targets:
+# --- 비동기 배치 파이프라인 ---
+# 단계별 동시 실행 한도 (run_batch_briefing(concurrency=...)로 변경 가능)
+DEFAULT_CONCURRENCY = {
+    "keywords": 8,   # 동시에 처리할 키워드 수
+    "feeds": 4,      # RSS 요청
+    "resolve": 8,    # 구글/빙 리다이렉트 링크 -> 실제 기사 URL
+    "articles": 8,   # 본문 다운로드/추출
+    "prices": 4,     # 주가 조회/퀀트 분석
+    "llm": 2,        # Gemini 요청
+    "telegram": 1,   # 텔레그램 전송
+}
+PER_HOST_LIMIT = 2   # 같은 호스트 동시 요청 수 (고정 sleep 대신 사용)
+# 계측 단계 이름 (동시 실행 한도 이름 -> span 이름)
+STAGE_SPANS = {"feeds": "rss", "resolve": "resolve", "articles": "article", "prices": "analyze", "llm": "gemini", "telegram": "telegram"}
+LOW_NEWS_CHARS = 1200  # 이보다 짧은 뉴스 데이터는 묶음 요약 대상
+BATCH_SIZE = 4
+BATCH_WAIT = 1.5       # 묶음을 채우기 위해 기다리는 최대 시간 (초)
+
+class StageLimiter:
+    """단계별/호스트별 세마포어로 블로킹 함수를 스레드에서 실행"""
+    def __init__(self, concurrency=None, per_host=PER_HOST_LIMIT):
+        limits = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.stages = {name: asyncio.Semaphore(n) for name, n in limits.items()}
+        self.per_host = per_host
+        self.hosts = {}
+
+    def _host(self, url):
+        host = urllib.parse.urlparse(url).netloc if url else None
+        if not host: return None
+        if host not in self.hosts:
+            self.hosts[host] = asyncio.Semaphore(self.per_host)
+        return self.hosts[host]
+
+    async def run(self, stage, func, *args, url=None):
+        host_sem = self._host(url)
+        queued = time.perf_counter()
+        async with self.stages[stage]:
+            if host_sem is None:
+                return await self._timed(stage, queued, func, *args)
+            async with host_sem:
+                return await self._timed(stage, queued, func, *args)
+
+    async def _timed(self, stage, queued, func, *args):
+        # 세마포어 대기 시간은 wait로 따로 기록하고, 실행 시간만 span으로 측정
+        with telemetry.span(STAGE_SPANS.get(stage, stage), wait=round(time.perf_counter() - queued, 4)):
+            return await asyncio.to_thread(func, *args)
+
+class SummaryBatcher:
+    """뉴스가 적은 키워드를 모아 한 번의 Gemini 요청으로 요약"""
+    def __init__(self, limiter, size=BATCH_SIZE, wait=BATCH_WAIT):
+        self.limiter = limiter
+        self.size = size
+        self.wait = wait
+        self.pending = []
+        self.timer = None
+        self.tasks = set()   # 실행 중인 묶음 요청 (asyncio는 태스크를 약한 참조로만 보관)
+
+    async def summarize(self, keyword, text_data):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((keyword, text_data, future))
+        if len(self.pending) >= self.size:
+            self._flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.wait, self._flush)
+        return await future
+
+    def _flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self._done)
+
+    def _done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ 묶음 요약 태스크 실패: {task.exception()}")
+
+    async def close(self):
+        """남은 대기분을 보내고 실행 중인 묶음 요청이 끝날 때까지 대기"""
+        self._flush()
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def _run(self, batch):
+        entries = {keyword: text for keyword, text, _ in batch}
         try:
-            log = process_keyword(word, ticker_map)
-            logs.append(log)
+            with telemetry.span("gemini_batch", keyword="", size=len(entries)):
+                results = await self.limiter.run("llm", get_gemini_batch_summary, entries)
         except Exception as e:
-            logs.append(f"❌ {word} 에러: {e}")
-        time.sleep(2)
+            results = {keyword: f"AI Error: {e}" for keyword in entries}
+        for keyword, _, future in batch:
+            if not future.done():
+                future.set_result(results.get(keyword, "AI Error: 응답 누락"))
+
+async def fetch_rss_items_async(keyword, limiter):
+    """구글/빙 피드를 동시에 요청하고 구글 -> 빙 순서로 병합 (유사 기사는 대표 1건만)"""
+    results = await asyncio.gather(*[
+        limiter.run("feeds", fetch_feed, source_name, url, url=url)
+        for source_name, url in get_rss_sources(keyword)
+    ])
+    return dedupe_news([item for items in results for item in items])
+
+async def fetch_article_async(link, limiter):
+    """
+    리다이렉트 해석은 구글/빙 호스트 한도로, 본문 추출은 언론사 호스트 한도로 실행
+    (RSS 링크 호스트로 추출까지 묶으면 모든 기사가 집계 사이트 슬롯 2개를 나눠 씀)
+    """
+    target = await limiter.run("resolve", resolve_article_link, link, url=link)
+    return await limiter.run("articles", get_article_content, target, url=target)
+
+async def process_keyword_async(keyword, ticker_map, history_map, limiter, batcher=None, metrics_map=None):
+    print(f"🚀 Analyzing: {keyword}")
+    today = datetime.datetime.now().strftime("%y/%m/%d")
+    stock_task = asyncio.ensure_future(limiter.run("prices", get_stock_info, keyword, ticker_map, history_map, metrics_map))
+
+    news_items = await fetch_rss_items_async(keyword, limiter)
+    if not news_items:
+        stock_task.cancel()
+        return f"💤 {keyword}: 뉴스 없음 (Google & Bing 모두 실패)"
+
+    # 기사 순서는 gather 결과 순서로 유지 (완료 순서와 무관)
+    contents = await asyncio.gather(*[fetch_article_async(item['link'], limiter) for item in news_items])
+    contents = compact_contents(keyword, contents)
+    full_text, news_links = build_llm_input(news_items, contents)
+    if len(full_text) < 30:
+        stock_task.cancel()
+        return f"⚠️ {keyword}: 분석할 데이터 부족"
+
+    if batcher is not None and len(full_text) < LOW_NEWS_CHARS:
+        summary = await batcher.summarize(keyword, full_text)
+    else:
+        summary = await limiter.run("llm", get_gemini_summary, keyword, full_text)
+    stock_msg = await stock_task
+    await limiter.run("telegram", send_telegram, format_briefing(keyword, today, stock_msg, summary, news_links))
+    return f"✅ {keyword} 브리핑 완료"
+
+async def run_batch_briefing_async(concurrency=None, batch_low_news=False):
+    with telemetry.span("db"):
+        targets, ticker_map = get_db_data()
+    if not targets: return ["⚠️ 활성화된 타겟이 없습니다."]
+
+    # 주가 데이터 일괄 수집 (로컬 저장소 + 신규 봉만 다중 티커 요청)
+    with telemetry.span("price_fetch", tickers=len(ticker_map)) as record:
+        history_map, failures = await asyncio.to_thread(load_histories, list(ticker_map.values()), "1y")
+        record["ok"] = not failures
+    for ticker, reason in failures.items():
+        print(f"⚠️ 주가 수집 실패 ({ticker}): {reason}")
+
+    # 지표 스냅샷 (새 봉이 생긴 종목만 재계산)
+    with telemetry.span("snapshot", tickers=len(history_map)) as record:
+        metrics_map = await asyncio.to_thread(snapshot_metrics, history_map, supabase)
+        record["reused"] = sum(1 for v in metrics_map.values() if v["cached"])
+    print(f"🧮 지표 스냅샷: 재사용 {record['reused']} / 재계산 {len(metrics_map) - record['reused']}")
+
+    limiter = StageLimiter(concurrency)
+    batcher = SummaryBatcher(limiter) if batch_low_news else None
+
+    async def run_one(word):
+        async with limiter.stages["keywords"]:
+            with telemetry.span("keyword", word) as record:
+                try:
+                    return await process_keyword_async(word, ticker_map, history_map, limiter, batcher, metrics_map)
+                except Exception as e:
+                    record.update(ok=False, error=str(e)[:200])
+                    return f"❌ {word} 에러: {e}"
+
+    # 로그는 키워드 입력 순서 그대로 반환
+    logs = list(await asyncio.gather(*[run_one(word) for word in targets]))
+    if batcher is not None:
+        await batcher.close()
+    dedup = news_dedup.totals()
+    print(f"🧹 유사 기사: {dedup['items']}건 -> {dedup['clusters']}묶음 (추출 {dedup['extractions_saved']}건, 약 {dedup['tokens_saved']:,}토큰 절감)")
+    news_dedup.reset()
+    prompt = prompt_compactor.totals()
+    if prompt["prompts"]:
+        print(f"✂️ AI 입력 압축: {prompt['prompts']}건 본문 {prompt['before']:,} -> {prompt['after']:,}토큰")
+    prompt_compactor.reset()
+    stats = get_article_cache().stats()
+    print(f"📦 기사 캐시: 적중 {stats['hits']} / 미적중 {stats['misses']} (적중률 {stats['hit_rate']:.0%}, {stats['entries']}건)")
+    if TOKEN:
+        tg = get_sender(TOKEN).metrics
+        print(f"📨 텔레그램: 전송 {tg['sent']} / 실패 {tg['failed']} (재시도 {tg['retries']}, 한도대기 {tg['throttled']}, 분할 {tg['chunks']}조각)")
+    for host, st in sorted(http_client.latency_report().items()):
+        print(f"🌐 {host}: {st['count']}회 (오류 {st['errors']}, 304 {st['revalidated']}) p50≤{st['p50']}s p95≤{st['p95']}s")
+    telemetry.finish_batch("briefing")
     return logs
 
+# --- 앱 연동용 ---
+def run_batch_briefing(concurrency=None, batch_low_news=None):
+    if batch_low_news is None:
+        batch_low_news = os.environ.get("GEMINI_BATCH_LOW_NEWS", "").lower() in ("1", "true", "yes")
+    return asyncio.run(run_batch_briefing_async(concurrency, batch_low_news))
+
 if __name__ == "__main__":
     run_batch_briefing()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import sys
+import pickle
+import numpy as np
+import pandas as pd
+
+# 캐시용 압축 주가 이력 (OHLC float32 + 정수 거래량 + int32 일자)
+# float64 DataFrame 대비 종목당 메모리/피클 크기를 절반 이하로 줄여 st.cache_data 복사 비용 감소
+# (캐시에서 꺼낼 때 to_frame()이 float64로 되돌림)
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+EPOCH = np.datetime64("1970-01-01", "D")
+
+class CompactOHLCV:
+    """
+    - ohlc: (4 x 봉) float32 (Open, High, Low, Close 순서의 행)
+    - volume: uint32 (범위를 넘으면 int64)
+    - days: 1970-01-01 기준 일수 int32
+    to_frame()은 float64 OHLC + int64 거래량 DataFrame을 반환 (analyze_stock 입력 형태)
+    -> float32는 저장 형태로만 쓰고 지표 계산은 원본과 같은 정밀도로 수행
+    """
+    __slots__ = ("ohlc", "volume", "days")
+
+    def __init__(self, ohlc, volume, days):
+        self.ohlc, self.volume, self.days = ohlc, volume, days
+
+    @classmethod
+    def from_frame(cls, df):
+        df = df.dropna(subset=["Close"])
+        ohlc = np.ascontiguousarray(df[COLUMNS[:4]].to_numpy(dtype=np.float32).T)
+        volume = np.nan_to_num(df["Volume"].to_numpy(dtype=float))
+        volume = volume.astype(np.uint32 if volume.size == 0 or volume.max() < 2 ** 32 else np.int64)
+        index = df.index.tz_localize(None) if getattr(df.index, "tz", None) is not None else df.index
+        days = (index.to_numpy(dtype="datetime64[D]") - EPOCH).astype(np.int32)
+        return cls(ohlc, volume, days)
+
+    def to_frame(self):
+        index = pd.DatetimeIndex((self.days.astype(np.int64) * 86400).astype("datetime64[s]"), name="Date")
+        columns = dict(zip(COLUMNS[:4], self.ohlc.astype(np.float64)))
+        columns["Volume"] = self.volume.astype(np.int64)
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def nbytes(self):
+        return self.ohlc.nbytes + self.volume.nbytes + self.days.nbytes
+
+    def __getstate__(self):
+        return self.ohlc, self.volume, self.days
+
+    def __setstate__(self, state):
+        self.ohlc, self.volume, self.days = state
+
+def pack(frames):
+    """{티커: DataFrame} -> {티커: CompactOHLCV}"""
+    return {t: CompactOHLCV.from_frame(df) for t, df in frames.items() if df is not None and not df.empty}
+
+def unpack(compact):
+    """{티커: CompactOHLCV} -> {티커: DataFrame}"""
+    return {t: c.to_frame() for t, c in compact.items()}
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+def memory_report(frames):
+    """종목당 평균 바이트 (메모리 / 피클) - DataFrame vs CompactOHLCV"""
+    compact = pack(frames)
+    n = max(len(frames), 1)
+    return {
+        "tickers": len(frames),
+        "frame_bytes": sum(frame_nbytes(df) for df in frames.values()) / n,
+        "frame_pickle": len(pickle.dumps(frames, protocol=pickle.HIGHEST_PROTOCOL)) / n,
+        "compact_bytes": sum(c.nbytes for c in compact.values()) / n,
+        "compact_pickle": len(pickle.dumps(compact, protocol=pickle.HIGHEST_PROTOCOL)) / n,
+    }
+
+# --- 측정: python compact_ohlcv.py [종목 수] [봉 수] ---
+if __name__ == "__main__":
+    from benchmark import make_universe
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 252
+    frames = make_universe(n_tickers, n_days)
+    # yfinance 원본 형태 (Adj Close/배당/분할 + 시간대 인덱스, float64)
+    raw = {t: df.assign(**{"Adj Close": df["Close"], "Dividends": 0.0, "Stock Splits": 0.0})
+               .tz_localize("Asia/Seoul") for t, df in frames.items()}
+    report = memory_report(frames)
+    raw_bytes = sum(frame_nbytes(df) for df in raw.values()) / max(len(raw), 1)
+    print(f"{n_tickers}종목 x {n_days}봉 (종목당 바이트)")
+    print(f"  yfinance 원본 DataFrame : {raw_bytes:>10,.0f}")
+    print(f"  OHLCV float64 DataFrame : {report['frame_bytes']:>10,.0f}  (pickle {report['frame_pickle']:,.0f})")
+    print(f"  CompactOHLCV            : {report['compact_bytes']:>10,.0f}  (pickle {report['compact_pickle']:,.0f})")
+    print(f"  2,500종목 환산          : {report['frame_bytes'] * 2500 / 2**20:,.1f} MB -> {report['compact_bytes'] * 2500 / 2**20:,.1f} MB")
@@ -0,0 +1,103 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from google import genai
+
+# Gemini 요약 클라이언트 (클라이언트 재사용 + RPM/TPM 토큰 버킷 + 쿼터 오류 재시도)
+MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+RPM = int(os.environ.get("GEMINI_RPM", "15"))
+TPM = int(os.environ.get("GEMINI_TPM", "1000000"))
+MAX_RETRIES = 5
+
+def estimate_tokens(text):
+    """대략적인 토큰 수 (한글 위주 텍스트 기준 약 2자당 1토큰)"""
+    return max(1, len(text) // 2)
+
+class TokenBucket:
+    """분당 한도를 초당 충전량으로 환산한 토큰 버킷 (스레드 안전, 부족하면 대기)"""
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        amount = min(float(amount), self.capacity)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+# 상태 코드가 없는 예외는 메시지의 상태명/코드로 판별 (숫자는 단어 경계로만 -> 토큰 수 "14290" 등 오인 방지)
+_QUOTA_RE = re.compile(r"RESOURCE_EXHAUSTED|UNAVAILABLE|\b(?:429|503)\b")
+
+def is_quota_error(e):
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    if isinstance(code, int):
+        return code in (429, 503)
+    return bool(_QUOTA_RE.search(str(e)))
+
+class GeminiSummarizer:
+    def __init__(self, api_key, model=MODEL, rpm=RPM, tpm=TPM, max_retries=MAX_RETRIES):
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.stats = {"requests": 0, "retries": 0, "prompt_tokens": 0}
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, json_mode=False):
+        """한도 내에서 generate_content 호출, 쿼터 오류는 지수 백오프(+지터)로 재시도"""
+        config = {"response_mime_type": "application/json"} if json_mode else None
+        tokens = estimate_tokens(prompt)
+        for attempt in range(self.max_retries + 1):
+            self.requests.acquire()
+            self.tokens.acquire(tokens)
+            with self._lock:
+                self.stats["requests"] += 1
+                self.stats["prompt_tokens"] += tokens
+            try:
+                return self.client.models.generate_content(model=self.model, contents=prompt, config=config).text
+            except Exception as e:
+                if not is_quota_error(e) or attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.stats["retries"] += 1
+                delay = min(60, 2 ** attempt) + random.uniform(0, 1)
+                print(f"⏳ Gemini 한도 초과, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def generate_batch(self, prompt, keys):
+        """
+        여러 키워드를 한 번에 요청하고 JSON 응답을 키워드별로 분리
+        반환: {키워드: 요약} (응답에 없는 키워드는 빠짐 -> 호출 측에서 개별 요청)
+        """
+        raw = self.generate(prompt, json_mode=True)
+        try:
+            data = json.loads(raw)
+        except (TypeError, ValueError):
+            return {}
+        if isinstance(data, list):
+            data = {d.get("keyword"): d.get("summary") for d in data if isinstance(d, dict)}
+        return {k: data[k] for k in keys if isinstance(data.get(k), str) and data[k].strip()}
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+def get_summarizer(api_key):
+    global _summarizer
+    with _summarizer_lock:
+        if _summarizer is None:
+            _summarizer = GeminiSummarizer(api_key)
+        return _summarizer
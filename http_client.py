@@ -0,0 +1,199 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+import urllib.parse
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+import telemetry
+
+# 공용 HTTP 클라이언트 (호스트별 keep-alive 세션 + 재시도 + 조건부 GET 캐시 + 응답 크기 제한 + 지연 통계)
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+MAX_BYTES = 5 * 1024 * 1024
+RETRY_STATUS = {429, 500, 502, 503, 504}
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # 초
+CACHE_PATH = os.environ.get(
+    "HTTP_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "http_cache.db"),
+)
+
+class ResponseTooLarge(requests.RequestException):
+    """응답 본문이 max_bytes를 넘음"""
+
+_lock = threading.Lock()
+_sessions = {}
+_stats = {}
+
+def get_session(host):
+    """호스트별 세션 (연결 풀 재사용으로 TLS 핸드셰이크 반복 방지)"""
+    with _lock:
+        if host not in _sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _sessions[host] = session
+        return _sessions[host]
+
+def _observe(host, seconds, size=0, error=False, revalidated=False):
+    with _lock:
+        st = _stats.setdefault(host, {
+            "count": 0, "errors": 0, "bytes": 0, "revalidated": 0, "total_seconds": 0.0,
+            "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+        })
+        st["count"] += 1
+        st["total_seconds"] += seconds
+        st["bytes"] += size
+        if error: st["errors"] += 1
+        if revalidated: st["revalidated"] += 1
+        idx = next((i for i, b in enumerate(LATENCY_BUCKETS) if seconds <= b), len(LATENCY_BUCKETS))
+        st["buckets"][idx] += 1
+
+def _bucket_quantile(buckets, q):
+    total = sum(buckets)
+    if not total: return None
+    target, seen = q * total, 0
+    for i, n in enumerate(buckets):
+        seen += n
+        if seen >= target:
+            return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+
+def latency_report():
+    """호스트별 요청 수/오류/전송량/지연 히스토그램 (p50, p95는 버킷 상한 기준)"""
+    with _lock:
+        snapshot = {host: {**st, "buckets": list(st["buckets"])} for host, st in _stats.items()}
+    for st in snapshot.values():
+        st["p50"] = _bucket_quantile(st["buckets"], 0.5)
+        st["p95"] = _bucket_quantile(st["buckets"], 0.95)
+        st["histogram"] = dict(zip([f"<={b}s" for b in LATENCY_BUCKETS] + [">10s"], st.pop("buckets")))
+    return snapshot
+
+class _ConditionalCache:
+    """ETag / Last-Modified 기반 재검증용 응답 저장소 (SQLite)"""
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.ready = False
+
+    @contextmanager
+    def _connect(self):
+        if not self.ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                if not self.ready:
+                    conn.execute("""CREATE TABLE IF NOT EXISTS responses (
+                        url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT,
+                        content_type TEXT, encoding TEXT, body BLOB, stored_at REAL)""")
+                    self.ready = True
+                yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, url):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT etag, last_modified, content_type, encoding, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+    def store(self, url, resp):
+        etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if not etag and not modified: return
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)", (
+                url, etag, modified, resp.headers.get("Content-Type"), resp.encoding, resp.content, time.time()
+            ))
+
+_conditional_cache = _ConditionalCache()
+
+def _from_cache(url, row):
+    _, _, content_type, encoding, body = row
+    resp = requests.Response()
+    resp.status_code = 200
+    resp.url = url
+    resp._content = body
+    resp.encoding = encoding
+    resp.headers = CaseInsensitiveDict({"Content-Type": content_type or ""})
+    resp.from_cache = True
+    return resp
+
+def _read_capped(resp, max_bytes):
+    length = resp.headers.get("Content-Length")
+    if max_bytes and length and length.isdigit() and int(length) > max_bytes:
+        resp.close()
+        raise ResponseTooLarge(f"응답 크기 초과: {length} > {max_bytes} ({resp.url})")
+    body = bytearray()
+    for chunk in resp.iter_content(64 * 1024):
+        body.extend(chunk)
+        if max_bytes and len(body) > max_bytes:
+            resp.close()
+            raise ResponseTooLarge(f"응답 크기 초과: > {max_bytes} ({resp.url})")
+    resp._content = bytes(body)
+    resp._content_consumed = True
+    return len(body)
+
+def request(method, url, headers=None, timeout=10, retries=2, backoff=0.5,
+            max_bytes=MAX_BYTES, conditional=False, **kwargs):
+    """
+    공용 요청 함수
+    - retries: 연결 오류/타임아웃/429·5xx 재시도 횟수 (지터 포함 지수 백오프, Retry-After 우선)
+    - conditional: GET 응답을 ETag/Last-Modified로 재검증하여 변경 없으면 저장본 반환
+    - max_bytes: 응답 본문 최대 크기 (초과 시 ResponseTooLarge)
+    """
+    host = urllib.parse.urlsplit(url).netloc
+    session = get_session(host)
+    headers = dict(headers or {})
+    cached = None
+    if conditional and method.upper() == "GET":
+        try:
+            cached = _conditional_cache.lookup(url)
+        except sqlite3.Error:
+            cached = None
+        if cached:
+            if cached[0]: headers["If-None-Match"] = cached[0]
+            if cached[1]: headers["If-Modified-Since"] = cached[1]
+
+    for attempt in range(retries + 1):
+        start = time.monotonic()
+        try:
+            resp = session.request(method, url, headers=headers, timeout=timeout, stream=True, **kwargs)
+            size = _read_capped(resp, max_bytes)
+            telemetry.annotate(bytes=size)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            _observe(host, time.monotonic() - start, error=True)
+            if attempt == retries: raise
+            time.sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+            continue
+        _observe(host, time.monotonic() - start, size, error=resp.status_code >= 400,
+                 revalidated=resp.status_code == 304)
+        if resp.status_code in RETRY_STATUS and attempt < retries:
+            retry_after = resp.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else backoff * (2 ** attempt)
+            time.sleep(delay + random.uniform(0, backoff))
+            continue
+        break
+
+    if cached and resp.status_code == 304:
+        return _from_cache(url, cached)
+    if conditional and resp.status_code == 200:
+        try:
+            _conditional_cache.store(url, resp)
+        except sqlite3.Error:
+            pass
+    return resp
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def head(url, **kwargs):
+    kwargs.setdefault("allow_redirects", True)
+    return request("HEAD", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,159 @@
+import re
+import sys
+import time
+from collections import namedtuple
+import lxml.html
+
+# 시세 목록 페이지 파서 (lxml + XPath로 대상 표의 행만 추출, BeautifulSoup 트리 생성 생략)
+# 행: 시장(KOSPI/KOSDAQ/None), 종목코드(미국은 티커), 종목명, 현재가, 등락률(%), 거래량
+ListingRow = namedtuple("ListingRow", "market code name price change volume")
+
+MARKET_LABELS = {"코스피": "KOSPI", "코스닥": "KOSDAQ"}
+_CODE_RE = re.compile(r"code=(\d+)")
+_NUM_RE = re.compile(r"[-+]?\d[\d,]*\.?\d*")
+_SUFFIX = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+def _number(text):
+    """'1,234' / '+5.23%' / '-0.12' / '12.3M' -> float (숫자가 없으면 None)"""
+    if not text: return None
+    match = _NUM_RE.search(text)
+    if not match: return None
+    value = float(match.group().replace(",", ""))
+    tail = text[match.end():match.end() + 1].upper()
+    return value * _SUFFIX.get(tail, 1)
+
+def _text(el):
+    return " ".join(el.text_content().split())
+
+def _column_index(headers, *names):
+    for i, h in enumerate(headers):
+        if any(name in h for name in names): return i
+    return None
+
+def _class_xpath(tag, cls):
+    return f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+
+def _parse_naver_table(table, market):
+    headers = [_text(th) for th in table.xpath(".//th")]
+    price_i = _column_index(headers, "현재가")
+    change_i = _column_index(headers, "등락률")
+    volume_i = _column_index(headers, "거래량")
+    rows = []
+    for tr in table.xpath(".//tr[td//a[contains(@class, 'tltle')]]"):
+        link = tr.xpath(".//a[contains(@class, 'tltle')]")[0]
+        code = _CODE_RE.search(link.get("href", ""))
+        if not code: continue
+        cells = [_text(td) for td in tr.xpath("./td")]
+        # 헤더와 칸 수가 다르면 '%' 칸으로 등락률만 찾음
+        aligned = len(cells) == len(headers)
+        if aligned and change_i is not None:
+            change = _number(cells[change_i])
+        else:
+            change = next((_number(c) for c in cells if "%" in c), None)
+        if change is None: continue
+        rows.append(ListingRow(
+            market, code.group(1), _text(link),
+            _number(cells[price_i]) if aligned and price_i is not None else None,
+            change,
+            _number(cells[volume_i]) if aligned and volume_i is not None else None,
+        ))
+    return rows
+
+def parse_naver_listing(html, default_market=None, table_class="type_2"):
+    """
+    네이버 금융 시세 목록 (sise_upper / sise_rise / sise_fall / sise_quant_high / lastsearch2)
+    - default_market이 없으면 표 앞의 '코스피/코스닥' 제목으로 시장 판별 (상한가처럼 두 시장이 한 페이지)
+    - lastsearch2는 table_class="type_5"
+    """
+    if not html: return []
+    doc = lxml.html.fromstring(html)
+    rows, market = [], default_market
+    # XPath 합집합은 문서 순서대로 반환 -> 제목 다음에 오는 표에 시장 적용
+    for el in doc.xpath(f"//h2|//h3|//h4|{_class_xpath('table', table_class)}"):
+        if el.tag != "table":
+            if default_market is None:
+                text = _text(el)
+                market = next((m for label, m in MARKET_LABELS.items() if label in text), market)
+            continue
+        table_market = market
+        caption = el.xpath("./caption")
+        if default_market is None and caption:
+            text = _text(caption[0])
+            table_market = next((m for label, m in MARKET_LABELS.items() if label in text), market)
+        rows.extend(_parse_naver_table(el, table_market))
+    return rows
+
+def parse_yahoo_trending(html):
+    """
+    야후 파이낸스 Trending Tickers 표
+    헤더(Symbol/Name/Price/% Change/Volume)로 칸을 찾고, 없으면 기존 위치(0/1/2/4)를 사용
+    """
+    if not html: return []
+    doc = lxml.html.fromstring(html)
+    rows = []
+    for table in doc.xpath("//table"):
+        headers = [_text(th) for th in table.xpath(".//th")]
+        symbol_i = _column_index(headers, "Symbol")
+        name_i = _column_index(headers, "Name")
+        price_i = _column_index(headers, "Last Price", "Price")
+        change_i = _column_index(headers, "% Change", "Change %")
+        volume_i = _column_index(headers, "Volume")
+        symbol_i = 0 if symbol_i is None else symbol_i
+        name_i = 1 if name_i is None else name_i
+        price_i = 2 if price_i is None else price_i
+        change_i = 4 if change_i is None else change_i
+        for tr in table.xpath(".//tr[count(td) > 2]"):
+            cells = [_text(td) for td in tr.xpath("./td")]
+            if symbol_i >= len(cells): continue
+            symbol = cells[symbol_i].split(" ")[0]
+            rows.append(ListingRow(
+                None, symbol,
+                cells[name_i] if name_i < len(cells) else symbol,
+                _number(cells[price_i]) if price_i < len(cells) else None,
+                _number(cells[change_i]) if change_i < len(cells) else None,
+                _number(cells[volume_i]) if volume_i is not None and volume_i < len(cells) else None,
+            ))
+    return rows
+
+# --- 벤치마크: python listing_parser.py [저장한 html 파일] ---
+def _sample_naver_page(n_rows=100):
+    """네이버 sise_upper 형태의 합성 페이지 (양 시장 표 + 메뉴/광고 등 주변 마크업)"""
+    filler = "".join(f"<div class='menu'><ul>{''.join(f'<li><a href=#{j}>메뉴{j}</a></li>' for j in range(30))}</ul></div>" for _ in range(20))
+    head = "<tr><th>N</th><th>연속</th><th>누적</th><th>종목명</th><th>현재가</th><th>전일비</th><th>등락률</th><th>거래량</th><th>시가</th><th>고가</th><th>저가</th><th>PER</th></tr>"
+
+    def table(offset):
+        body = "".join(
+            f"<tr><td class='no'>{i}</td><td>1</td><td>1</td>"
+            f"<td><a href='/item/main.naver?code={offset + i:06d}' class='tltle'>종목{offset + i}</a></td>"
+            f"<td class='number'>{10000 + i:,}</td><td class='number'><span class='tah p11 red02'>{3000 + i:,}</span></td>"
+            f"<td class='number'><span class='tah p11 red01'>+{29.9 - i * 0.1:.2f}%</span></td>"
+            f"<td class='number'>{123456 + i:,}</td><td>1</td><td>1</td><td>1</td><td>1</td></tr>"
+            for i in range(n_rows)
+        )
+        return f"<table class='type_2' summary='상한가'>{head}{body}</table>"
+    return f"<html><body>{filler}<h3>코스피</h3>{table(0)}<h3>코스닥</h3>{table(100000)}{filler}</body></html>"
+
+def _bench_bs4(html):
+    """기존 스캐너 방식 (html.parser 전체 트리 + 모든 td 순회)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    rows = []
+    for row in soup.select("table.type_2 tr"):
+        title_tag = row.select_one("a.tltle")
+        if not title_tag: continue
+        for td in row.find_all("td"):
+            if '%' in td.get_text():
+                rows.append((title_tag.get_text().strip(), td.get_text().strip()))
+                break
+    return rows
+
+if __name__ == "__main__":
+    # 저장한 페이지는 바이트 그대로 전달 -> lxml/bs4가 <meta charset>(EUC-KR)로 디코딩
+    html = open(sys.argv[1], "rb").read() if len(sys.argv) > 1 else _sample_naver_page()
+    repeat = 20
+    for label, func in (("lxml/XPath", parse_naver_listing), ("BeautifulSoup", _bench_bs4)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            rows = func(html)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        print(f"{label:>14}: {elapsed:7.2f} ms/page ({len(rows)} rows)")
@@ -0,0 +1,148 @@
+"""
+코스피/코스닥 전 종목 퀀트 순위 스캔 (로컬 주가 저장소 + 프로세스 풀 + 공유 메모리)
+
+  python market_ranker.py                 # 저장소 동기화 후 전 종목 분석, 상위 20개를 트렌드 후보로 등록
+  python market_ranker.py --no-sync       # 네트워크 없이 저장된 봉만으로 분석
+  python market_ranker.py --top 30 --workers 8 --dry-run
+"""
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from utils import init_connection, fix_encoding, bulk_sync_keywords
+from ticker_resolver import get_listing, SUFFIX
+from price_store import get_store, period_start
+from quant_analyzer import analyze_panel, PANEL_FIELDS
+import telemetry
+
+TOP_N = 20
+MIN_BARS = 120          # 이평선 배열까지 모든 지표가 계산되는 최소 봉 수
+RANK_COLUMNS = ["score", "volume_ratio", "position_52w"]   # 정렬 우선순위 (모두 내림차순)
+
+# --- 공유 메모리 블록 (종목 x 날짜 x 필드 float64) ---
+def build_block(frames):
+    """
+    {티커: OHLCV} -> (공유 메모리, 배열, 티커 목록)
+    날짜는 전 종목 합집합, 봉이 없는 칸은 NaN (analyze_panel이 종목별로 아래 정렬)
+    """
+    tickers = list(frames)
+    dates = pd.DatetimeIndex(np.unique(np.concatenate([df.index.to_numpy() for df in frames.values()]))) if frames else pd.DatetimeIndex([])
+    shape = (len(tickers), len(dates), len(PANEL_FIELDS))
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    block.fill(np.nan)
+    for i, ticker in enumerate(tickers):
+        df = frames[ticker]
+        block[i, dates.get_indexer(df.index)] = df[list(PANEL_FIELDS)].to_numpy(dtype=float)
+    return shm, block, tickers
+
+_worker = {}
+
+def _attach(name, shape):
+    """작업 프로세스 시작 시 1회: 공유 메모리에 연결 (프레임 피클 전송 없음)"""
+    shm = shared_memory.SharedMemory(name=name)
+    _worker["shm"] = shm
+    _worker["block"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+def _analyze_slice(start, stop, tickers):
+    return analyze_panel(_worker["block"][start:stop], tickers=tickers)
+
+def analyze_block(block, tickers, shm_name=None, workers=None, chunk_size=None):
+    """종목 구간을 나눠 프로세스 풀에서 analyze_panel 실행 (workers=1이면 현재 프로세스)"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tickers) == 0:
+        return analyze_panel(block, tickers=tickers)
+    # 코어당 4개 정도로 나눠 느린 구간이 있어도 고르게 분배
+    chunk_size = chunk_size or max(1, -(-len(tickers) // (workers * 4)))
+    bounds = [(i, min(i + chunk_size, len(tickers))) for i in range(0, len(tickers), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm_name, block.shape)) as pool:
+        parts = list(pool.map(_analyze_slice, *zip(*[(a, b, tickers[a:b]) for a, b in bounds])))
+    parts = [p for p in parts if not p.empty]
+    return pd.concat(parts) if parts else pd.DataFrame()
+
+# --- 종목 / 주가 ---
+def market_universe(listing=None):
+    """{티커: (종목명, 시장)} - 종목표의 코스피/코스닥 전 종목"""
+    listing = listing if listing is not None else get_listing()
+    return {
+        code + SUFFIX[entry["market"]]: (entry.get("name"), entry["market"])
+        for code, entry in listing.items() if entry.get("market") in SUFFIX
+    }
+
+def load_prices(tickers, period="1y", sync=True):
+    """저장소 동기화(선택) 후 저장된 봉 로드: ({티커: DataFrame}, 실패 수)"""
+    store = get_store()
+    failures = store.sync(tickers, period=period, max_age=12 * 3600) if sync else {}
+    start = period_start(period)
+    frames = {}
+    for ticker in tickers:
+        df = store.load(ticker, start=start)
+        if not df.empty:
+            frames[ticker] = df
+    return frames, len(failures)
+
+def rank(panel, min_bars=MIN_BARS):
+    """점수 -> 거래량 비율 -> 52주 위치 순 내림차순 (지표가 다 계산된 종목만)"""
+    if panel.empty: return panel
+    ranked = panel[panel["data_points"] >= min_bars]
+    return ranked.sort_values(RANK_COLUMNS, ascending=False, na_position="last")
+
+def run(top=TOP_N, period="1y", sync=True, workers=None, dry_run=False):
+    fix_encoding()
+    start = time.perf_counter()
+    with telemetry.span("listing"):
+        universe = market_universe()
+    if not universe:
+        print("❌ KRX 종목표가 비어 있습니다. (python ticker_resolver.py 로 갱신)")
+        return pd.DataFrame()
+    tickers = list(universe)
+    print(f"📋 [Ranker] 전 종목 {len(tickers)}개 (코스피/코스닥)")
+
+    with telemetry.span("price_fetch", tickers=len(tickers)):
+        frames, failed = load_prices(tickers, period, sync)
+    print(f"  -> 주가 {len(frames)}종목 로드 (동기화 실패 {failed}건, {time.perf_counter() - start:.1f}s)")
+
+    with telemetry.span("analyze", tickers=len(frames)):
+        shm, block, names = build_block(frames)
+        try:
+            panel = analyze_block(block, names, shm.name, workers)
+        finally:
+            del block
+            shm.close()
+            shm.unlink()
+    ranked = rank(panel)
+    print(f"  -> 분석 {len(panel)}종목 / 순위 대상 {len(ranked)}종목 ({time.perf_counter() - start:.1f}s, workers={workers or os.cpu_count()})")
+
+    best = ranked.head(top)
+    candidates = []
+    for ticker, row in best.iterrows():
+        name, market = universe[ticker]
+        vol = f"{row['volume_ratio']:.0f}%" if pd.notna(row['volume_ratio']) else "-"
+        print(f"  {int(row['score']):>3}점 | 수급 {vol:>6} | 52주 {row['position_52w']:>5.1f}% | {name} ({ticker}, {market})")
+        if name:
+            candidates.append({"keyword": name, "ticker": ticker})
+
+    if candidates and not dry_run:
+        with telemetry.span("db"):
+            # 신규는 is_fixed 기본값으로 등록, 사용자가 고정한 종목은 그대로 유지
+            counts = bulk_sync_keywords(candidates, init_connection(), update_ticker=True)
+        print(f"  DB: 신규 {counts['inserted']} | 재활성 {counts['reactivated']} | 갱신 {counts['updated']} | 변경없음 {counts['unchanged']}")
+    telemetry.finish_batch("market_ranker")
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="코스피/코스닥 전 종목 퀀트 순위 스캔")
+    parser.add_argument("--top", type=int, default=TOP_N)
+    parser.add_argument("--period", default="1y")
+    parser.add_argument("--workers", type=int, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--no-sync", action="store_true", help="네트워크 동기화 없이 저장된 봉만 사용")
+    parser.add_argument("--dry-run", action="store_true", help="DB에 쓰지 않고 순위만 출력")
+    args = parser.parse_args(argv)
+    run(args.top, args.period, not args.no_sync, args.workers, args.dry_run)
+
+if __name__ == "__main__":
+    main()
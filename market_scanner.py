@@ -1,10 +1,9 @@
 import os
-import requests
-import re
-from bs4 import BeautifulSoup
+import http_client
+from listing_parser import parse_naver_listing
 from dotenv import load_dotenv
-from supabase import create_client, Client
-import yfinance as yf # ★ 검증용으로 추가
+from utils import init_connection, bulk_sync_keywords
+from ticker_resolver import resolve_ticker
 
 # 1. 환경변수 로드
 load_dotenv()
@@ -14,23 +13,9 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 def find_correct_ticker(code):
     """
     ★ [핵심 기능] 코스피(.KS)인지 코스닥(.KQ)인지 자동 판별
+    (로컬 KRX 종목표 O(1) 조회, 종목표에 없는 코드만 실시간 확인)
     """
-    # 1. 코스피(.KS)라고 가정하고 찔러보기
-    ks_ticker = f"{code}.KS"
-    try:
-        if yf.Ticker(ks_ticker).fast_info.last_price:
-            return ks_ticker
-    except: pass
-    
-    # 2. 안 되면 코스닥(.KQ)으로 찔러보기
-    kq_ticker = f"{code}.KQ"
-    try:
-        if yf.Ticker(kq_ticker).fast_info.last_price:
-            return kq_ticker
-    except: pass
-    
-    # 둘 다 안 되면 그냥 원본 반환 (나중에라도 수동 확인용)
-    return ks_ticker
+    return resolve_ticker(code)
 
 def get_trending_stocks(limit=5):
     """
@@ -41,28 +26,16 @@ def get_trending_stocks(limit=5):
     trending = []
     
     try:
-        res = requests.get(url, timeout=5)
-        soup = BeautifulSoup(res.text, "html.parser")
-        rows = soup.select(".type_5 tr")
-        
-        for row in rows:
-            title_tag = row.select_one("a.tltle")
-            if title_tag:
-                name = title_tag.get_text().strip()
-                href = title_tag['href']
-                code_match = re.search(r'code=(\d+)', href)
-                
-                if code_match:
-                    raw_code = code_match.group(1)
-                    
-                    # ★ 여기서 검증 들어갑니다!
-                    real_ticker = find_correct_ticker(raw_code)
-                    
-                    trending.append({"keyword": name, "ticker": real_ticker})
-                    print(f"  🔥 발견(Top {len(trending)+1}): {name} -> {real_ticker} (검증완료)")
-                
-                if len(trending) >= limit: 
-                    break
+        res = http_client.get(url, timeout=5, conditional=True)
+        for row in parse_naver_listing(res.text, table_class="type_5"):
+            # ★ 여기서 검증 들어갑니다!
+            real_ticker = find_correct_ticker(row.code)
+
+            trending.append({"keyword": row.name, "ticker": real_ticker})
+            print(f"  🔥 발견(Top {len(trending)+1}): {row.name} -> {real_ticker} (검증완료)")
+
+            if len(trending) >= limit: 
+                break
                     
     except Exception as e:
         print(f"❌ 크롤링 실패: {e}")
@@ -75,33 +48,14 @@ def update_database(stock_list):
         print("⚠️ Supabase 키가 없습니다.")
         return
 
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
     print(f"\n💾 [DB Sync] 데이터 동기화 중 ({len(stock_list)}개)...")
     
-    for item in stock_list:
-        keyword = item['keyword']
-        ticker = item['ticker']
-        
-        try:
-            # 1. 이미 존재하는지 확인
-            res = supabase.table('keywords').select("*").eq('keyword', keyword).execute()
-            
-            if res.data:
-                # 존재하면 깨우기
-                existing_id = res.data[0]['id']
-                supabase.table('keywords').update({'is_active': True}).eq('id', existing_id).execute()
-                print(f"  ✅ [Wake Up] '{keyword}' 활성화")
-            else:
-                # 없으면 신규 등록
-                supabase.table('keywords').insert({
-                    "keyword": keyword,
-                    "ticker": ticker, 
-                    "is_active": True
-                }).execute()
-                print(f"  ✨ [New] '{keyword}' ({ticker}) 등록 완료")
-                
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
+    try:
+        # 기존 종목은 깨우기만 (티커/고정 여부 유지), 없으면 신규 등록
+        counts = bulk_sync_keywords(stock_list, init_connection())
+        print(f"  ✨ [New] {counts['inserted']}개 | ✅ [Wake Up] {counts['reactivated']}개 | 갱신 {counts['updated']}개 | 변경없음 {counts['unchanged']}개")
+    except Exception as e:
+        print(f"  ❌ Error: {e}")
 
 if __name__ == "__main__":
     # 상위 5개 정도 넉넉하게 스캔
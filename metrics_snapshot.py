@@ -0,0 +1,108 @@
+import sys
+import math
+import datetime
+
+from utils import init_connection, fix_encoding, get_active_targets
+from price_store import load_histories
+from quant_analyzer import analyze_panel, panel_row_to_metrics
+
+# 종목별 지표 스냅샷 (Supabase metrics_snapshot 테이블, 티커당 최신 봉 1행)
+# 마지막 봉 날짜와 종가가 같으면 저장된 지표를 재사용 -> 새 봉(또는 장중 종가 변경)이 생긴 종목만 재계산
+TABLE = "metrics_snapshot"
+READ_CHUNK = 200   # in_() 필터 URL 길이 제한 대비
+
+def _plain(value):
+    """numpy 스칼라 / NaN -> JSON 저장 가능한 파이썬 값"""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+def last_bar(df):
+    """(마지막 봉 날짜 'YYYY-MM-DD', 마지막 종가)"""
+    return df.index[-1].date().isoformat(), float(df['Close'].iloc[-1])
+
+def is_fresh(row, df):
+    if not row: return False
+    bar_date, close = last_bar(df)
+    saved = row.get("close")
+    return row.get("bar_date") == bar_date and saved is not None and math.isclose(saved, close, rel_tol=1e-9)
+
+def build_rows(frames):
+    """analyze_panel 한 번으로 여러 종목의 스냅샷 행 생성"""
+    panel = analyze_panel(frames)
+    computed_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    rows = []
+    for ticker in panel.index:
+        df = frames[ticker]
+        close = df['Close']
+        metrics = _plain(panel_row_to_metrics(panel.loc[ticker]))
+        change_pct = ((close.iloc[-1] - close.iloc[-2]) / close.iloc[-2]) * 100 if len(close) >= 2 else 0.0
+        bar_date, last = last_bar(df)
+        rows.append({
+            "ticker": ticker, "bar_date": bar_date, "close": last,
+            "change_pct": _plain(float(change_pct)), "score": metrics["score"],
+            "metrics": metrics, "computed_at": computed_at,
+        })
+    return rows
+
+def load_snapshots(tickers, supabase):
+    """{티커: 스냅샷 행}"""
+    tickers = list(tickers)
+    if not supabase or not tickers: return {}
+    rows = {}
+    for i in range(0, len(tickers), READ_CHUNK):
+        res = supabase.table(TABLE).select("*").in_("ticker", tickers[i:i + READ_CHUNK]).execute()
+        rows.update({r["ticker"]: r for r in res.data or []})
+    return rows
+
+def snapshot_metrics(frames, supabase=None, write=True):
+    """
+    주가 이력으로 최신 스냅샷 확인 후 오래된 종목만 재계산 + upsert
+    반환: {티커: {"price", "change", "metrics"(analyze_stock 형태), "bar_date", "cached"}}
+    - supabase가 없으면 저장 없이 전체 계산 (기존 동작)
+    """
+    frames = {t: df for t, df in frames.items() if df is not None and not df.empty}
+    if not frames: return {}
+    try:
+        existing = load_snapshots(frames, supabase)
+    except Exception as e:
+        print(f"⚠️ 지표 스냅샷 조회 실패 (전체 재계산): {e}")
+        existing = {}
+
+    fresh = {t: row for t, row in existing.items() if t in frames and is_fresh(row, frames[t])}
+    stale = {t: df for t, df in frames.items() if t not in fresh}
+    rows = build_rows(stale) if stale else []
+    if rows and write and supabase:
+        try:
+            supabase.table(TABLE).upsert(rows, on_conflict="ticker").execute()
+        except Exception as e:
+            print(f"⚠️ 지표 스냅샷 저장 실패: {e}")
+
+    result = {}
+    for row, cached in [(r, True) for r in fresh.values()] + [(r, False) for r in rows]:
+        result[row["ticker"]] = {
+            "price": row["close"], "change": row["change_pct"] or 0.0,
+            "metrics": row["metrics"], "bar_date": row["bar_date"], "cached": cached,
+        }
+    return result
+
+def refresh(period="1y"):
+    """활성 종목 전체 스냅샷 갱신 (새 봉이 생긴 종목만 계산)"""
+    fix_encoding()
+    supabase = init_connection()
+    if not supabase:
+        print("❌ DB 연결 실패")
+        return {}
+    tickers = list(dict.fromkeys(t['ticker'] for t in get_active_targets(supabase) if t.get('ticker')))
+    frames, failures = load_histories(tickers, period=period)
+    result = snapshot_metrics(frames, supabase)
+    cached = sum(1 for v in result.values() if v["cached"])
+    print(f"🧮 [Snapshot] {len(tickers)}개 종목: 재사용 {cached} / 재계산 {len(result) - cached} / 수집 실패 {len(failures)}")
+    return result
+
+if __name__ == "__main__":
+    refresh(sys.argv[1] if len(sys.argv) > 1 else "1y")
@@ -1,16 +1,21 @@
 import os
 import sys
-import requests
+import http_client
+import news_dedup
 import urllib.parse
 from bs4 import BeautifulSoup
 from newspaper import Article
-from google import genai
+from gemini_client import get_summarizer
+from telegram_sender import get_sender
 from dotenv import load_dotenv
 import trafilatura
 import time
 import datetime
 import yfinance as yf
 from supabase import create_client, Client
+from types import SimpleNamespace
+from price_store import load_histories
+from article_cache import get_cache as get_article_cache
 
 # 1. 환경변수 및 키 로드
 load_dotenv()
@@ -24,13 +29,12 @@ SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY) if SUPABASE_URL and SUPABASE_KEY else None
 
 def send_telegram(text):
-    if not TOKEN or not CHAT_ID: return
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-    data = {"chat_id": CHAT_ID, "text": text, "parse_mode": "HTML", "disable_web_page_preview": "true"}
+    if not TOKEN or not CHAT_ID: return False
     try:
-        requests.post(url, data=data)
+        return get_sender(TOKEN).send(CHAT_ID, text).result()
     except Exception as e:
         print(f"전송 실패: {e}")
+        return False
 
 def get_db_data():
     """
@@ -61,14 +65,28 @@ def get_db_data():
         print(f"❌ DB 조회 실패: {e}")
         return [], {}
 
-def get_stock_info(keyword, ticker_map):
-    """주가 정보 조회"""
+def fast_info_from_history(df):
+    """일괄 수집된 1년치 이력에서 fast_info와 같은 항목 계산"""
+    if df is None or df.empty: return None
+    last = df.iloc[-1]
+    return SimpleNamespace(
+        last_price=last['Close'],
+        previous_close=df['Close'].iloc[-2] if len(df) >= 2 else last['Close'],
+        day_high=last['High'], day_low=last['Low'],
+        year_high=df['High'].max(), year_low=df['Low'].min(),
+        last_volume=last['Volume'],
+        three_month_average_volume=df['Volume'].iloc[-63:].mean(),
+    )
+
+def get_stock_info(keyword, ticker_map, history_map=None):
+    """주가 정보 조회 (일괄 수집된 이력이 있으면 네트워크 요청 없이 계산)"""
     ticker = ticker_map.get(keyword)
     if not ticker: return ""
 
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.fast_info
+        info = fast_info_from_history(history_map.get(ticker)) if history_map else None
+        if info is None:
+            info = yf.Ticker(ticker).fast_info
         
         price = info.last_price
         if price is None: return "" # 데이터 없음
@@ -126,25 +144,34 @@ def get_stock_info(keyword, ticker_map):
 # (뉴스 수집 및 AI 요약 함수들 - 기존과 동일하지만 전체 코드 유지를 위해 포함)
 def get_final_url(url):
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        return requests.head(url, headers=headers, allow_redirects=True, timeout=3).url
+        return http_client.head(url, timeout=3, retries=1).url
     except: return url
 
-def get_article_content(url):
-    if "news.google.com" in url: url = get_final_url(url)
+def extract_article(url):
     try:
         d = trafilatura.fetch_url(url)
         if d: 
             t = trafilatura.extract(d, include_comments=False, include_tables=False)
-            if t and len(t)>50: return t[:1000], "Trafilatura"
+            if t and len(t)>50: return t, "Trafilatura"
     except: pass
     try:
         a = Article(url, language='ko')
         a.download(); a.parse()
-        if len(a.text)>50: return a.text[:1000], "Newspaper"
+        if len(a.text)>50: return a.text, "Newspaper"
     except: pass
     return None, "Fail"
 
+def resolve_article_url(url):
+    return get_final_url(url) if "news.google.com" in url else url
+
+def get_article_content(url):
+    # 실제 기사 URL 기준 캐시 (bot.py와 공유)
+    t, source = get_article_cache().get_or_extract(url, extract_article, resolve=resolve_article_url)
+    return (t[:1000], source) if t else (None, source)
+
+PER_ENGINE = 3      # 엔진별 기사 수 (구글 3 + 빙 3)
+FEED_POOL = 10      # 중복 제거 후에도 엔진별 개수를 채우도록 넉넉히 읽는 후보 수
+
 def fetch_rss_items(keyword):
     encoded = urllib.parse.quote(keyword)
     items = []
@@ -155,32 +182,37 @@ def fetch_rss_items(keyword):
     ]
     for url in urls:
         try:
-            res = requests.get(url, timeout=3)
+            res = http_client.get(url, timeout=3, conditional=True)
             soup = BeautifulSoup(res.text, "xml")
-            for item in soup.find_all("item")[:3]: # 각 엔진별 상위 3개
+            for item in soup.find_all("item")[:FEED_POOL]:
                 snip = BeautifulSoup(item.description.get_text(), "html.parser").get_text() if item.description else ""
-                items.append({"title": item.title.get_text(), "link": item.link.get_text(), "snippet": snip})
+                items.append({"title": item.title.get_text(), "link": item.link.get_text(), "snippet": snip, "engine": url})
         except: pass
-    return items
+    # 구글/빙 중복 보도는 대표 1건만 (본문 추출/AI 입력 절감) -> 중복을 뺀 뒤 엔진별 상위 3개
+    reps = news_dedup.cluster_items(items)[0]
+    return [
+        {k: v for k, v in rep.items() if k != "engine"}
+        for url in urls
+        for rep in [r for r in reps if r["engine"] == url][:PER_ENGINE]
+    ]
 
 def get_gemini_summary(keyword, text_data):
     if not GEMINI_API_KEY: return "⚠️ API 키 없음"
     try:
-        client = genai.Client(api_key=GEMINI_API_KEY)
         prompt = f"""
         너는 전문 금융 비서야. '{keyword}' 뉴스 데이터를 보고 브리핑해줘.
         [Part 1: ⚡ 3줄 핵심] 이모지 필수, 숫자(금액/%)는 <b>태그로 굵게.
         [Part 2: 📝 상세 흐름] 300자 내외, 해요체.
         [뉴스 데이터] {text_data}
         """
-        return client.models.generate_content(model="gemini-2.0-flash", contents=prompt).text
+        return get_summarizer(GEMINI_API_KEY).generate(prompt)
     except Exception as e: return f"AI Error: {e}"
 
-def process_keyword(keyword, ticker_map):
+def process_keyword(keyword, ticker_map, history_map=None):
     print(f"🚀 '{keyword}' 분석 중...")
     today = datetime.datetime.now().strftime("%y/%m/%d")
     
-    stock_msg = get_stock_info(keyword, ticker_map)
+    stock_msg = get_stock_info(keyword, ticker_map, history_map)
     news_items = fetch_rss_items(keyword)
     
     if not news_items: 
@@ -215,6 +247,7 @@ if __name__ == "__main__":
     if not target_list:
         print("💤 활성화된 키워드가 없습니다.")
     else:
+        history_mapping, _ = load_histories(ticker_mapping.values(), period="1y")
         for word in target_list:
-            process_keyword(word, ticker_mapping)
+            process_keyword(word, ticker_mapping, history_mapping)
             time.sleep(3)
\ No newline at end of file
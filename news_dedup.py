@@ -0,0 +1,110 @@
+import re
+import zlib
+import threading
+import numpy as np
+
+# 유사 기사 묶기 (구글/빙이 같은 통신사 기사를 제목/리다이렉트 링크만 바꿔 내보내는 경우)
+# 정규화한 제목, 제목+요약의 문자 n-gram MinHash로 Jaccard 유사도를 추정 -> 묶음마다 대표 1건만 본문 추출/AI 입력
+SHINGLE = 3             # 문자 n-gram 길이 (한글은 띄어쓰기/조사 편차가 커서 공백 제거 후 문자 단위)
+NUM_PERM = 128          # MinHash 해시 수 (추정 오차 약 ±0.045)
+TITLE_THRESHOLD = 0.6   # 제목끼리 이 이상이면 같은 기사
+TEXT_THRESHOLD = 0.5    # 제목+요약끼리 이 이상이면 같은 기사
+CHARS_PER_TOKEN = 2.5   # 한국어 기사 기준 대략적인 문자/토큰 비율 (절감량 추정용)
+PROMPT_CHARS = 1500     # 기사 1건이 AI 입력에 차지하는 최대 본문 길이 (bot.get_article_content 상한)
+
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(20261017)   # 고정 시드: 실행마다 같은 서명
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+_BRACKETS = re.compile(r"\[[^\]]*\]|【[^】]*】|\([^)]*\)")
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–]\s+[^-|–]{1,30}$")   # "제목 - 한국경제" 형태의 언론사 꼬리
+_NON_WORD = re.compile(r"[^\w]+")
+
+def normalize(text):
+    """소문자화, 언론사 꼬리/괄호 머리말([속보] 등) 제거, 공백/기호 제거"""
+    text = _SOURCE_SUFFIX.sub("", (text or "").strip())
+    text = _BRACKETS.sub(" ", text.lower())
+    return _NON_WORD.sub("", text).replace("_", "")
+
+def shingles(text, size=SHINGLE):
+    """정규화된 문자열 -> 문자 n-gram 해시 배열 (짧으면 문자열 전체 1개)"""
+    if not text: return np.zeros(0, dtype=np.uint64)
+    grams = {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+def minhash(hashes):
+    """(a*h + b) mod (2^61-1) 해시 NUM_PERM개의 최솟값 (a, h < 2^32 이라 곱이 넘치지 않음)"""
+    if len(hashes) == 0: return None
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+def similarity(a, b):
+    """서명 일치 비율 = Jaccard 추정치 (빈 텍스트는 0)"""
+    if a is None or b is None: return 0.0
+    return float(np.mean(a == b))
+
+def estimate_tokens(text):
+    return int(round(len(text or "") / CHARS_PER_TOKEN))
+
+def _signatures(item):
+    title = normalize(item.get("title"))
+    snippet = normalize(item.get("snippet"))
+    # 구글 요약은 제목 + 언론사라 요약이 제목으로 시작하면 제목만 비교
+    text = title + snippet[len(title):] if snippet.startswith(title) else title + snippet
+    return minhash(shingles(title)), minhash(shingles(text))
+
+def cluster_items(items, limit=None):
+    """
+    기사 목록 -> (대표 기사 목록, 통계)
+    - 입력 순서(구글 -> 빙)대로 앞선 대표와 비교해 같은 기사면 그 묶음에 합침 (대표는 먼저 나온 기사)
+    - 대표에는 cluster_size(같은 기사 수)와 sources(보도한 검색 엔진) 추가
+    - limit: 이후 잘라 쓸 개수 (통계는 중복 제거 전 limit개 중 빠진 기사 기준)
+    통계: {"items", "clusters", "extractions_saved", "tokens_saved"(추정)}
+    """
+    reps, signatures, members = [], [], []
+    for index, item in enumerate(items):
+        title_sig, text_sig = _signatures(item)
+        for k, (rep_title, rep_text) in enumerate(signatures):
+            if (item.get("link") == reps[k].get("link")
+                    or similarity(title_sig, rep_title) >= TITLE_THRESHOLD
+                    or similarity(text_sig, rep_text) >= TEXT_THRESHOLD):
+                members[k].append(index)
+                break
+        else:
+            reps.append(item)
+            signatures.append((title_sig, text_sig))
+            members.append([index])
+
+    result = []
+    for rep, group in zip(reps, members):
+        sources = list(dict.fromkeys(items[i].get("source") for i in group if items[i].get("source")))
+        result.append({**rep, "cluster_size": len(group), "sources": sources})
+
+    head = len(items) if limit is None else min(limit, len(items))
+    dropped = [items[i] for group in members for i in group[1:] if i < head]
+    stats = {
+        "items": len(items),
+        "clusters": len(reps),
+        "extractions_saved": len(dropped),
+        "tokens_saved": sum(estimate_tokens(item.get("title")) + int(PROMPT_CHARS / CHARS_PER_TOKEN) for item in dropped),
+    }
+    _record(stats)
+    return (result if limit is None else result[:limit]), stats
+
+# --- 배치 누적 통계 ---
+_lock = threading.Lock()
+_totals = {"items": 0, "clusters": 0, "extractions_saved": 0, "tokens_saved": 0}
+
+def _record(stats):
+    with _lock:
+        for key in _totals:
+            _totals[key] += stats[key]
+
+def totals():
+    with _lock:
+        return dict(_totals)
+
+def reset():
+    with _lock:
+        for key in _totals:
+            _totals[key] = 0
@@ -8,7 +8,7 @@ st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 try:
     # 상위 폴더 경로 추가
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from utils import init_connection, fetch_stock_data, get_links
+    from utils import init_connection, fetch_watchlist_data, get_links, paginated_keywords, downsample_series
     import bot
 except ImportError as e:
     st.error(f"🚨 모듈을 찾을 수 없습니다! utils.py나 bot.py가 BrianAI 폴더에 있는지 확인하세요.\n에러 내용: {e}")
@@ -47,47 +47,53 @@ if supabase:
             supabase.table('keywords').delete().eq('id', id).execute()
             st.rerun()
 
-        # 데이터 가져오기
-        response = supabase.table('keywords').select("*").order('id', desc=True).execute()
-        df = pd.DataFrame(response.data)
+        # 목록 필터 (검색어 / 활성만 / 페이지 크기)
+        f1, f2, f3 = st.columns([3, 1, 1])
+        search = f1.text_input("🔍 Search", key="dash_search").strip() or None
+        active_only = f2.checkbox("Active only", key="dash_active")
+        page_size = f3.selectbox("Page size", [10, 20, 50, 100], index=1, key="dash_size")
 
-        if not df.empty:
-            tab1, tab2 = st.tabs(["🔒 Fixed Interest", "🔥 Trending Now"])
+        tab1, tab2 = st.tabs(["🔒 Fixed Interest", "🔥 Trending Now"])
 
-            def render_list(target_df, key_prefix):
-                if target_df.empty:
-                    st.info("데이터가 없습니다.")
-                    return
+        def render_list(target_df, key_prefix):
+            if target_df.empty:
+                st.info("데이터가 없습니다.")
+                return
+
+            # 현재 페이지 종목 주가를 한 번에 수집 + 벡터 분석 (10분 캐시)
+            tickers = tuple(target_df['ticker'].dropna().unique()) if 'ticker' in target_df.columns else ()
+            with st.spinner(f"{len(tickers)}개 종목 데이터를 불러오는 중..."):
+                batch = fetch_watchlist_data(tickers)
+            
+            for _, row in target_df.iterrows():
+                data = batch.get(row['ticker']) if row.get('ticker') else None
+                
+                label = f"**{row['keyword']}**"
+                if data:
+                    color = "🔴" if data['change'] > 0 else "🔵"
+                    rsi_val = data['rsi'] if data['rsi'] is not None else 50
+                    rsi_txt = "🔥과열" if rsi_val >= 70 else "❄️침체" if rsi_val <= 30 else "중립"
+                    label += f" | {data['price']:,.0f} ({color} {data['change']:.1f}%) | RSI: {rsi_val:.0f}({rsi_txt})"
+                else:
+                    label += " | ⏳ 데이터 로딩 중..."
                 
-                for _, row in target_df.iterrows():
-                    data = fetch_stock_data(row['ticker'])
-                    
-                    label = f"**{row['keyword']}**"
-                    if data:
-                        color = "🔴" if data['change'] > 0 else "🔵"
-                        rsi_val = data['rsi'] if data['rsi'] is not None else 50
-                        rsi_txt = "🔥과열" if rsi_val >= 70 else "❄️침체" if rsi_val <= 30 else "중립"
-                        label += f" | {data['price']:,.0f} ({color} {data['change']:.1f}%) | RSI: {rsi_val:.0f}({rsi_txt})"
-                    else:
-                        label += " | ⏳ 데이터 로딩 중..."
-                    
-                    with st.expander(label):
-                        c1, c2 = st.columns([3, 1])
-                        with c1:
-                            if data and 'history' in data: 
-                                st.line_chart(data['history']['Close'], height=200)
-                        with c2:
-                            s_link, n_link = get_links(row['keyword'], row['ticker'])
-                            st.markdown(f"[금융정보]({s_link}) | [뉴스검색]({n_link})")
-                            st.divider()
-                            on = st.toggle("Active", value=row['is_active'], key=f"{key_prefix}_{row['id']}")
-                            if on != row['is_active']: toggle(row['id'], row['is_active'])
-                            if st.button("Delete", key=f"del_{key_prefix}_{row['id']}"): delete(row['id'])
+                with st.expander(label):
+                    c1, c2 = st.columns([3, 1])
+                    with c1:
+                        # 차트는 요청할 때만 그림
+                        if data and 'history' in data and st.toggle("📈 차트 보기", key=f"chart_{key_prefix}_{row['id']}"):
+                            st.line_chart(downsample_series(data['history']['Close']), height=200)
+                    with c2:
+                        s_link, n_link = get_links(row['keyword'], row['ticker'])
+                        st.markdown(f"[금융정보]({s_link}) | [뉴스검색]({n_link})")
+                        st.divider()
+                        on = st.toggle("Active", value=row['is_active'], key=f"{key_prefix}_{row['id']}")
+                        if on != row['is_active']: toggle(row['id'], row['is_active'])
+                        if st.button("Delete", key=f"del_{key_prefix}_{row['id']}"): delete(row['id'])
 
-            with tab1: render_list(df[df['is_fixed']==True] if 'is_fixed' in df.columns else df, "fix")
-            with tab2: render_list(df[df['is_fixed']==False] if 'is_fixed' in df.columns else pd.DataFrame(), "trd")
-        else:
-            st.info("데이터베이스에 등록된 종목이 없습니다. 'Add Target' 메뉴에서 추가해주세요.")
+        # id 기준 keyset 페이지 단위로 조회
+        with tab1: render_list(paginated_keywords(supabase, "dash_fix", page_size, True, search, active_only), "fix")
+        with tab2: render_list(paginated_keywords(supabase, "dash_trd", page_size, False, search, active_only), "trd")
 
     except Exception as e:
         st.error(f"데이터를 불러오는 중 에러가 발생했습니다:\n{e}")
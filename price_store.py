@@ -0,0 +1,212 @@
+import os
+import sys
+import sqlite3
+import datetime
+from contextlib import contextmanager
+import pandas as pd
+
+from utils import fetch_bulk_history, fix_encoding, get_active_targets
+
+# 로컬 주가 저장소 (SQLite, 종목별 (ticker, date) 클러스터링)
+DEFAULT_PATH = os.environ.get(
+    "PRICE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices.db"),
+)
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+PERIOD_DAYS = {"5d": 7, "1mo": 31, "3mo": 92, "6mo": 183, "1y": 366, "2y": 731, "5y": 1827, "10y": 3653}
+OVERLAP_DAYS = 10       # 분할/수정주가 검증용 재확인 구간 (달력일)
+OVERLAP_TOLERANCE = 1e-3  # 재확인 구간 종가 허용 오차 (상대값)
+NO_DATA = "데이터 없음"    # fetch_bulk_history 실패 사유: 요청 구간에 봉이 없음 (네트워크 오류와 구분)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ohlcv (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL, volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_log (
+    ticker TEXT PRIMARY KEY,
+    covered_from TEXT,
+    synced_at TEXT
+);
+"""
+
+def period_start(period, today=None):
+    """yfinance period 문자열 -> 시작일 (max는 None)"""
+    if not period or period == "max": return None
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=PERIOD_DAYS.get(period, 366))
+
+class PriceStore:
+    """
+    OHLCV 로컬 저장소
+    - sync(): 마지막 저장일 이후 봉만 받아 병합 (겹치는 구간 종가가 다르면 전체 재수집)
+    - load(): 저장된 봉을 analyze_stock이 기대하는 DataFrame으로 반환
+    """
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, ticker, start=None):
+        query = "SELECT date, open, high, low, close, volume FROM ohlcv WHERE ticker = ?"
+        params = [ticker]
+        if start:
+            query += " AND date >= ?"
+            params.append(str(start))
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY date", params).fetchall()
+        df = pd.DataFrame(rows, columns=["Date"] + COLUMNS)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("Date")), name="Date")
+        return df
+
+    def save(self, ticker, df, replace=False, covered_from=None):
+        df = df.dropna(subset=["Close"])
+        rows = [
+            (ticker, idx.strftime("%Y-%m-%d"), *(None if pd.isna(row[c]) else float(row[c]) for c in COLUMNS))
+            for idx, row in df[COLUMNS].iterrows()
+        ]
+        with self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM ohlcv WHERE ticker = ?", (ticker,))
+            conn.executemany("INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            status = self.status(ticker, conn)
+            covered = str(covered_from) if covered_from else status["covered_from"]
+            if covered is None and rows:
+                covered = rows[0][1]
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_log VALUES (?, ?, ?)",
+                (ticker, covered, datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def touch(self, ticker):
+        """저장분 변경 없이 동기화 시각만 갱신"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE sync_log SET synced_at = ? WHERE ticker = ?",
+                (datetime.datetime.now().isoformat(timespec="seconds"), ticker),
+            )
+
+    def status(self, ticker, conn=None):
+        if conn is None:
+            with self._connect() as conn:
+                return self.status(ticker, conn)
+        last = conn.execute("SELECT MAX(date) FROM ohlcv WHERE ticker = ?", (ticker,)).fetchone()[0]
+        log = conn.execute("SELECT covered_from, synced_at FROM sync_log WHERE ticker = ?", (ticker,)).fetchone()
+        return {
+            "last_date": last,
+            "covered_from": log[0] if log else None,
+            "synced_at": datetime.datetime.fromisoformat(log[1]) if log and log[1] else None,
+        }
+
+    def _overlap_matches(self, ticker, fresh, last_date):
+        """재확인 구간(마지막 저장일 제외)의 종가가 저장값과 같은지 확인"""
+        stored = self.load(ticker, start=fresh.index.min().strftime("%Y-%m-%d"))
+        stored = stored[stored.index < pd.Timestamp(last_date)]
+        common = stored.index.intersection(fresh.index)
+        if common.empty: return True
+        old, new = stored.loc[common, "Close"], fresh.loc[common, "Close"]
+        return bool(((old - new).abs() <= old.abs() * OVERLAP_TOLERANCE).all())
+
+    def sync(self, tickers, period="1y", max_age=600, chunk_size=50, max_workers=4):
+        """
+        종목들의 저장분을 최신화
+        - 저장분 없음 / 요청 기간이 저장 범위보다 김 -> period 전체 수집
+        - 그 외 -> 마지막 저장일 - OVERLAP_DAYS 이후만 수집
+        - max_age초 이내에 동기화된 종목은 건너뜀 (백필 재개 시에도 사용)
+        반환: {티커: 실패 사유}
+        """
+        start = period_start(period)
+        now = datetime.datetime.now()
+        full, delta = [], {}
+        for ticker in dict.fromkeys(t for t in tickers if t):
+            st = self.status(ticker)
+            covered = st["covered_from"] is not None and (start is None or st["covered_from"] <= str(start))
+            if st["last_date"] is None or not covered:
+                full.append(ticker)
+            elif st["synced_at"] is None or (now - st["synced_at"]).total_seconds() > max_age:
+                since = datetime.date.fromisoformat(st["last_date"]) - datetime.timedelta(days=OVERLAP_DAYS)
+                delta.setdefault((since.isoformat(), st["last_date"]), []).append(ticker)
+
+        failures = {}
+        for (since, last_date), group in delta.items():
+            frames, errors = fetch_bulk_history(group, start=since, chunk_size=chunk_size, max_workers=max_workers)
+            # 주말/휴장일이라 받을 봉이 없으면 실패가 아님 -> 동기화 시각만 갱신해 max_age 동안 재요청하지 않음
+            for ticker in group:
+                if errors.get(ticker) == NO_DATA:
+                    self.touch(ticker)
+                    del errors[ticker]
+            failures.update(errors)
+            for ticker, df in frames.items():
+                if self._overlap_matches(ticker, df, last_date):
+                    self.save(ticker, df)
+                else:
+                    # 액면분할/수정주가 반영 -> 전체 재수집
+                    full.append(ticker)
+
+        if full:
+            frames, errors = fetch_bulk_history(full, period=period or "max", chunk_size=chunk_size, max_workers=max_workers)
+            failures.update(errors)
+            for ticker, df in frames.items():
+                self.save(ticker, df, replace=True, covered_from=start or df.index.min().date())
+        return failures
+
+    def load_histories(self, tickers, period="1y", max_age=600):
+        """동기화 후 저장분 반환: ({티커: DataFrame}, {티커: 실패 사유})"""
+        tickers = list(tickers)
+        failures = self.sync(tickers, period=period, max_age=max_age)
+        start = period_start(period)
+        frames = {}
+        for ticker in dict.fromkeys(t for t in tickers if t):
+            df = self.load(ticker, start=start)
+            if df.empty:
+                failures.setdefault(ticker, NO_DATA)
+            else:
+                frames[ticker] = df
+                failures.pop(ticker, None)  # 네트워크 실패여도 기존 저장분은 사용
+        return frames, failures
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = PriceStore()
+    return _store
+
+def load_histories(tickers, period="1y", max_age=600):
+    return get_store().load_histories(tickers, period=period, max_age=max_age)
+
+def load_history(ticker, period="1y", max_age=600):
+    frames, _ = load_histories([ticker], period=period, max_age=max_age)
+    return frames.get(ticker)
+
+def backfill(period="5y", chunk_size=50):
+    """
+    관심 종목 전체 백필 (중단 후 재실행 시 이미 끝난 종목은 건너뜀)
+    """
+    fix_encoding()
+    store = get_store()
+    tickers = [t['ticker'] for t in get_active_targets() if t.get('ticker')]
+    print(f"📦 [Backfill] {len(tickers)}개 종목 / 기간 {period}")
+    for i in range(0, len(tickers), chunk_size):
+        chunk = tickers[i:i + chunk_size]
+        failures = store.sync(chunk, period=period, max_age=12 * 3600, chunk_size=chunk_size)
+        print(f"  - {min(i + chunk_size, len(tickers))}/{len(tickers)} 완료 (실패 {len(failures)}건)")
+        for ticker, reason in failures.items():
+            print(f"    ! {ticker}: {reason}")
+
+if __name__ == "__main__":
+    backfill(sys.argv[1] if len(sys.argv) > 1 else "5y")
@@ -0,0 +1,130 @@
+import os
+import re
+import math
+import threading
+from collections import Counter
+
+from news_dedup import normalize, estimate_tokens, CHARS_PER_TOKEN
+
+# AI 입력 압축 (기사 본문 -> 문장 단위 중복 제거 + TF-IDF 중심성 순위 -> 키워드별 토큰 예산까지 채움)
+# 형태소 분석기 없이 정규화한 문자 2-gram을 단어로 사용 (한글 조사/어미 변화에 강함)
+TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "1000"))   # 키워드당 본문 토큰 예산 (0이면 압축 안 함)
+MIN_SENTENCE = 8        # 정규화 후 이보다 짧은 문장은 버림 (메뉴/캡션 조각)
+DUP_THRESHOLD = 0.7     # 문장 3-gram Jaccard가 이 이상이면 같은 문장
+KEYWORD_WEIGHT = 0.5    # 키워드를 포함한 문장 가산점
+BOILERPLATE = re.compile(
+    r"무단\s*전재|재배포\s*금지|저작권자|ⓒ|©|copyright|구독|좋아요|기자\s*=|[\w.+-]+@[\w-]+\.[\w.]+|관련\s*기사|사진\s*=|클릭",
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?。…])\s+|(?<=다\.)(?=\S)|\n+")   # 공백 없이 붙은 "~다." 문장도 분리
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_END.split(text or "") if s and s.strip()]
+
+def _grams(text, size):
+    return {text[i:i + size] for i in range(max(len(text) - size + 1, 1))} if text else set()
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+def _tfidf(docs):
+    """문자 2-gram TF-IDF 벡터 (단위 길이 dict)"""
+    df = Counter(g for doc in docs for g in set(doc))
+    n = len(docs)
+    vectors = []
+    for doc in docs:
+        tf = Counter(doc)
+        vec = {g: c * (math.log((1 + n) / (1 + df[g])) + 1) for g, c in tf.items()}
+        norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+        vectors.append({g: v / norm for g, v in vec.items()})
+    return vectors
+
+def _dot(a, b):
+    if len(a) > len(b): a, b = b, a
+    return sum(v * b.get(g, 0.0) for g, v in a.items())
+
+def rank_sentences(keyword, sentences):
+    """문장별 점수 = 전체 문장 중심(centroid)과의 코사인 유사도 + 키워드 포함 가산점"""
+    docs = [[s[i:i + 2] for i in range(len(s) - 1)] for s in sentences]
+    vectors = _tfidf(docs)
+    centroid = Counter()
+    for vec in vectors:
+        centroid.update(vec)
+    norm = math.sqrt(sum(v * v for v in centroid.values())) or 1.0
+    centroid = {g: v / norm for g, v in centroid.items()}
+    key = normalize(keyword)
+    return [_dot(vec, centroid) + (KEYWORD_WEIGHT if key and key in s else 0.0) for vec, s in zip(vectors, sentences)]
+
+def compact_contents(keyword, contents, budget=TOKEN_BUDGET):
+    """
+    기사별 본문 목록 -> (압축 본문 목록, 통계)
+    - 상투 문구(저작권/기자 이메일 등)와 짧은 조각 제거, 기사 간 같은 문장은 처음 1번만
+    - 기사마다 최고 점수 문장 1개를 먼저 넣고, 나머지는 점수 순으로 예산까지 채움
+    - 선택된 문장은 원래 순서대로 이어붙임 (본문이 없는 기사는 None 그대로)
+    통계: {"before", "after"} 본문 추정 토큰 수
+    """
+    before = sum(estimate_tokens(c) for c in contents if c)
+    if not budget or before <= budget:
+        _record(before, before)
+        return list(contents), {"before": before, "after": before}
+
+    candidates = []   # (기사 번호, 문장 번호, 원문, 정규화 문장)
+    seen = []
+    for a, content in enumerate(contents):
+        for i, sentence in enumerate(split_sentences(content)):
+            norm = normalize(sentence)
+            if len(norm) < MIN_SENTENCE or BOILERPLATE.search(sentence):
+                continue
+            grams = _grams(norm, 3)
+            if any(_jaccard(grams, other) >= DUP_THRESHOLD for other in seen):
+                continue
+            seen.append(grams)
+            candidates.append((a, i, sentence, norm))
+
+    scores = rank_sentences(keyword, [c[3] for c in candidates]) if candidates else []
+    order = sorted(range(len(candidates)), key=lambda k: -scores[k])
+    leaders = {}
+    for k in order:
+        leaders.setdefault(candidates[k][0], k)
+    chosen, used = set(), 0
+    for k in list(leaders.values()) + order:
+        cost = estimate_tokens(candidates[k][2]) + 1
+        if k in chosen or used + cost > budget:
+            continue
+        chosen.add(k)
+        used += cost
+
+    picked = {}
+    for k in sorted(chosen, key=lambda k: candidates[k][:2]):
+        picked.setdefault(candidates[k][0], []).append(candidates[k][2])
+    result = []
+    for a, content in enumerate(contents):
+        if not content or a in picked:
+            result.append(" ".join(picked[a]) if content else content)
+            continue
+        # 선택된 문장이 없는 기사는 원문 앞부분을 남은 예산만큼 (없으면 None -> RSS 요약 사용)
+        head = content[:max(int((budget - used) * CHARS_PER_TOKEN), 0)]
+        used += estimate_tokens(head)
+        result.append(head or None)
+    after = sum(estimate_tokens(c) for c in result if c)
+    _record(before, after)
+    return result, {"before": before, "after": after}
+
+# --- 배치 누적 통계 ---
+_lock = threading.Lock()
+_totals = {"prompts": 0, "before": 0, "after": 0}
+
+def _record(before, after):
+    with _lock:
+        _totals["prompts"] += 1
+        _totals["before"] += before
+        _totals["after"] += after
+
+def totals():
+    with _lock:
+        return dict(_totals)
+
+def reset():
+    with _lock:
+        for key in _totals:
+            _totals[key] = 0
@@ -1,49 +1,171 @@
+import os
 import pandas as pd
 import numpy as np
 
-def calculate_rsi(series, period=14):
+import quant_kernels as qk
+
+class FeatureContext:
+    """
+    프레임 단위 원천 데이터 캐시 (diff / shift / rolling / ewm)
+    - 같은 원천 계산은 한 번만 수행하고 여러 지표가 공유 (pandas / numpy 백엔드 모두)
+    - 키는 (Series 이름, 인덱스 id, 길이) 기준 -> 다른 프레임의 같은 이름 Series와 섞이지 않음
+      (이름 없는 Series는 캐싱하지 않음, 캐시가 Series를 붙잡고 있어 인덱스 id가 재사용되지 않음)
+    """
+    def __init__(self):
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        value = self._cache[key] = compute()
+        return value
+
+    @staticmethod
+    def frame_key(obj):
+        """프레임/Series 식별 키 (같은 DataFrame에서 꺼낸 열은 인덱스 객체를 공유)"""
+        return (id(obj.index), len(obj))
+
+    def _cached(self, series, op, compute):
+        name = getattr(series, 'name', None)
+        if name is None or not hasattr(series, 'index'):
+            return compute()
+        return self.get((name,) + self.frame_key(series) + op, compute)
+
+    def diff(self, series):
+        return self._cached(series, ('diff',), series.diff)
+
+    def shift(self, series):
+        return self._cached(series, ('shift',), series.shift)
+
+    def rolling(self, series, window, how='mean'):
+        if BACKEND == "numpy":
+            kernel = {'mean': qk.rolling_mean, 'std': qk.rolling_std, 'sum': qk.rolling_sum,
+                      'min': qk.rolling_min, 'max': qk.rolling_max}[how]
+            compute = lambda: _wrap(kernel(series, window), series)
+        else:
+            compute = lambda: getattr(series.rolling(window=window), how)()
+        return self._cached(series, ('rolling', window, how), compute)
+
+    def ema(self, series, span):
+        return self._cached(series, ('ema', span), lambda: _ema(series, span))
+
+    def stats(self):
+        """원천 데이터 계산/재사용 횟수"""
+        return {"computed": self.misses, "reused": self.hits}
+
+def _ctx(ctx):
+    return ctx if ctx is not None else FeatureContext()
+
+# --- 계산 백엔드 ("pandas": rolling·ewm (기본) / "numpy": quant_kernels 커널) ---
+# numpy 백엔드는 QUANT_BACKEND=numpy 또는 set_backend("numpy")로 선택 (tests/test_quant_kernels.py로 결과 동일성 확인)
+# FeatureContext의 rolling / ema도 선택된 백엔드로 계산 (두 백엔드 모두 원천 계산 공유)
+BACKENDS = ("pandas", "numpy")
+BACKEND = os.environ.get("QUANT_BACKEND", "pandas")
+
+def set_backend(name):
+    """지표 계산 백엔드 전환 (이전 값 반환)"""
+    global BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 백엔드: {name} ({', '.join(BACKENDS)})")
+    previous, BACKEND = BACKEND, name
+    return previous
+
+def _wrap(values, like):
+    """커널 결과 배열 -> 입력과 같은 Series / DataFrame"""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns)
+    return pd.Series(values, index=like.index, name=like.name)
+
+def _ema(series, span):
+    """series.ewm(span, adjust=False).mean() (numpy 백엔드는 커널, 중간 NaN이 있으면 pandas 규칙)"""
+    if BACKEND == "numpy":
+        values = qk.ema(series, span)
+        if values is not None:
+            return _wrap(values, series)
+    return series.ewm(span=span, adjust=False).mean()
+
+def calculate_rsi(series, period=14, ctx=None):
     """RSI (상대강도지수) 계산"""
-    delta = series.diff()
+    if BACKEND == "numpy":
+        delta = np.asarray(_ctx(ctx).diff(series), dtype=float)
+        gain = qk.rolling_mean(np.where(delta > 0, delta, 0.0), period)
+        loss = qk.rolling_mean(np.where(delta < 0, -delta, 0.0), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return _wrap(100 - (100 / (1 + gain / loss)), series)
+    delta = _ctx(ctx).diff(series)
     gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
     loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
-def calculate_macd(series, fast=12, slow=26, signal=9):
+def calculate_macd(series, fast=12, slow=26, signal=9, ctx=None):
     """MACD 계산"""
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
+    ctx = _ctx(ctx)
+    ema_fast = ctx.ema(series, fast)
+    ema_slow = ctx.ema(series, slow)
     macd_line = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
+    signal_line = _ema(macd_line, signal)
     histogram = macd_line - signal_line
     return macd_line, signal_line, histogram
 
-def calculate_bollinger_bands(series, period=20, std_dev=2):
+def calculate_bollinger_bands(series, period=20, std_dev=2, ctx=None):
     """볼린저 밴드 계산"""
-    sma = series.rolling(window=period).mean()
-    std = series.rolling(window=period).std()
+    if BACKEND == "numpy":
+        ctx = _ctx(ctx)
+        sma_v = np.asarray(ctx.rolling(series, period, 'mean'), dtype=float)
+        std_v = np.asarray(ctx.rolling(series, period, 'std'), dtype=float)
+        upper_v, lower_v = sma_v + std_v * std_dev, sma_v - std_v * std_dev
+        width = upper_v - lower_v
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_b = _wrap((np.asarray(series, dtype=float) - lower_v) / width, series) if np.any(width[~np.isnan(width)] != 0) else 0.5
+        return _wrap(upper_v, series), _wrap(sma_v, series), _wrap(lower_v, series), pct_b
+    ctx = _ctx(ctx)
+    sma = ctx.rolling(series, period, 'mean')
+    std = ctx.rolling(series, period, 'std')
     upper_band = sma + (std * std_dev)
     lower_band = sma - (std * std_dev)
     pct_b = (series - lower_band) / (upper_band - lower_band) if (upper_band - lower_band).any() else 0.5
     return upper_band, sma, lower_band, pct_b
 
-def calculate_stochastic(df, k_period=14, d_period=3):
+def calculate_stochastic(df, k_period=14, d_period=3, ctx=None):
     """스토캐스틱 계산"""
-    low_min = df['Low'].rolling(window=k_period).min()
-    high_max = df['High'].rolling(window=k_period).max()
+    if BACKEND == "numpy":
+        ctx = _ctx(ctx)
+        low_min = np.asarray(ctx.rolling(df['Low'], k_period, 'min'), dtype=float)
+        high_max = np.asarray(ctx.rolling(df['High'], k_period, 'max'), dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_v = 100 * ((np.asarray(df['Close'], dtype=float) - low_min) / (high_max - low_min))
+        return _wrap(k_v, df['Close']), _wrap(qk.rolling_mean(k_v, d_period), df['Close'])
+    ctx = _ctx(ctx)
+    low_min = ctx.rolling(df['Low'], k_period, 'min')
+    high_max = ctx.rolling(df['High'], k_period, 'max')
     k_line = 100 * ((df['Close'] - low_min) / (high_max - low_min))
     d_line = k_line.rolling(window=d_period).mean()
     return k_line, d_line
 
-def calculate_mfi(df, period=14):
+def calculate_mfi(df, period=14, ctx=None):
     """MFI (Money Flow Index) 계산"""
-    typical_price = (df['High'] + df['Low'] + df['Close']) / 3
+    ctx = _ctx(ctx)
+    typical_price = ctx.get(('TypicalPrice',) + ctx.frame_key(df['Close']),
+                            lambda: ((df['High'] + df['Low'] + df['Close']) / 3).rename('TypicalPrice'))
+    if BACKEND == "numpy":
+        typical_v = np.asarray(typical_price, dtype=float)
+        flow = typical_v * np.asarray(df['Volume'], dtype=float)
+        tp_diff = typical_v - qk.shift(typical_v)
+        pos_mf = qk.rolling_sum(np.where(tp_diff > 0, flow, 0.0), period)
+        neg_mf = qk.rolling_sum(np.where(tp_diff < 0, flow, 0.0), period)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return _wrap(100 - (100 / (1 + pos_mf / neg_mf)), df['Close'])
     money_flow = typical_price * df['Volume']
     
     positive_flow = pd.Series(0.0, index=df.index)
     negative_flow = pd.Series(0.0, index=df.index)
     
-    diff = typical_price.diff()
+    diff = ctx.diff(typical_price)
     positive_flow[diff > 0] = money_flow[diff > 0]
     negative_flow[diff < 0] = money_flow[diff < 0]
     
@@ -53,36 +175,76 @@ def calculate_mfi(df, period=14):
     mfr = pos_mf / neg_mf
     return 100 - (100 / (1 + mfr))
 
-def calculate_atr(df, period=14):
+def calculate_atr(df, period=14, ctx=None):
     """ATR (평균 변동폭) 계산"""
+    if BACKEND == "numpy":
+        return _wrap(qk.rolling_mean(qk.true_range(df['High'], df['Low'], df['Close']), period), df['Close'])
+    prev_close = _ctx(ctx).shift(df['Close'])
     high_low = df['High'] - df['Low']
-    high_close = np.abs(df['High'] - df['Close'].shift())
-    low_close = np.abs(df['Low'] - df['Close'].shift())
+    high_close = np.abs(df['High'] - prev_close)
+    low_close = np.abs(df['Low'] - prev_close)
     ranges = pd.concat([high_low, high_close, low_close], axis=1)
     true_range = np.max(ranges, axis=1)
     return true_range.rolling(window=period).mean()
 
-def analyze_stock(df):
+def classify_ma_alignment(ma5, ma20, ma60, ma120):
+    """이평선 배열 판정 (5, 20, 60, 120)"""
+    if ma5 > ma20 > ma60 > ma120: return "완전정배열"
+    elif ma5 > ma20 > ma60: return "정배열(단선)"
+    elif ma5 < ma20 < ma60 < ma120: return "완전역배열"
+    return "혼조"
+
+def composite_score(row_count, current_rsi, volume_ratio, hist_val, pct_b, slow_k, ma_alignment, mfi_val):
+    """종합 점수 (0~100, 기본 50점에서 지표별 가감)"""
+    score = 50
+    if row_count >= 30:
+        # RSI
+        if current_rsi is not None:
+            if current_rsi < 30: score += 10
+            elif current_rsi > 70: score -= 10
+        # 수급 (Volume Ratio)
+        if volume_ratio is not None and volume_ratio > 250: score += 15
+        # MACD (추세 가세)
+        if hist_val is not None and hist_val > 0: score += 10
+        # 볼린저 (%B)
+        if pct_b is not None:
+            if pct_b < 0.1: score += 10 # 하단 터치 (반등 기대)
+            elif pct_b > 0.9: score -= 10 # 상단 돌파 (과열)
+        # 스토캐스틱
+        if slow_k is not None and slow_k < 20: score += 10
+        # 이평선 배열
+        if ma_alignment == "완전정배열": score += 15
+        elif ma_alignment == "정배열(단선)": score += 5
+        elif ma_alignment == "완전역배열": score -= 15
+        # MFI
+        if mfi_val is not None and mfi_val < 20: score += 10
+    return min(max(score, 0), 100)
+
+def analyze_stock(df, ctx=None):
     """
     단일 종목에 대한 심층 퀀트 분석 수행 (10대 지표 통합 분석)
+    - ctx: FeatureContext (생략 시 내부 생성). 호출 후 ctx.stats()로 재사용 횟수 확인 가능
     """
     row_count = len(df)
     if row_count < 1:
         return {"error": "데이터가 실시간으로 존재하지 않습니다."}
 
+    ctx = _ctx(ctx)
+    close = df['Close']
+
     # 1. 기본 정보
-    current_price = df['Close'].iloc[-1]
+    current_price = close.iloc[-1]
     
     # 2. RSI (14)
     current_rsi = None
     if row_count >= 15:
-        rsi_series = calculate_rsi(df['Close'])
+        rsi_series = calculate_rsi(close, ctx=ctx)
         current_rsi = rsi_series.iloc[-1]
     
     # 3. 거래량 비율 (20일)
     volume_ratio = None
     if row_count >= 21:
-        ma20_volume = df['Volume'].rolling(window=20).mean().iloc[-1]
+        ma20_volume = ctx.rolling(df['Volume'], 20).iloc[-1]
         current_volume = df['Volume'].iloc[-1]
         volume_ratio = (current_volume / ma20_volume) * 100 if ma20_volume > 0 else 0
     
@@ -94,75 +256,51 @@ def analyze_stock(df):
     # 5. 이격도 (20일)
     disparity = None
     if row_count >= 20:
-        ma20_price = df['Close'].rolling(window=20).mean().iloc[-1]
+        ma20_price = ctx.rolling(close, 20).iloc[-1]
         disparity = (current_price / ma20_price) * 100 if ma20_price > 0 else 100
     
     # 6. MACD (12, 26, 9)
     macd_val, signal_val, hist_val = None, None, None
     if row_count >= 35:
-        m_line, s_line, h_line = calculate_macd(df['Close'])
+        m_line, s_line, h_line = calculate_macd(close, ctx=ctx)
         macd_val, signal_val, hist_val = m_line.iloc[-1], s_line.iloc[-1], h_line.iloc[-1]
     
     # 7. 볼린저 밴드 (20, 2)
     upper_b, mid_b, lower_b, pct_b = None, None, None, None
     if row_count >= 20:
-        upper_b, mid_b, lower_b, p_b = calculate_bollinger_bands(df['Close'])
+        upper_b, mid_b, lower_b, p_b = calculate_bollinger_bands(close, ctx=ctx)
         upper_b, mid_b, lower_b, pct_b = upper_b.iloc[-1], mid_b.iloc[-1], lower_b.iloc[-1], p_b.iloc[-1]
     
     # 8. 스토캐스틱 (14, 3, 3)
     slow_k, slow_d = None, None
     if row_count >= 20:
-        k_line, d_line = calculate_stochastic(df)
+        k_line, d_line = calculate_stochastic(df, ctx=ctx)
         slow_k, slow_d = k_line.iloc[-1], d_line.iloc[-1]
     
     # 9. MFI (14)
     mfi_val = None
     if row_count >= 15:
-        mfi_val = calculate_mfi(df).iloc[-1]
+        mfi_val = calculate_mfi(df, ctx=ctx).iloc[-1]
     
     # 10. 이평선 배열 (5, 20, 60, 120)
     ma_alignment = "데이터부족"
     if row_count >= 120:
-        ma5 = df['Close'].rolling(window=5).mean().iloc[-1]
-        ma20 = df['Close'].rolling(window=20).mean().iloc[-1]
-        ma60 = df['Close'].rolling(window=60).mean().iloc[-1]
-        ma120 = df['Close'].rolling(window=120).mean().iloc[-1]
+        ma5 = ctx.rolling(close, 5).iloc[-1]
+        ma20 = ctx.rolling(close, 20).iloc[-1]
+        ma60 = ctx.rolling(close, 60).iloc[-1]
+        ma120 = ctx.rolling(close, 120).iloc[-1]
         
-        if ma5 > ma20 > ma60 > ma120: ma_alignment = "완전정배열"
-        elif ma5 > ma20 > ma60: ma_alignment = "정배열(단선)"
-        elif ma5 < ma20 < ma60 < ma120: ma_alignment = "완전역배열"
-        else: ma_alignment = "혼조"
+        ma_alignment = classify_ma_alignment(ma5, ma20, ma60, ma120)
     
     # 기타: ATR 및 손절가
     current_atr, stop_loss = None, None
     if row_count >= 15:
-        atr_series = calculate_atr(df)
+        atr_series = calculate_atr(df, ctx=ctx)
         current_atr = atr_series.iloc[-1]
         stop_loss = current_price - (2 * current_atr)
     
     # --- 종합 점수 계산 (가중치 로직 고도화) ---
-    score = 50
-    if row_count >= 30:
-        # RSI
-        if current_rsi is not None:
-            if current_rsi < 30: score += 10
-            elif current_rsi > 70: score -= 10
-        # 수급 (Volume Ratio)
-        if volume_ratio is not None and volume_ratio > 250: score += 15
-        # MACD (추세 가세)
-        if hist_val is not None and hist_val > 0: score += 10
-        # 볼린저 (%B)
-        if pct_b is not None:
-            if pct_b < 0.1: score += 10 # 하단 터치 (반등 기대)
-            elif pct_b > 0.9: score -= 10 # 상단 돌파 (과열)
-        # 스토캐스틱
-        if slow_k is not None and slow_k < 20: score += 10
-        # 이평선 배열
-        if ma_alignment == "완전정배열": score += 15
-        elif ma_alignment == "정배열(단선)": score += 5
-        elif ma_alignment == "완전역배열": score -= 15
-        # MFI
-        if mfi_val is not None and mfi_val < 20: score += 10
+    score = composite_score(row_count, current_rsi, volume_ratio, hist_val, pct_b, slow_k, ma_alignment, mfi_val)
     
     return {
         "price": current_price,
@@ -177,6 +315,281 @@ def analyze_stock(df):
         "ma_alignment": ma_alignment,
         "atr": current_atr,
         "stop_loss": stop_loss,
-        "score": min(max(score, 0), 100),
+        "score": score,
         "data_points": row_count
     }
+
+# ================= 패널(다종목) 분석 =================
+PANEL_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+def _to_panel_fields(data, tickers=None, fields=PANEL_FIELDS):
+    """
+    다양한 입력을 {필드: (날짜 x 종목) DataFrame} 형태로 통일
+    - MultiIndex 컬럼 DataFrame (yf.download 다종목 결과, (필드, 티커) 또는 (티커, 필드))
+    - {티커: OHLCV DataFrame} 딕셔너리
+    - (티커 x 날짜 x 필드) 3차원 배열 (tickers, fields 인자 필요)
+    """
+    if isinstance(data, dict):
+        frames = {t: f for t, f in data.items() if f is not None and len(f) > 0}
+        if not frames:
+            return {}
+        data = pd.concat(frames, axis=1)  # (티커, 필드) MultiIndex
+
+    if isinstance(data, np.ndarray):
+        if data.ndim != 3:
+            raise ValueError("3차원 (티커 x 날짜 x 필드) 배열이 필요합니다.")
+        tickers = list(tickers) if tickers is not None else list(range(data.shape[0]))
+        return {
+            name: pd.DataFrame(data[:, :, i].T, columns=tickers)
+            for i, name in enumerate(fields)
+        }
+
+    if not isinstance(data.columns, pd.MultiIndex):
+        raise ValueError("MultiIndex 컬럼(필드 x 티커) DataFrame이 필요합니다.")
+
+    field_level = 0 if 'Close' in data.columns.get_level_values(0) else 1
+    return {
+        name: data.xs(name, axis=1, level=field_level)
+        for name in fields if name in data.columns.get_level_values(field_level)
+    }
+
+def _align_panel(fields):
+    """
+    종목별 유효 봉(Close 존재)만 남기고 최근 봉 기준으로 아래쪽 정렬
+    -> 각 열의 마지막 행이 해당 종목의 최신 봉이 되어 단일 종목 분석과 동일한 결과 보장
+    반환: (정렬된 필드, 종목별 유효 봉 수, 원래 행 위치 order)
+    """
+    close = fields['Close']
+    valid = close.notna().to_numpy()
+    order = np.argsort(valid, axis=0, kind='stable')
+    valid_sorted = np.take_along_axis(valid, order, axis=0)
+
+    aligned = {}
+    for name, frame in fields.items():
+        arr = np.take_along_axis(frame.to_numpy(dtype=float), order, axis=0)
+        arr[~valid_sorted] = np.nan
+        aligned[name] = pd.DataFrame(arr, columns=close.columns)
+    return aligned, pd.Series(valid.sum(axis=0), index=close.columns), order
+
+def analyze_panel(data, tickers=None, fields=PANEL_FIELDS):
+    """
+    여러 종목을 한 번에 벡터 연산으로 분석 (analyze_stock의 패널 버전)
+    종목당 1행, analyze_stock과 같은 지표를 평탄화된 컬럼으로 반환
+    """
+    panel = _to_panel_fields(data, tickers, fields)
+    if not panel or 'Close' not in panel:
+        return pd.DataFrame()
+
+    p, counts, _ = _align_panel(panel)
+    keep = counts[counts > 0].index
+    p = {name: frame[keep] for name, frame in p.items()}
+    counts = counts[keep]
+    if len(keep) == 0:
+        return pd.DataFrame()
+
+    close, high, low, volume = p['Close'], p['High'], p['Low'], p['Volume']
+    n = counts.to_numpy()
+
+    def last(frame):
+        return frame.iloc[-1].to_numpy(dtype=float)
+
+    def when(cond, values):
+        return np.where(cond, values, np.nan)
+
+    # 1. 기본 정보
+    current_price = last(close)
+
+    # 2. RSI (14)
+    current_rsi = when(n >= 15, last(calculate_rsi(close)))
+
+    # 3. 거래량 비율 (20일)
+    ma20_volume = last(volume.rolling(window=20).mean())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(ma20_volume > 0, last(volume) / ma20_volume * 100, 0)
+    volume_ratio = when(n >= 21, ratio)
+
+    # 4. 52주 위치
+    year_low = low.iloc[-252:].min().to_numpy(dtype=float)
+    year_high = high.iloc[-252:].max().to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        position_52w = np.where(year_high > year_low,
+                                (current_price - year_low) / (year_high - year_low) * 100, 50)
+
+    # 5. 이격도 (20일)
+    ma20_price = last(close.rolling(window=20).mean())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        disparity = when(n >= 20, np.where(ma20_price > 0, current_price / ma20_price * 100, 100))
+
+    # 6. MACD (12, 26, 9)
+    m_line, s_line, h_line = calculate_macd(close)
+    macd_val, signal_val, hist_val = (when(n >= 35, last(x)) for x in (m_line, s_line, h_line))
+
+    # 7. 볼린저 밴드 (20, 2) - 밴드폭이 전부 0인 종목은 %B 0.5 (calculate_bollinger_bands와 동일)
+    sma = close.rolling(window=20).mean()
+    std = close.rolling(window=20).std()
+    upper_s, lower_s = sma + std * 2, sma - std * 2
+    width = upper_s - lower_s
+    has_width = ((width != 0) & width.notna()).any().to_numpy()
+    pct_b = np.where(has_width, last((close - lower_s) / width), 0.5)
+    upper_b, mid_b, lower_b = (when(n >= 20, last(x)) for x in (upper_s, sma, lower_s))
+    pct_b = when(n >= 20, pct_b)
+
+    # 8. 스토캐스틱 (14, 3, 3)
+    k_line, d_line = calculate_stochastic({'High': high, 'Low': low, 'Close': close})
+    slow_k, slow_d = when(n >= 20, last(k_line)), when(n >= 20, last(d_line))
+
+    # 9. MFI (14)
+    typical_price = (high + low + close) / 3
+    money_flow = typical_price * volume
+    tp_diff = typical_price.diff()
+    pos_mf = money_flow.where(tp_diff > 0, 0.0).rolling(window=14).sum()
+    neg_mf = money_flow.where(tp_diff < 0, 0.0).rolling(window=14).sum()
+    mfi_val = when(n >= 15, last(100 - (100 / (1 + pos_mf / neg_mf))))
+
+    # 10. 이평선 배열 (5, 20, 60, 120)
+    ma5, ma60, ma120 = (last(close.rolling(window=w).mean()) for w in (5, 60, 120))
+    ma_alignment = np.select(
+        [n < 120,
+         (ma5 > ma20_price) & (ma20_price > ma60) & (ma60 > ma120),
+         (ma5 > ma20_price) & (ma20_price > ma60),
+         (ma5 < ma20_price) & (ma20_price < ma60) & (ma60 < ma120)],
+        ["데이터부족", "완전정배열", "정배열(단선)", "완전역배열"],
+        default="혼조",
+    )
+
+    # 기타: ATR 및 손절가
+    prev_close = close.shift()
+    true_range = np.fmax(np.fmax(high - low, (high - prev_close).abs()), (low - prev_close).abs())
+    current_atr = when(n >= 15, last(true_range.rolling(window=14).mean()))
+    stop_loss = current_price - 2 * current_atr
+
+    # --- 종합 점수 계산 (analyze_stock과 동일한 가중치) ---
+    score = np.full(len(n), 50.0)
+    score += np.where(current_rsi < 30, 10, np.where(current_rsi > 70, -10, 0))
+    score += np.where(volume_ratio > 250, 15, 0)
+    score += np.where(hist_val > 0, 10, 0)
+    score += np.where(pct_b < 0.1, 10, np.where(pct_b > 0.9, -10, 0))
+    score += np.where(slow_k < 20, 10, 0)
+    score += np.select([ma_alignment == "완전정배열", ma_alignment == "정배열(단선)",
+                        ma_alignment == "완전역배열"], [15, 5, -15], default=0)
+    score += np.where(mfi_val < 20, 10, 0)
+    score = np.where(n >= 30, score, 50)
+
+    return pd.DataFrame({
+        "price": current_price,
+        "rsi": current_rsi,
+        "volume_ratio": volume_ratio,
+        "position_52w": position_52w,
+        "disparity": disparity,
+        "macd_line": macd_val, "macd_signal": signal_val, "macd_hist": hist_val,
+        "bb_upper": upper_b, "bb_mid": mid_b, "bb_lower": lower_b, "pct_b": pct_b,
+        "stoch_k": slow_k, "stoch_d": slow_d,
+        "mfi": mfi_val,
+        "ma_alignment": ma_alignment,
+        "atr": current_atr,
+        "stop_loss": stop_loss,
+        "score": np.clip(score, 0, 100).astype(int),
+        "data_points": n,
+    }, index=keep)
+
+def panel_row_to_metrics(row):
+    """analyze_panel 결과 1행을 analyze_stock과 같은 딕셔너리 형태로 변환 (NaN -> None)"""
+    def v(key):
+        val = row[key]
+        return None if pd.isna(val) else val
+
+    return {
+        "price": row["price"],
+        "rsi": v("rsi"),
+        "volume_ratio": v("volume_ratio"),
+        "position_52w": row["position_52w"],
+        "disparity": v("disparity"),
+        "macd": {"line": v("macd_line"), "signal": v("macd_signal"), "hist": v("macd_hist")},
+        "bollinger": {"upper": v("bb_upper"), "mid": v("bb_mid"), "lower": v("bb_lower"), "pct_b": v("pct_b")},
+        "stochastic": {"k": v("stoch_k"), "d": v("stoch_d")},
+        "mfi": v("mfi"),
+        "ma_alignment": row["ma_alignment"],
+        "atr": v("atr"),
+        "stop_loss": v("stop_loss"),
+        "score": int(row["score"]),
+        "data_points": int(row["data_points"]),
+    }
+
+# ================= 전 구간 점수 시계열 =================
+def _unalign(values, order):
+    """_align_panel로 아래 정렬한 배열을 원래 날짜 위치로 되돌림"""
+    out = np.empty_like(values)
+    np.put_along_axis(out, order, values, axis=0)
+    return out
+
+def score_panel(data, tickers=None, fields=PANEL_FIELDS):
+    """
+    모든 날짜의 종합 점수를 한 번에 계산 (날짜 x 종목, 봉이 없는 칸은 NaN)
+    각 칸은 그 날짜까지의 봉만으로 analyze_stock을 돌린 점수와 같음 (날짜별 반복 없음)
+    """
+    panel = _to_panel_fields(data, tickers, fields)
+    if not panel or 'Close' not in panel:
+        return pd.DataFrame()
+    return _score_fields(panel)
+
+def _score_fields(panel):
+    """{필드: 날짜 x 종목} -> 날짜 x 종목 점수"""
+    dates, columns = panel['Close'].index, panel['Close'].columns
+    p, _, order = _align_panel(panel)
+    close, high, low, volume = p['Close'], p['High'], p['Low'], p['Volume']
+
+    # 날짜별 봉 수 (analyze_stock의 row_count)
+    valid = close.notna().to_numpy()
+    n = valid.cumsum(axis=0)
+
+    def when(cond, frame):
+        return np.where(cond, frame.to_numpy(dtype=float), np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = when(n >= 15, calculate_rsi(close))
+
+        ma20_volume = volume.rolling(window=20).mean()
+        volume_ratio = np.where(n >= 21, np.where(ma20_volume > 0, volume / ma20_volume * 100, 0), np.nan)
+
+        _, _, h_line = calculate_macd(close)
+        hist = when(n >= 35, h_line)
+
+        # %B: 그날까지 밴드폭이 한 번도 0이 아닌 적이 없으면 0.5 (calculate_bollinger_bands와 동일)
+        sma = close.rolling(window=20).mean()
+        std = close.rolling(window=20).std()
+        width = std * 4
+        has_width = ((width != 0) & width.notna()).cummax().to_numpy()
+        pct_b = np.where(n >= 20, np.where(has_width, ((close - (sma - std * 2)) / width).to_numpy(dtype=float), 0.5), np.nan)
+
+        k_line, _ = calculate_stochastic({'High': high, 'Low': low, 'Close': close})
+        slow_k = when(n >= 20, k_line)
+
+        typical_price = (high + low + close) / 3
+        money_flow = typical_price * volume
+        tp_diff = typical_price.diff()
+        pos_mf = money_flow.where(tp_diff > 0, 0.0).rolling(window=14).sum()
+        neg_mf = money_flow.where(tp_diff < 0, 0.0).rolling(window=14).sum()
+        mfi = when(n >= 15, 100 - (100 / (1 + pos_mf / neg_mf)))
+
+        ma5, ma20, ma60, ma120 = (close.rolling(window=w).mean().to_numpy(dtype=float) for w in (5, 20, 60, 120))
+        ma_points = np.select(
+            [n < 120,
+             (ma5 > ma20) & (ma20 > ma60) & (ma60 > ma120),
+             (ma5 > ma20) & (ma20 > ma60),
+             (ma5 < ma20) & (ma20 < ma60) & (ma60 < ma120)],
+            [0, 15, 5, -15], default=0,
+        )
+
+        # --- 종합 점수 (composite_score와 동일한 가중치) ---
+        score = np.full(n.shape, 50.0)
+        score += np.where(rsi < 30, 10, np.where(rsi > 70, -10, 0))
+        score += np.where(volume_ratio > 250, 15, 0)
+        score += np.where(hist > 0, 10, 0)
+        score += np.where(pct_b < 0.1, 10, np.where(pct_b > 0.9, -10, 0))
+        score += np.where(slow_k < 20, 10, 0)
+        score += ma_points
+        score += np.where(mfi < 20, 10, 0)
+    score = np.where(n >= 30, np.clip(score, 0, 100), 50.0)
+    score[~valid] = np.nan
+
+    return pd.DataFrame(_unalign(score, order), index=dates, columns=columns)
@@ -0,0 +1,454 @@
+import math
+from collections import deque
+
+from quant_analyzer import classify_ma_alignment, composite_score
+
+NAN = float("nan")
+
+def _div(a, b):
+    """numpy와 같은 나눗셈 규칙 (0으로 나누면 inf / nan)"""
+    if b == 0:
+        if a == 0 or math.isnan(a): return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+# push()는 되돌리기 토큰(직전 스칼라 + 밀려난 값)을 반환하고 undo(token)으로 O(1) 복구
+# -> 장중 재갱신 때 전체 상태를 복사하지 않고 마지막 봉만 되돌림
+
+class RollingSum:
+    """고정 길이 이동합 (값 추가/제거 O(1), 누적 오차 방지를 위해 window마다 재합산)"""
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.since_resync = 0
+
+    def push(self, value):
+        token = (None, self.total, self.since_resync)
+        self.values.append(value)
+        self.total += value
+        if len(self.values) > self.window:
+            popped = self.values.popleft()
+            self.total -= popped
+            token = (popped,) + token[1:]
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.total = math.fsum(self.values)
+            self.since_resync = 0
+        return token
+
+    def undo(self, token):
+        popped, self.total, self.since_resync = token
+        self.values.pop()
+        if popped is not None:
+            self.values.appendleft(popped)
+
+    @property
+    def full(self):
+        return len(self.values) >= self.window
+
+    def mean(self):
+        return self.total / self.window if self.full else NAN
+
+    def sum(self):
+        return self.total if self.full else NAN
+
+    def to_dict(self):
+        return {"window": self.window, "values": list(self.values), "total": self.total, "since_resync": self.since_resync}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"])
+        obj.values = deque(d["values"])
+        obj.total = d["total"]
+        obj.since_resync = d["since_resync"]
+        return obj
+
+class RollingStats:
+    """Welford 방식 이동 평균/표본표준편차 (볼린저 밴드용)"""
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.since_resync = 0
+
+    def push(self, value):
+        token = (None, self.mean, self.m2, self.since_resync)
+        self.values.append(value)
+        if len(self.values) <= self.window:
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (value - self.mean)
+            return token
+        old = self.values.popleft()
+        token = (old,) + token[1:]
+        old_mean = self.mean
+        self.mean += (value - old) / self.window
+        self.m2 += (value - old) * (value - self.mean + old - old_mean)
+        self.since_resync += 1
+        if self.since_resync >= self.window:
+            self.mean = math.fsum(self.values) / self.window
+            self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+            self.since_resync = 0
+        if self.m2 < 0: self.m2 = 0.0
+        return token
+
+    def undo(self, token):
+        popped, self.mean, self.m2, self.since_resync = token
+        self.values.pop()
+        if popped is not None:
+            self.values.appendleft(popped)
+
+    @property
+    def full(self):
+        return len(self.values) >= self.window
+
+    def std(self):
+        return math.sqrt(self.m2 / (self.window - 1)) if self.full else NAN
+
+    def to_dict(self):
+        return {"window": self.window, "values": list(self.values), "mean": self.mean, "m2": self.m2, "since_resync": self.since_resync}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"])
+        obj.values = deque(d["values"])
+        obj.mean = d["mean"]
+        obj.m2 = d["m2"]
+        obj.since_resync = d["since_resync"]
+        return obj
+
+class RollingExtreme:
+    """단조 덱 기반 이동 최소/최대 (원소당 분할상환 O(1))"""
+    def __init__(self, window, mode="min"):
+        self.window = window
+        self.mode = mode
+        self.items = deque()  # (봉 번호, 값)
+        self.count = 0
+
+    def push(self, value):
+        # 토큰: (뒤에서 밀려난 원소, 앞에서 만료된 원소, 추가 여부, 직전 count)
+        dropped, expired, count = [], [], self.count
+        appended = not (value is None or math.isnan(value))
+        if appended:
+            worse = (lambda v: v >= value) if self.mode == "min" else (lambda v: v <= value)
+            while self.items and worse(self.items[-1][1]):
+                dropped.append(self.items.pop())
+            self.items.append((self.count, value))
+        self.count += 1
+        while self.items and self.items[0][0] <= self.count - 1 - self.window:
+            expired.append(self.items.popleft())
+        return (dropped, expired, appended, count)
+
+    def undo(self, token):
+        dropped, expired, appended, self.count = token
+        self.items.extendleft(reversed(expired))
+        if appended:
+            self.items.pop()
+        self.items.extend(reversed(dropped))
+
+    def value(self, require_full=True):
+        if require_full and self.count < self.window: return NAN
+        return self.items[0][1] if self.items else NAN
+
+    def to_dict(self):
+        return {"window": self.window, "mode": self.mode, "items": [list(i) for i in self.items], "count": self.count}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(d["window"], d["mode"])
+        obj.items = deque(tuple(i) for i in d["items"])
+        obj.count = d["count"]
+        return obj
+
+class EMA:
+    """pandas ewm(span, adjust=False)와 같은 재귀 지수이동평균"""
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def push(self, x):
+        token = self.value
+        self.value = x if self.value is None else (1 - self.alpha) * self.value + self.alpha * x
+        return token
+
+    def undo(self, value):
+        self.value = value
+
+    def to_dict(self):
+        return {"alpha": self.alpha, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, d):
+        obj = cls(1)
+        obj.alpha = d["alpha"]
+        obj.value = d["value"]
+        return obj
+
+_SERIALIZERS = {"RollingSum": RollingSum, "RollingStats": RollingStats, "RollingExtreme": RollingExtreme, "EMA": EMA}
+
+class IncrementalAnalyzer:
+    """
+    종목별 상태 유지형 분석기 - 새 봉 하나당 O(1)로 analyze_stock과 같은 지표 딕셔너리 반환
+    - update(bar): bar는 Open/High/Low/Close/Volume(+선택 Date)을 가진 dict 또는 Series
+    - 같은 날짜의 봉이 다시 들어오면(장중 갱신) 마지막 봉의 되돌리기 기록으로 복구한 뒤 재반영
+    - to_dict()/from_dict()로 상태를 저장/복원하여 과거 데이터 재생 없이 이어서 계산
+    """
+    def __init__(self):
+        self.row_count = 0
+        self.last_date = None
+        self.prev_close = None
+        self.prev_tp = None
+        self.band_seen = False
+        self.last_k = NAN
+        self.last_volume = NAN
+        self.undo_log = None    # 마지막 봉 반영 전 스칼라 + 지표별 되돌리기 토큰
+        self.checkpoint = None  # from_dict로 불러온 직전 상태 (되돌리기 기록이 없을 때만 사용)
+        self.last_metrics = None
+        self.s = {
+            # RSI (14): 상승/하락폭 이동평균
+            "gain14": RollingSum(14), "loss14": RollingSum(14),
+            # MACD (12, 26, 9)
+            "ema12": EMA(12), "ema26": EMA(26), "signal9": EMA(9),
+            # 볼린저 (20, 2) 및 이동평균 5/20/60/120
+            "boll20": RollingStats(20),
+            "ma5": RollingSum(5), "ma20": RollingSum(20), "ma60": RollingSum(60), "ma120": RollingSum(120),
+            # 거래량 비율 (20일)
+            "vol20": RollingSum(20),
+            # 스토캐스틱 (14, 3)
+            "low14": RollingExtreme(14, "min"), "high14": RollingExtreme(14, "max"), "k3": RollingSum(3),
+            # 52주 고저
+            "low252": RollingExtreme(252, "min"), "high252": RollingExtreme(252, "max"),
+            # MFI (14)
+            "pos_mf14": RollingSum(14), "neg_mf14": RollingSum(14),
+            # ATR (14)
+            "tr14": RollingSum(14),
+        }
+
+    @classmethod
+    def from_history(cls, df):
+        """기존 OHLCV 이력으로 상태 초기화 (최초 1회)"""
+        analyzer = cls()
+        for date, bar in df.iterrows():
+            analyzer._apply(bar, date if hasattr(date, "strftime") else None)
+        analyzer.last_metrics = analyzer._metrics(float(df['Close'].iloc[-1])) if len(df) else None
+        return analyzer
+
+    def update(self, bar):
+        date = bar.get("Date", bar.get("date"))
+        if date is None and hasattr(getattr(bar, "name", None), "strftime"):
+            date = bar.name
+        date = str(date)[:10] if date is not None else None
+        if date is not None and self.last_date is not None:
+            if date < self.last_date:
+                raise ValueError(f"과거 봉은 반영할 수 없습니다: {date} < {self.last_date}")
+            if date == self.last_date:
+                self._rollback()
+        self._apply(bar, date)
+        self.last_metrics = self._metrics(float(bar["Close"]))
+        return self.last_metrics
+
+    def _apply(self, bar, date=None):
+        high, low, close = float(bar["High"]), float(bar["Low"]), float(bar["Close"])
+        volume = float(bar["Volume"])
+        s = self.s
+        log = []
+        self.undo_log = (self._scalars(), log)
+        self.checkpoint = None
+
+        def push(key, value):
+            log.append((key, s[key].push(value), None))
+
+        # RSI: 첫 봉은 diff가 NaN -> 상승/하락 0으로 집계 (pandas where 동작과 동일)
+        delta = close - self.prev_close if self.prev_close is not None else NAN
+        push("gain14", delta if delta > 0 else 0.0)
+        push("loss14", -delta if delta < 0 else 0.0)
+
+        # MACD
+        push("ema12", close)
+        push("ema26", close)
+        push("signal9", s["ema12"].value - s["ema26"].value)
+
+        # 볼린저 / 이동평균
+        push("boll20", close)
+        for key in ("ma5", "ma20", "ma60", "ma120"):
+            push(key, close)
+        band_width = s["boll20"].std() * 4
+        if not math.isnan(band_width) and band_width != 0:
+            self.band_seen = True
+        push("vol20", volume)
+
+        # 스토캐스틱 %K -> %D(3)
+        push("low14", low)
+        push("high14", high)
+        k = 100 * _div(close - s["low14"].value(), s["high14"].value() - s["low14"].value())
+        if math.isnan(k):
+            # NaN이 섞이면 %D도 NaN (pandas rolling 기본 min_periods) -> 되돌릴 때는 기존 객체로 교체
+            log.append(("k3", None, s["k3"]))
+            s["k3"] = RollingSum(3)
+        else:
+            push("k3", k)
+        self.last_k = k
+
+        push("low252", low)
+        push("high252", high)
+
+        # MFI
+        tp = (high + low + close) / 3
+        money_flow = tp * volume
+        tp_diff = tp - self.prev_tp if self.prev_tp is not None else NAN
+        push("pos_mf14", money_flow if tp_diff > 0 else 0.0)
+        push("neg_mf14", money_flow if tp_diff < 0 else 0.0)
+
+        # ATR: 첫 봉은 고가-저가만 사용
+        if self.prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        push("tr14", true_range)
+
+        self.prev_close, self.prev_tp = close, tp
+        self.last_volume = volume
+        self.row_count += 1
+        if date is not None:
+            self.last_date = str(date)[:10]
+
+    def _metrics(self, current_price):
+        s, n = self.s, self.row_count
+        if n < 1:
+            return {"error": "데이터가 실시간으로 존재하지 않습니다."}
+
+        current_rsi = None
+        if n >= 15:
+            current_rsi = 100 - _div(100, 1 + _div(s["gain14"].mean(), s["loss14"].mean()))
+
+        volume_ratio = None
+        if n >= 21:
+            ma20_volume = s["vol20"].mean()
+            volume_ratio = (self.last_volume / ma20_volume) * 100 if ma20_volume > 0 else 0
+
+        year_low, year_high = s["low252"].value(False), s["high252"].value(False)
+        position_52w = ((current_price - year_low) / (year_high - year_low)) * 100 if year_high > year_low else 50
+
+        ma20 = s["ma20"].mean()
+        disparity = None
+        if n >= 20:
+            disparity = (current_price / ma20) * 100 if ma20 > 0 else 100
+
+        macd_val, signal_val, hist_val = None, None, None
+        if n >= 35:
+            macd_val = s["ema12"].value - s["ema26"].value
+            signal_val = s["signal9"].value
+            hist_val = macd_val - signal_val
+
+        upper_b, mid_b, lower_b, pct_b = None, None, None, None
+        if n >= 20:
+            std = s["boll20"].std()
+            mid_b = ma20
+            upper_b, lower_b = mid_b + std * 2, mid_b - std * 2
+            pct_b = _div(current_price - lower_b, upper_b - lower_b) if self.band_seen else 0.5
+
+        slow_k, slow_d = None, None
+        if n >= 20:
+            slow_k = self.last_k
+            slow_d = s["k3"].mean()
+
+        mfi_val = None
+        if n >= 15:
+            mfi_val = 100 - _div(100, 1 + _div(s["pos_mf14"].sum(), s["neg_mf14"].sum()))
+
+        ma_alignment = "데이터부족"
+        if n >= 120:
+            ma_alignment = classify_ma_alignment(s["ma5"].mean(), ma20, s["ma60"].mean(), s["ma120"].mean())
+
+        current_atr, stop_loss = None, None
+        if n >= 15:
+            current_atr = s["tr14"].mean()
+            stop_loss = current_price - (2 * current_atr)
+
+        score = composite_score(n, current_rsi, volume_ratio, hist_val, pct_b, slow_k, ma_alignment, mfi_val)
+
+        return {
+            "price": current_price,
+            "rsi": current_rsi,
+            "volume_ratio": volume_ratio,
+            "position_52w": position_52w,
+            "disparity": disparity,
+            "macd": {"line": macd_val, "signal": signal_val, "hist": hist_val},
+            "bollinger": {"upper": upper_b, "mid": mid_b, "lower": lower_b, "pct_b": pct_b},
+            "stochastic": {"k": slow_k, "d": slow_d},
+            "mfi": mfi_val,
+            "ma_alignment": ma_alignment,
+            "atr": current_atr,
+            "stop_loss": stop_loss,
+            "score": score,
+            "data_points": n
+        }
+
+    # --- 마지막 봉 되돌리기 ---
+    def _scalars(self):
+        return (self.row_count, self.last_date, self.prev_close, self.prev_tp,
+                self.band_seen, self.last_k, self.last_volume)
+
+    def _rollback(self):
+        """마지막 봉 반영 전으로 복구 (지표마다 토큰 하나씩 -> 상태 전체 복사 없음)"""
+        if self.undo_log is not None:
+            scalars, log = self.undo_log
+            (self.row_count, self.last_date, self.prev_close, self.prev_tp,
+             self.band_seen, self.last_k, self.last_volume) = scalars
+            for key, token, replaced in reversed(log):
+                if replaced is not None:
+                    self.s[key] = replaced
+                else:
+                    self.s[key].undo(token)
+        elif self.checkpoint is not None:
+            self._restore(self.checkpoint)
+        self.undo_log = None
+        self.checkpoint = None
+
+    # --- 상태 직렬화 ---
+    def _state(self):
+        return {
+            "row_count": self.row_count,
+            "last_date": self.last_date,
+            "prev_close": self.prev_close,
+            "prev_tp": self.prev_tp,
+            "band_seen": self.band_seen,
+            "last_k": self.last_k,
+            "last_volume": self.last_volume,
+            "series": {key: {"type": type(obj).__name__, **obj.to_dict()} for key, obj in self.s.items()},
+        }
+
+    def _restore(self, state):
+        self.row_count = state["row_count"]
+        self.last_date = state["last_date"]
+        self.prev_close = state["prev_close"]
+        self.prev_tp = state["prev_tp"]
+        self.band_seen = state["band_seen"]
+        self.last_k = state["last_k"]
+        self.last_volume = state["last_volume"]
+        self.s = {
+            key: _SERIALIZERS[d["type"]].from_dict(d)
+            for key, d in state["series"].items()
+        }
+
+    def to_dict(self):
+        """JSON 직렬화 가능한 상태 (장중 재갱신용 체크포인트 포함)"""
+        state = self._state()
+        checkpoint = self.checkpoint
+        if self.undo_log is not None:
+            # 저장할 때만 사본에서 마지막 봉을 되돌려 직전 상태를 만듦
+            previous = IncrementalAnalyzer()
+            previous._restore(state)
+            previous.undo_log = self.undo_log
+            previous._rollback()
+            checkpoint = previous._state()
+        return {"state": state, "checkpoint": checkpoint}
+
+    @classmethod
+    def from_dict(cls, d):
+        analyzer = cls()
+        analyzer._restore(d["state"])
+        analyzer.checkpoint = d.get("checkpoint")
+        return analyzer
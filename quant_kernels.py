@@ -0,0 +1,149 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 지표 계산용 NumPy 커널 (pandas rolling/ewm과 같은 결과, 중간 Series 생성 없음)
+# 입력은 1차원(날짜) 또는 2차원(날짜 x 종목) 배열, 모두 0번 축(날짜) 방향으로 계산
+# 결과 앞쪽 window-1개는 NaN (pandas min_periods=window와 동일)
+
+def _float(x):
+    return np.asarray(x, dtype=float)
+
+def shift(x, periods=1):
+    """x.shift(periods) (양수만)"""
+    x = _float(x)
+    out = np.full(x.shape, np.nan)
+    if periods < len(x):
+        out[periods:] = x[:len(x) - periods]
+    return out
+
+def _window_count(mask, window):
+    """구간 안 True 개수 (길이 len - window + 1)"""
+    c = np.cumsum(mask, axis=0, dtype=np.int64)
+    out = c[window - 1:].copy()
+    out[1:] -= c[:len(c) - window]
+    return out
+
+def _constant_windows(x, window):
+    """구간 안 값이 모두 같은지 (NaN이 있으면 False)"""
+    steps = np.ones(x.shape, dtype=bool)
+    np.not_equal(x[1:], x[:-1], out=steps[1:])
+    # 구간 [t-window+1, t]의 변화 여부는 steps[t-window+2 .. t]
+    c = np.cumsum(steps, axis=0, dtype=np.int64)
+    return c[window - 1:] == c[:len(c) - window + 1]
+
+def _rolling_sum(x, window, constant):
+    out = np.full(x.shape, np.nan)
+    finite = np.isfinite(x)
+    missing = None
+    if finite.all():
+        c = np.cumsum(x, axis=0)
+    elif np.isinf(x).any():
+        # inf가 섞인 드문 경우는 구간별 직접 합산 (inf - inf 누적 오류 방지)
+        out[window - 1:] = sliding_window_view(x, window, axis=0).sum(axis=-1)
+        return out
+    else:
+        missing = ~finite
+        c = np.cumsum(np.where(finite, x, 0.0), axis=0)
+    sums = out[window - 1:]
+    sums[...] = c[window - 1:]
+    sums[1:] -= c[:len(c) - window]
+    np.copyto(sums, x[window - 1:] * window, where=constant)
+    if missing is not None:
+        np.copyto(sums, np.nan, where=_window_count(missing, window) > 0)
+    return out
+
+def rolling_sum(x, window):
+    """
+    누적합 차분으로 구간 합 계산
+    - 값이 일정한 구간은 정확히 값 x window (누적 오차로 0/0, 밴드폭 0 판정이 어긋나는 것 방지)
+    - NaN이 포함된 구간은 NaN (pandas min_periods=window와 동일)
+    """
+    x = _float(x)
+    if len(x) < window: return np.full(x.shape, np.nan)
+    return _rolling_sum(x, window, _constant_windows(x, window))
+
+def rolling_mean(x, window):
+    return rolling_sum(x, window) / window
+
+def rolling_std(x, window, ddof=1):
+    """구간 표준편차 (열 평균을 빼고 누적 제곱합 -> 큰 가격대의 자릿수 손실 방지, 값이 일정한 구간은 0)"""
+    x = _float(x)
+    if len(x) < window: return np.full(x.shape, np.nan)
+    constant = _constant_windows(x, window)
+    with np.errstate(invalid='ignore'):
+        center = np.nanmean(x, axis=0) if np.isfinite(x).any() else 0.0
+    centered = x - center
+    sums = _rolling_sum(centered, window, constant)
+    squares = _rolling_sum(centered * centered, window, constant)
+    var = np.maximum((squares - sums * sums / window) / (window - ddof), 0.0)
+    var[window - 1:][constant] = 0.0
+    return np.sqrt(var)
+
+def _rolling_extreme(x, window, op):
+    """
+    구간 최솟값/최댓값 (길이를 두 배씩 늘린 구간 결과 두 개를 겹쳐 합침 -> log2(window)번 연산)
+    NaN이 포함된 구간은 NaN
+    """
+    x = _float(x)
+    out = np.full(x.shape, np.nan)
+    n = len(x)
+    if n < window: return out
+    span, m = 1, x
+    while span * 2 <= window:
+        m = op(m[:-span], m[span:])   # m[i] = op(x[i : i + 2*span])
+        span *= 2
+    out[window - 1:] = op(m[:n - window + 1], m[window - span:n - span + 1])
+    return out
+
+def rolling_min(x, window):
+    return _rolling_extreme(x, window, np.minimum)
+
+def rolling_max(x, window):
+    return _rolling_extreme(x, window, np.maximum)
+
+def ema(x, span):
+    """
+    x.ewm(span=span, adjust=False).mean()
+    y[t] = a*x[t] + (1-a)*y[t-1] 점화식을 블록 단위 닫힌 식(누적합)으로 계산 (블록 사이만 반복)
+    첫 값 이전 NaN은 건너뛰고, 중간에 NaN이 있으면 None (호출 쪽에서 pandas로 계산)
+    """
+    x = _float(x)
+    flat = x.ndim == 1
+    if flat: x = x[:, None]
+    n = len(x)
+    out = np.full(x.shape, np.nan)
+    if n == 0: return out[:, 0] if flat else out
+
+    valid = ~np.isnan(x)
+    first = valid.argmax(axis=0)
+    started = np.arange(n)[:, None] >= first
+    if (started & ~valid).any():
+        return None
+    cols = np.arange(x.shape[1])
+    seed = x[first, cols]
+    # 첫 값과의 차이로 계산 (시작 전은 첫 값으로 채워 0, 첫 값이 이어지는 구간은 pandas처럼 정확히 첫 값)
+    filled = np.where(started, x, seed) - seed
+
+    a = 2.0 / (span + 1)
+    d = 1.0 - a
+    # d^-block이 1e100을 넘지 않는 블록 길이
+    block = max(1, min(n, int(100 * math.log(10) / -math.log(d))))
+    prev = np.zeros(x.shape[1])  # y[-1] = x[0] 으로 두면 y[0] = x[0]
+    for s in range(0, n, block):
+        seg = filled[s:s + block]
+        i = np.arange(len(seg))[:, None]
+        decay = d ** i
+        acc = np.cumsum(seg * d ** -i, axis=0)
+        y = decay * d * prev + a * decay * acc
+        out[s:s + len(seg)] = y
+        prev = y[-1]
+    out += seed
+    out[~started] = np.nan
+    return out[:, 0] if flat else out
+
+def true_range(high, low, close):
+    """max(고가-저가, |고가-전일종가|, |저가-전일종가|) (NaN은 건너뜀, 첫 봉은 고가-저가)"""
+    high, low = _float(high), _float(low)
+    prev_close = shift(close)
+    return np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
@@ -8,18 +8,21 @@ logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").set
 logging.getLogger("streamlit").setLevel(logging.ERROR)
 
 import pandas as pd
-import time
-import random
 
-from utils import init_connection, fetch_stock_data, fix_encoding
+from utils import init_connection, fetch_stock_data, fix_encoding, get_active_targets
+from price_store import load_histories
 from quant_analyzer import analyze_stock
+from metrics_snapshot import snapshot_metrics
+import telemetry
 
 def print_separator():
     print("-" * 70)
 
-def evaluate_stock(row):
+def evaluate_stock(row, history=None, metrics=None):
     """
     개별 종목에 대한 10대 지표 분석 및 리포트 출력
+    - history: 일괄 수집된 1년치 OHLCV (없으면 개별 조회)
+    - metrics: 지표 스냅샷 (있으면 재계산 생략)
     """
     keyword = row['keyword']
     ticker = row['ticker']
@@ -31,13 +34,16 @@ def evaluate_stock(row):
         return
 
     # 1. 1년치 데이터 가져오기 (고급 지표용)
-    data = fetch_stock_data(ticker, period="1y")
-    if not data or data['history'] is None:
-        print("  ! 분석 불가: 주가 데이터를 가져올 수 없습니다.")
-        return
+    if metrics is None and history is None:
+        data = fetch_stock_data(ticker, period="1y")
+        if not data or data['history'] is None:
+            print("  ! 분석 불가: 주가 데이터를 가져올 수 없습니다.")
+            return
+        history = data['history']
     
-    # 2. 퀀트 분석 엔진 가동 (10대 지표)
-    metrics = analyze_stock(data['history'])
+    # 2. 퀀트 분석 엔진 가동 (10대 지표, 스냅샷이 없을 때만)
+    if metrics is None:
+        metrics = analyze_stock(history)
     
     if "error" in metrics:
         print(f"  ! {metrics['error']}")
@@ -126,24 +132,39 @@ def main():
         return
 
     # DB에서 활성 종목 가져오기
-    res = supabase.table('keywords').select("*").eq('is_active', True).execute()
-    stocks = res.data
+    with telemetry.span("db"):
+        stocks = get_active_targets(supabase)
     
     if not stocks:
         print("🤔 분석할 활성 종목이 없습니다.")
         return
 
-    print(f"📡 총 {len(stocks)}개의 종목을 순차적으로 분석합니다 (안전 지연 시간 포함)...\n")
+    # 주가 데이터 일괄 수집 (로컬 저장소 + 신규 봉만 다중 티커 요청)
+    tickers = [s['ticker'] for s in stocks if s.get('ticker')]
+    print(f"📡 총 {len(stocks)}개 종목의 주가 데이터를 일괄 수집합니다 ({len(tickers)}개 티커)...")
+    with telemetry.span("price_fetch", tickers=len(tickers)) as record:
+        histories, failures = load_histories(tickers, period="1y")
+        record["ok"] = not failures
+    print(f"  -> 수집 성공 {len(histories)}건 / 실패 {len(failures)}건")
+
+    # 지표 스냅샷 (새 봉이 생긴 종목만 재계산)
+    with telemetry.span("snapshot", tickers=len(histories)):
+        snapshots = snapshot_metrics(histories, supabase)
+    reused = sum(1 for v in snapshots.values() if v["cached"])
+    print(f"  -> 지표 스냅샷 재사용 {reused}건 / 재계산 {len(snapshots) - reused}건\n")
     
-    for idx, stock in enumerate(stocks):
-        evaluate_stock(stock)
-        
-        # 마지막 종목이 아니면 랜덤 지연 추가 (1.0~2.5초)
-        if idx < len(stocks) - 1:
-            delay = random.uniform(1.0, 2.5)
-            print(f"  [Wait] 안전을 위해 {delay:.1f}초 대기 중...")
-            time.sleep(delay)
-            print_separator()
+    for stock in stocks:
+        ticker = stock.get('ticker')
+        if ticker in failures:
+            print(f"\n[종목 분석: {stock['keyword']} ({ticker})]")
+            print(f"  ! 분석 불가: 주가 데이터 수집 실패 ({failures[ticker]})")
+            continue
+        with telemetry.span("analyze", stock['keyword']):
+            snap = snapshots.get(ticker)
+            evaluate_stock(stock, histories.get(ticker), snap["metrics"] if snap else None)
+        print_separator()
+
+    telemetry.finish_batch("quant_reporter")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,26 @@
+-- 스캐너 일괄 upsert (on_conflict=keyword) 를 위한 keyword 고유 제약 (재실행해도 안전)
+-- 1. 기존 중복 keyword 정리 (사용자가 고정한 행 우선, 그다음 가장 먼저 등록된 행만 남김)
+DELETE FROM keywords
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY keyword
+            ORDER BY COALESCE(is_fixed, FALSE) DESC, id
+        ) AS rank
+        FROM keywords
+    ) ranked
+    WHERE rank > 1
+);
+
+-- 2. 고유 제약 추가 (이미 있으면 건너뜀)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'keywords_keyword_key'
+          AND conrelid = 'keywords'::regclass
+    ) THEN
+        ALTER TABLE keywords
+            ADD CONSTRAINT keywords_keyword_key UNIQUE (keyword);
+    END IF;
+END $$;
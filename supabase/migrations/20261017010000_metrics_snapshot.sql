@@ -0,0 +1,13 @@
+-- 종목별 최신 지표 스냅샷 (마지막 봉 기준 1회 계산, 대시보드/리포터/봇이 공유)
+-- bar_date + close가 최신 봉과 같으면 재사용, 다르면 재계산 후 upsert (on_conflict=ticker)
+CREATE TABLE IF NOT EXISTS metrics_snapshot (
+    ticker TEXT PRIMARY KEY,
+    bar_date DATE NOT NULL,
+    close DOUBLE PRECISION NOT NULL,
+    change_pct DOUBLE PRECISION,
+    score INTEGER,
+    metrics JSONB NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS metrics_snapshot_bar_date_idx ON metrics_snapshot (bar_date);
@@ -0,0 +1,212 @@
+import re
+import time
+import queue
+import atexit
+import random
+import threading
+from concurrent.futures import Future
+import http_client
+
+# 텔레그램 전송 큐 (공용 http_client 세션 + 채팅/전체 전송 간격 + 4096자 분할 + 재시도)
+MAX_MESSAGE_LEN = 4096
+PER_CHAT_INTERVAL = 1.0     # 같은 채팅방 초당 1건
+GLOBAL_INTERVAL = 1 / 30    # 봇 전체 초당 30건
+MAX_RETRIES = 4
+
+_TOKEN_RE = re.compile(r"(<[^>]+>|\n)")
+_TAG_RE = re.compile(r"<\s*(/)?\s*([a-zA-Z0-9-]+)[^>]*?(/)?\s*>")
+_PIECE_RE = re.compile(r"(&#?\w+;|\s+)")
+
+def _text_pieces(text, limit):
+    """텍스트를 단어/공백/HTML 엔티티 단위로 나누고, limit보다 긴 조각은 글자 단위로 자름"""
+    for piece in _PIECE_RE.split(text):
+        if not piece: continue
+        if len(piece) <= limit:
+            yield piece
+        else:
+            for i in range(0, len(piece), limit):
+                yield piece[i:i + limit]
+
+def split_html_message(text, limit=MAX_MESSAGE_LEN):
+    """
+    HTML 태그를 깨뜨리지 않고 limit 이하로 분할
+    - 가능하면 줄바꿈 위치에서 자르고, 열린 태그는 닫은 뒤 다음 조각에서 다시 엶
+    """
+    if len(text) <= limit:
+        return [text]
+
+    chunks = []
+    stack = []          # [(태그명, 원래 여는 태그)]
+    current = ""
+    line_mark = None    # (current 내 위치, 당시 stack)
+
+    def closing(tags):
+        return "".join(f"</{name}>" for name, _ in reversed(tags))
+
+    def reopening(tags):
+        return "".join(tag for _, tag in tags)
+
+    def emit(piece):
+        nonlocal current, line_mark
+        budget = limit - len(closing(stack)) - 16  # 닫는 태그 여유
+        # 줄바꿈에서 자른 뒤 남은 부분이 여전히 넘치면 다시 확인 -> 현재 위치에서 강제 분할
+        # (current는 태그/엔티티 조각 단위로만 쌓이므로 끝에서 자르면 태그 중간이 잘리지 않음)
+        while current and len(current) + len(piece) > budget and current != reopening(stack):
+            if line_mark and line_mark[0] > len(current) // 2:
+                pos, tags = line_mark
+                chunks.append(current[:pos] + closing(tags))
+                current = reopening(tags) + current[pos:]
+            else:
+                chunks.append(current + closing(stack))
+                current = reopening(stack)
+            line_mark = None
+        current += piece
+
+    for token in _TOKEN_RE.split(text):
+        if not token: continue
+        tag = _TAG_RE.fullmatch(token)
+        if tag:
+            emit(token)
+            is_close, name, self_closing = tag.group(1), tag.group(2).lower(), tag.group(3)
+            if is_close:
+                for i in range(len(stack) - 1, -1, -1):
+                    if stack[i][0] == name:
+                        del stack[i]
+                        break
+            elif not self_closing:
+                stack.append((name, token))
+        elif token == "\n":
+            emit(token)
+            line_mark = (len(current), list(stack))
+        else:
+            for piece in _text_pieces(token, limit - 64):
+                emit(piece)
+    if current.strip():
+        chunks.append(current + closing(stack))
+    return chunks
+
+def strip_html(text):
+    return re.sub(r"<[^>]+>", "", text)
+
+class _Gate:
+    """최소 전송 간격 보장 (스레드 안전)"""
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            at = max(now, self.next_at)
+            self.next_at = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+    def delay(self, seconds):
+        with self.lock:
+            self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+class TelegramSender:
+    def __init__(self, token, per_chat_interval=PER_CHAT_INTERVAL, global_interval=GLOBAL_INTERVAL, max_retries=MAX_RETRIES):
+        self.url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self.per_chat_interval = per_chat_interval
+        self.global_gate = _Gate(global_interval)
+        self.chat_gates = {}
+        self.max_retries = max_retries
+        self.metrics = {"messages": 0, "chunks": 0, "sent": 0, "failed": 0, "retries": 0, "throttled": 0, "plain_fallback": 0}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.metrics[name] += n
+
+    def _gate(self, chat_id):
+        with self._lock:
+            if chat_id not in self.chat_gates:
+                self.chat_gates[chat_id] = _Gate(self.per_chat_interval)
+            return self.chat_gates[chat_id]
+
+    def send(self, chat_id, text):
+        """전송 예약 -> Future (결과: 모든 조각 전송 성공 여부)"""
+        future = Future()
+        self._count("messages")
+        self._queue.put((chat_id, text, future))
+        return future
+
+    def flush(self, timeout=None):
+        """대기 중인 메시지가 모두 처리될 때까지 대기"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline: return False
+            time.sleep(0.05)
+        return True
+
+    def _run(self):
+        while True:
+            chat_id, text, future = self._queue.get()
+            try:
+                chunks = split_html_message(text)
+                self._count("chunks", len(chunks))
+                ok = True
+                for chunk in chunks:
+                    ok = self._send_chunk(chat_id, chunk) and ok
+                future.set_result(ok)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _send_chunk(self, chat_id, text):
+        data = {"chat_id": chat_id, "text": text, "parse_mode": "HTML", "disable_web_page_preview": "true"}
+        gate = self._gate(chat_id)
+        for attempt in range(self.max_retries + 1):
+            gate.wait()
+            self.global_gate.wait()
+            try:
+                # 재시도/대기는 아래에서 텔레그램 응답(retry_after)에 맞춰 직접 처리
+                res = http_client.post(self.url, data=data, timeout=10, retries=0)
+                body = res.json() if res.headers.get("content-type", "").startswith("application/json") else {}
+                if res.status_code == 200 and body.get("ok", True):
+                    self._count("sent")
+                    return True
+                if res.status_code == 429:
+                    # 텔레그램이 알려준 대기 시간만큼 해당 채팅방 전송 보류
+                    retry_after = body.get("parameters", {}).get("retry_after", 1 + attempt)
+                    self._count("throttled")
+                    self._count("retries")
+                    gate.delay(retry_after)
+                    continue
+                elif res.status_code == 400 and "parse" in body.get("description", "") and "parse_mode" in data:
+                    # HTML 파싱 오류 -> 태그 제거 후 일반 텍스트로 재전송
+                    self._count("plain_fallback")
+                    data = {"chat_id": chat_id, "text": strip_html(text), "disable_web_page_preview": "true"}
+                    continue
+                elif res.status_code < 500:
+                    print(f"전송 실패 ({res.status_code}): {body.get('description', res.text[:200])}")
+                    break
+            except Exception as e:
+                print(f"전송 오류: {e}")
+            if attempt < self.max_retries:
+                self._count("retries")
+                time.sleep(min(30, 2 ** attempt) + random.uniform(0, 0.5))
+        self._count("failed")
+        return False
+
+_senders = {}
+_senders_lock = threading.Lock()
+
+def get_sender(token):
+    with _senders_lock:
+        if token not in _senders:
+            _senders[token] = TelegramSender(token)
+        return _senders[token]
+
+@atexit.register
+def _flush_all():
+    # 스크립트 종료 전에 큐에 남은 메시지 전송
+    for sender in list(_senders.values()):
+        sender.flush(timeout=120)
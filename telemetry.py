@@ -0,0 +1,176 @@
+import os
+import json
+import math
+import time
+import datetime
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# 단계별 소요 시간 계측 (span 기록 -> JSON lines / Prometheus 텍스트 내보내기 + p50/p95 요약)
+# span은 contextvars로 전달되어 asyncio 태스크와 asyncio.to_thread 스레드 안에서도 상위 span(키워드)을 이어받음
+TELEMETRY_DIR = os.environ.get(
+    "TELEMETRY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "telemetry"),
+)
+PROM_PREFIX = "brianai"
+
+_current = contextvars.ContextVar("telemetry_span", default=None)
+_lock = threading.Lock()
+_spans = []
+
+@contextmanager
+def span(stage, keyword=None, **attrs):
+    """
+    with span("rss", keyword): ...
+    keyword를 생략하면 상위 span의 keyword를 사용, 예외가 나면 실패로 기록 후 다시 발생
+    """
+    parent = _current.get()
+    record = {
+        "stage": stage,
+        "keyword": keyword if keyword is not None else (parent or {}).get("keyword"),
+        "ts": time.time(),
+        "seconds": 0.0,
+        "bytes": 0,
+        "cache_hit": None,
+        "ok": True,
+        **attrs,
+    }
+    token = _current.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["ok"] = False
+        record["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        _current.reset(token)
+        with _lock:
+            _spans.append(record)
+
+def annotate(bytes=0, **fields):
+    """현재 span에 전송량 누적 / 캐시 적중, 실패 여부 등 기록 (span 밖이면 무시)
+    ok는 한 번 False가 되면 이후 ok=True로 덮어쓰지 않음 (span 안의 일부 실패도 실패로 집계)"""
+    record = _current.get()
+    if record is None: return
+    with _lock:
+        record["bytes"] += bytes
+        if "ok" in fields:
+            fields["ok"] = record.get("ok", True) and fields["ok"]
+        record.update(fields)
+
+def spans():
+    with _lock:
+        return list(_spans)
+
+def reset():
+    with _lock:
+        _spans.clear()
+
+def _quantile(sorted_values, q):
+    if not sorted_values: return None
+    # nearest-rank 방식
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+def summary(records=None):
+    """단계별 {count, failures, total, p50, p95, max, bytes, cache_hits, cache_lookups}"""
+    records = spans() if records is None else records
+    by_stage = {}
+    for r in records:
+        by_stage.setdefault(r["stage"], []).append(r)
+    result = {}
+    for stage, items in by_stage.items():
+        durations = sorted(r["seconds"] for r in items)
+        lookups = [r["cache_hit"] for r in items if r["cache_hit"] is not None]
+        result[stage] = {
+            "count": len(items),
+            "failures": sum(1 for r in items if not r["ok"]),
+            "total": sum(durations),
+            "p50": _quantile(durations, 0.5),
+            "p95": _quantile(durations, 0.95),
+            "max": durations[-1],
+            "bytes": sum(r["bytes"] for r in items),
+            "cache_hits": sum(1 for hit in lookups if hit),
+            "cache_lookups": len(lookups),
+        }
+    return result
+
+def keyword_summary(records=None):
+    """키워드별 단계 소요 시간 합계 {키워드: {단계: 초}}"""
+    records = spans() if records is None else records
+    result = {}
+    for r in records:
+        if not r.get("keyword"): continue
+        stages = result.setdefault(r["keyword"], {})
+        stages[r["stage"]] = stages.get(r["stage"], 0.0) + r["seconds"]
+    return result
+
+def export_jsonl(path=None, records=None):
+    records = spans() if records is None else records
+    path = path or os.path.join(TELEMETRY_DIR, "spans.jsonl")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False, default=str) + "\n")
+    return path
+
+def prometheus_text(stats, job):
+    lines = [
+        f"# HELP {PROM_PREFIX}_stage_duration_seconds Stage duration per batch run",
+        f"# TYPE {PROM_PREFIX}_stage_duration_seconds summary",
+    ]
+    for stage, st in sorted(stats.items()):
+        labels = f'job="{job}",stage="{stage}"'
+        lines.append(f'{PROM_PREFIX}_stage_duration_seconds{{{labels},quantile="0.5"}} {st["p50"]:.6f}')
+        lines.append(f'{PROM_PREFIX}_stage_duration_seconds{{{labels},quantile="0.95"}} {st["p95"]:.6f}')
+        lines.append(f'{PROM_PREFIX}_stage_duration_seconds_sum{{{labels}}} {st["total"]:.6f}')
+        lines.append(f'{PROM_PREFIX}_stage_duration_seconds_count{{{labels}}} {st["count"]}')
+    for metric, key, help_text in (
+        ("stage_failures_total", "failures", "Failed spans"),
+        ("stage_bytes_total", "bytes", "Bytes transferred"),
+        ("stage_cache_hits_total", "cache_hits", "Cache hits"),
+        ("stage_cache_lookups_total", "cache_lookups", "Cache lookups"),
+    ):
+        lines.append(f"# HELP {PROM_PREFIX}_{metric} {help_text}")
+        lines.append(f"# TYPE {PROM_PREFIX}_{metric} counter")
+        for stage, st in sorted(stats.items()):
+            lines.append(f'{PROM_PREFIX}_{metric}{{job="{job}",stage="{stage}"}} {st[key]}')
+    return "\n".join(lines) + "\n"
+
+def export_prometheus(job, path=None, stats=None):
+    """node_exporter textfile collector 형식 (임시 파일에 쓰고 교체)"""
+    stats = summary() if stats is None else stats
+    path = path or os.path.join(TELEMETRY_DIR, f"{job}.prom")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(stats, job))
+    os.replace(tmp, path)
+    return path
+
+def finish_batch(job, export=True, slowest=5):
+    """배치 종료: 단계별 p50/p95 요약 출력 + 내보내기 후 기록 초기화"""
+    records = spans()
+    if not records: return {}
+    stats = summary(records)
+    print(f"\n⏱️ [{job}] 단계별 소요 시간 ({datetime.datetime.now():%H:%M:%S})")
+    print(f"  {'stage':<12}{'count':>6}{'fail':>6}{'p50':>9}{'p95':>9}{'total':>9}{'KB':>9}{'hit':>8}")
+    for stage, st in sorted(stats.items(), key=lambda kv: -kv[1]["total"]):
+        hit = f"{st['cache_hits']}/{st['cache_lookups']}" if st["cache_lookups"] else "-"
+        print(f"  {stage:<12}{st['count']:>6}{st['failures']:>6}{st['p50']:>8.2f}s{st['p95']:>8.2f}s"
+              f"{st['total']:>8.1f}s{st['bytes'] / 1024:>9.0f}{hit:>8}")
+    per_keyword = keyword_summary(records)
+    if per_keyword:
+        ranked = sorted(per_keyword.items(), key=lambda kv: -kv[1].get("keyword", sum(kv[1].values())))[:slowest]
+        print("  느린 키워드: " + ", ".join(
+            f"{k} {v.get('keyword', sum(v.values())):.1f}s" for k, v in ranked))
+    if export and os.environ.get("TELEMETRY_EXPORT", "1") != "0":
+        try:
+            export_jsonl(records=[{**r, "job": job} for r in records])
+            export_prometheus(job, stats=stats)
+        except OSError as e:
+            print(f"⚠️ 계측 결과 저장 실패: {e}")
+    reset()
+    return stats
@@ -0,0 +1,35 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from compact_ohlcv import COLUMNS, CompactOHLCV
+
+# 캐시 저장 형태(float32)와 계산용 DataFrame(float64) 왕복
+def frame(n=30):
+    rng = np.random.default_rng(0)
+    close = 50_000 + np.cumsum(rng.normal(0, 500, n))
+    return pd.DataFrame({
+        "Open": close + 100, "High": close + 300, "Low": close - 300, "Close": close,
+        "Volume": rng.integers(0, 5_000_000, n),
+    }, index=pd.bdate_range("2024-01-02", periods=n, tz="Asia/Seoul"))
+
+def test_to_frame_restores_float64():
+    compact = CompactOHLCV.from_frame(frame())
+    assert compact.ohlc.dtype == np.float32
+    df = compact.to_frame()
+    assert list(df.columns) == COLUMNS
+    assert all(df[c].dtype == np.float64 for c in COLUMNS[:4])
+    assert df["Volume"].dtype == np.int64
+    # 계산용 열은 캐시 버퍼와 메모리를 공유하지 않음
+    assert not any(np.shares_memory(df[c].to_numpy(), compact.ohlc) for c in COLUMNS[:4])
+
+def test_round_trip_within_float32():
+    original = frame()
+    df = pickle.loads(pickle.dumps(CompactOHLCV.from_frame(original))).to_frame()
+    assert list(df.index.strftime("%Y-%m-%d")) == list(original.index.strftime("%Y-%m-%d"))
+    np.testing.assert_allclose(df[COLUMNS[:4]].to_numpy(), original[COLUMNS[:4]].to_numpy(), rtol=1e-7)
+    assert df["Volume"].tolist() == original["Volume"].tolist()
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from listing_parser import parse_naver_listing
+
+# 네이버 금융 시세 목록 페이지 재구성본 (EUC-KR, 목록 종류별 1개) -> 종목코드 / 시장 / 등락률
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "naver")
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="euc-kr") as f:
+        return f.read()
+
+CASES = [
+    # (파일, default_market, table_class, [(코드, 시장, 등락률)])
+    ("sise_upper.html", None, "type_2", [
+        ("001440", "KOSPI", 29.99), ("009410", "KOSPI", 30.00),
+        ("086520", "KOSDAQ", 29.85), ("263750", "KOSDAQ", 30.00), ("058470", "KOSDAQ", 29.91),
+    ]),
+    ("sise_rise_kospi.html", "KOSPI", "type_2", [
+        ("042700", "KOSPI", 10.06), ("012450", "KOSPI", 6.19), ("005930", "KOSPI", 1.43),
+        ("373220", "KOSPI", 1.13), ("035420", "KOSPI", 0.43), ("068270", "KOSPI", 0.06),
+    ]),
+    ("sise_fall_kosdaq.html", "KOSDAQ", "type_2", [
+        ("293490", "KOSDAQ", -12.95), ("247540", "KOSDAQ", -6.51), ("196170", "KOSDAQ", -3.00), ("028300", "KOSDAQ", -0.64),
+    ]),
+    # 증가율 칸이 종목명 앞에 있어도 '등락률' 헤더 칸을 사용
+    ("sise_quant_high_kospi.html", "KOSPI", "type_2", [
+        ("001440", "KOSPI", 29.99), ("011200", "KOSPI", -1.97), ("005380", "KOSPI", 0.00),
+    ]),
+    # 검색비율 칸에도 '%'가 있어 헤더로 등락률 칸을 찾아야 함
+    ("lastsearch2.html", None, "type_5", [
+        ("005930", None, 1.43), ("000660", None, 2.08), ("247540", None, -6.51), ("042700", None, 10.06),
+    ]),
+]
+
+@pytest.mark.parametrize("name,default_market,table_class,expected", CASES, ids=[c[0] for c in CASES])
+def test_parse_naver_listing(name, default_market, table_class, expected):
+    rows = parse_naver_listing(load(name), default_market, table_class=table_class)
+    assert [(r.code, r.market) for r in rows] == [(code, market) for code, market, _ in expected]
+    assert [r.change for r in rows] == pytest.approx([change for _, _, change in expected])
+
+def test_upper_market_from_heading_ignores_sidebar():
+    # 표 뒤의 사이드바 '코스피 시가총액 상위' 제목이 마지막 코스닥 표의 시장을 바꾸지 않아야 함
+    rows = parse_naver_listing(load("sise_upper.html"))
+    assert {r.market for r in rows if r.code in ("086520", "263750", "058470")} == {"KOSDAQ"}
+    assert all(r.price and r.volume for r in rows)
+
+def test_default_market_overrides_heading():
+    rows = parse_naver_listing(load("sise_upper.html"), "KOSDAQ")
+    assert {r.market for r in rows} == {"KOSDAQ"}
@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.testing import assert_allclose
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import quant_analyzer as qa
+from quant_incremental import IncrementalAnalyzer
+
+# IncrementalAnalyzer 결과 = 같은 이력 전체로 돌린 analyze_stock (장중 재갱신 / 저장-복원 포함)
+RTOL = 1e-9
+ATOL = 1e-8
+
+def ohlcv(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame({
+        "Open": close + rng.normal(0, 0.005, n) * close,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, n).astype(float),
+    }, index=pd.bdate_range("2020-01-02", periods=n))
+
+def bar(df, i, **changes):
+    row = df.iloc[i].to_dict()
+    row.update(changes)
+    return {**row, "Date": df.index[i]}
+
+def assert_metrics(expected, actual, name=""):
+    assert expected.keys() == actual.keys(), name
+    for key, e in expected.items():
+        a = actual[key]
+        if isinstance(e, dict):
+            assert_metrics(e, a, f"{name}.{key}")
+        elif isinstance(e, str) or e is None:
+            assert e == a, f"{name}.{key}"
+        else:
+            assert_allclose(float(a), float(e), rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=f"{name}.{key}")
+
+@pytest.fixture(autouse=True)
+def pandas_backend():
+    previous = qa.BACKEND
+    qa.set_backend("pandas")
+    yield
+    qa.set_backend(previous)
+
+@pytest.mark.parametrize("n", [5, 30, 130, 300])
+def test_update_matches_analyze_stock(n):
+    df = ohlcv(n + 5, seed=n)
+    analyzer = IncrementalAnalyzer.from_history(df.iloc[:n])
+    assert_metrics(qa.analyze_stock(df.iloc[:n]), analyzer.last_metrics, "history")
+    for i in range(n, len(df)):
+        assert_metrics(qa.analyze_stock(df.iloc[:i + 1]), analyzer.update(bar(df, i)), f"bar {i}")
+
+def test_intraday_reupdate_then_new_bar():
+    # 마지막 봉을 장중 가격으로 여러 번 갱신(신고가/신저가 포함) -> 종가 확정 -> 다음 봉
+    df = ohlcv(300, seed=1)
+    analyzer = IncrementalAnalyzer.from_history(df.iloc[:280])
+    for i in range(280, 300):
+        close = df["Close"].iloc[i]
+        year_high, year_low = df["High"].iloc[:i].max(), df["Low"].iloc[:i].min()
+        for intraday in (bar(df, i, High=year_high * 1.1, Close=close * 1.05),
+                         bar(df, i, Low=year_low * 0.9, Close=close * 0.95, Volume=0.0),
+                         bar(df, i)):
+            analyzer.update(intraday)
+        assert_metrics(qa.analyze_stock(df.iloc[:i + 1]), analyzer.last_metrics, f"bar {i}")
+
+    # 첫 봉(from_history의 마지막 봉)도 되돌릴 수 있어야 함
+    analyzer = IncrementalAnalyzer.from_history(df.iloc[:281])
+    analyzer.update(bar(df, 280, Close=df["Close"].iloc[280] * 1.2))
+    analyzer.update(bar(df, 280))
+    assert_metrics(qa.analyze_stock(df.iloc[:282]), analyzer.update(bar(df, 281)), "history tail")
+
+def test_nan_stochastic_rolls_back():
+    # %K가 NaN인 봉(14봉 고가=저가, 종가 누락)은 %D 상태를 교체 -> 장중 재갱신 후에도 같은 결과
+    df = ohlcv(80, seed=2)
+    df.iloc[40:60, :4] = 500.0
+    analyzer = IncrementalAnalyzer.from_history(df.iloc[:55])
+    for i in range(55, 80):
+        analyzer.update(bar(df, i, High=df["High"].iloc[i] + 50))
+        analyzer.update(bar(df, i, Close=float("nan")))
+        assert_metrics(qa.analyze_stock(df.iloc[:i + 1]), analyzer.update(bar(df, i)), f"bar {i}")
+
+def test_to_dict_keeps_rollback():
+    df = ohlcv(200, seed=3)
+    analyzer = IncrementalAnalyzer.from_history(df.iloc[:190])
+    analyzer.update(bar(df, 190, Close=df["Close"].iloc[190] * 1.1))
+    restored = IncrementalAnalyzer.from_dict(json.loads(json.dumps(analyzer.to_dict())))
+    # 저장 직후에도 원래 분석기는 그대로 이어서 계산
+    for target in (restored, analyzer):
+        target.update(bar(df, 190))
+        assert_metrics(qa.analyze_stock(df.iloc[:192]), target.update(bar(df, 191)))
+
+def test_past_bar_rejected():
+    df = ohlcv(30, seed=4)
+    analyzer = IncrementalAnalyzer.from_history(df)
+    with pytest.raises(ValueError):
+        analyzer.update(bar(df, 10))
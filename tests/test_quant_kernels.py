@@ -0,0 +1,189 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.testing import assert_allclose
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import quant_analyzer as qa
+
+# numpy 커널 백엔드 <-> pandas 백엔드 결과 비교 (calculate_* / analyze_stock / analyze_panel / score_panel)
+RTOL = 1e-9
+ATOL = 1e-8
+
+def ohlcv(close, seed=0, start="2020-01-02", index=None):
+    close = np.asarray(close, dtype=float)
+    rng = np.random.default_rng(seed)
+    spread = np.abs(rng.normal(0, 0.01, len(close))) * close
+    df = pd.DataFrame({
+        "Open": close + rng.normal(0, 0.005, len(close)) * close,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000, 1_000_000, len(close)).astype(float),
+    }, index=index if index is not None else pd.bdate_range(start, periods=len(close)))
+    return df
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    return 10_000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+def _random():
+    return ohlcv(random_walk(300, 1), seed=1)
+
+def _flat():
+    # 전 구간 같은 가격 (거래량만 변동)
+    df = ohlcv(np.full(60, 5_000.0), seed=2)
+    df[["Open", "High", "Low"]] = 5_000.0
+    return df
+
+def _flat_tail():
+    # 변동 후 가격이 멈춘 구간 -> 볼린저 밴드폭 0
+    df = ohlcv(random_walk(200, 3), seed=3)
+    df.iloc[-40:, :4] = 777.0
+    return df
+
+def _trending():
+    return ohlcv(np.linspace(1_000, 3_000, 250), seed=4)
+
+def _gapped():
+    # 휴장으로 건너뛴 날짜 + 상/하한가 수준 갭
+    close = random_walk(260, 5)
+    close[80:] *= 1.3
+    close[170:] *= 0.7
+    index = pd.bdate_range("2020-01-02", periods=400)[np.sort(np.random.default_rng(5).choice(400, 260, replace=False))]
+    return ohlcv(close, seed=5, index=index)
+
+def _short():
+    return ohlcv(random_walk(10, 6), seed=6)
+
+def _interior_nan():
+    # 중간 빈 봉 -> ema()가 None을 반환해 pandas ewm으로 계산
+    df = ohlcv(random_walk(150, 7), seed=7)
+    df.iloc[90, :] = np.nan
+    return df
+
+SERIES = {
+    "random": _random, "flat": _flat, "flat_tail": _flat_tail, "trending": _trending,
+    "gapped": _gapped, "short": _short, "interior_nan": _interior_nan,
+}
+
+@pytest.fixture
+def backend():
+    previous = qa.BACKEND
+    yield qa.set_backend
+    qa.set_backend(previous)
+
+def run_both(backend, func):
+    backend("pandas")
+    expected = func()
+    backend("numpy")
+    return expected, func()
+
+def assert_same(expected, actual, name):
+    if isinstance(expected, float) or isinstance(actual, float):
+        assert expected == actual, name
+        return
+    assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                    rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=name)
+
+def flat_windows(close, period=20):
+    """%B 비교 제외 위치: 값이 일정한 구간 (밴드폭 0)
+    pandas rolling std는 누적 합 잔차로 1e-5 안팎의 폭을 남겨 임의의 %B(또는 ±inf)를 내고,
+    numpy 커널은 폭을 정확히 0으로 계산해 NaN을 냄 -> 두 값 모두 의미 없는 값이라 비교하지 않음"""
+    values = np.asarray(close, dtype=float)
+    out = np.zeros(len(values), dtype=bool)
+    for i in range(period - 1, len(values)):
+        window = values[i - period + 1:i + 1]
+        out[i] = np.all(window == window[0])
+    return out
+
+CALCULATIONS = {
+    "rsi": lambda df: [qa.calculate_rsi(df["Close"])],
+    "macd": lambda df: list(qa.calculate_macd(df["Close"])),
+    "bollinger": lambda df: list(qa.calculate_bollinger_bands(df["Close"])),
+    "stochastic": lambda df: list(qa.calculate_stochastic(df)),
+    "mfi": lambda df: [qa.calculate_mfi(df)],
+    "atr": lambda df: [qa.calculate_atr(df)],
+}
+
+@pytest.mark.parametrize("series", SERIES)
+@pytest.mark.parametrize("calc", CALCULATIONS)
+def test_calculate_parity(backend, series, calc):
+    df = SERIES[series]()
+    expected, actual = run_both(backend, lambda: CALCULATIONS[calc](df))
+    assert len(expected) == len(actual)
+    for i, (e, a) in enumerate(zip(expected, actual)):
+        if calc == "bollinger" and i == 3 and not isinstance(e, float):
+            skip = flat_windows(df["Close"])
+            e, a = np.asarray(e, dtype=float)[~skip], np.asarray(a, dtype=float)[~skip]
+        assert_same(e, a, f"{series}/{calc}[{i}]")
+
+def assert_metrics(expected, actual, name):
+    assert expected.keys() == actual.keys(), name
+    for key, e in expected.items():
+        a = actual[key]
+        if isinstance(e, dict):
+            assert_metrics(e, a, f"{name}.{key}")
+        elif isinstance(e, str) or e is None:
+            assert e == a, f"{name}.{key}"
+        else:
+            assert_allclose(float(a), float(e), rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=f"{name}.{key}")
+
+@pytest.mark.parametrize("series", [s for s in SERIES if s != "flat"])
+def test_analyze_stock_parity(backend, series):
+    df = SERIES[series]()
+    expected, actual = run_both(backend, lambda: qa.analyze_stock(df))
+    if series == "flat_tail":
+        # 마지막 20봉이 일정 -> %B는 비교 제외 (flat_windows 참고), 점수 판정은 동일해야 함
+        expected["bollinger"].pop("pct_b"), actual["bollinger"].pop("pct_b")
+    assert_metrics(expected, actual, series)
+
+def test_analyze_stock_flat_series_fails_the_same(backend):
+    # 전 구간 일정한 가격은 두 백엔드 모두 %B가 스칼라 0.5 (analyze_stock은 .iloc에서 실패)
+    df = SERIES["flat"]()
+    for name in ("pandas", "numpy"):
+        backend(name)
+        with pytest.raises(AttributeError):
+            qa.analyze_stock(df)
+
+def universe():
+    return {name: SERIES[name]().dropna() for name in SERIES if name not in ("flat", "flat_tail")}
+
+def test_analyze_panel_parity(backend):
+    frames = universe()
+    expected, actual = run_both(backend, lambda: qa.analyze_panel(frames))
+    assert list(expected.index) == list(actual.index)
+    assert list(expected.columns) == list(actual.columns)
+    for column in expected.columns:
+        if not pd.api.types.is_numeric_dtype(expected[column]):
+            assert expected[column].tolist() == actual[column].tolist(), column
+        else:
+            assert_same(expected[column], actual[column], column)
+
+def test_score_panel_parity(backend):
+    frames = {**universe(), "flat_tail": _flat_tail()}
+    expected, actual = run_both(backend, lambda: qa.score_panel(frames))
+    assert expected.shape == actual.shape
+    assert_allclose(actual.to_numpy(), expected.to_numpy(), equal_nan=True)
+
+def test_score_panel_matches_analyze_stock(backend):
+    # 점수 시계열의 각 날짜 = 그 날짜까지 잘라 돌린 analyze_stock 점수
+    df = _random()
+    for name in ("pandas", "numpy"):
+        backend(name)
+        scores = qa.score_panel({"A": df})["A"]
+        for end in (30, 60, 121, 200, len(df)):
+            assert scores.iloc[end - 1] == qa.analyze_stock(df.iloc[:end])["score"], (name, end)
+
+@pytest.mark.parametrize("name", ["pandas", "numpy"])
+def test_feature_context_shared_per_frame(backend, name):
+    # 같은 ctx로 두 프레임을 분석해도 각 프레임 단독 결과와 같고, 프레임 안의 원천 계산은 재사용
+    backend(name)
+    ctx = qa.FeatureContext()
+    first, second = _random(), _trending()
+    assert_metrics(qa.analyze_stock(first), qa.analyze_stock(first, ctx), name)
+    assert ctx.stats()["reused"] > 0
+    assert_metrics(qa.analyze_stock(second), qa.analyze_stock(second, ctx), name)
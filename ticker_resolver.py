@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import threading
+import yfinance as yf
+
+# KRX 종목코드 -> 시장(.KS/.KQ) 매핑 (로컬 캐시 + 주기적 갱신)
+LISTING_PATH = os.environ.get(
+    "KRX_LISTING_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "krx_listing.json"),
+)
+REFRESH_HOURS = 24
+SUFFIX = {"KOSPI": ".KS", "KOSDAQ": ".KQ"}
+
+_lock = threading.Lock()
+_listing = None      # {코드: {"name": 종목명, "market": "KOSPI"/"KOSDAQ"}}
+_loaded_at = 0.0
+
+def _download_listing():
+    """finance-datareader로 코스피/코스닥 상장 종목표 수집"""
+    import FinanceDataReader as fdr
+
+    listing = {}
+    for market in ("KOSPI", "KOSDAQ"):
+        df = fdr.StockListing(market)
+        code_col = "Code" if "Code" in df.columns else "Symbol"
+        for code, name in zip(df[code_col], df["Name"]):
+            listing[str(code).zfill(6)] = {"name": name, "market": market}
+    return listing
+
+def _save(listing, fetched_at):
+    os.makedirs(os.path.dirname(LISTING_PATH), exist_ok=True)
+    tmp = LISTING_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"fetched_at": fetched_at, "listing": listing}, f, ensure_ascii=False)
+    os.replace(tmp, LISTING_PATH)
+
+def get_listing(force_refresh=False):
+    """
+    상장 종목표 반환 (메모리 -> 로컬 파일 -> finance-datareader 순)
+    REFRESH_HOURS가 지나면 새로 받아 갱신, 실패 시 기존 캐시 유지
+    """
+    global _listing, _loaded_at
+    with _lock:
+        max_age = REFRESH_HOURS * 3600
+        if _listing is None and os.path.exists(LISTING_PATH):
+            try:
+                with open(LISTING_PATH, encoding="utf-8") as f:
+                    cached = json.load(f)
+                _listing, _loaded_at = cached["listing"], cached["fetched_at"]
+            except Exception as e:
+                print(f"⚠️ 종목표 캐시 읽기 실패: {e}")
+
+        if force_refresh or _listing is None or time.time() - _loaded_at > max_age:
+            try:
+                listing = _download_listing()
+                if listing:
+                    _listing, _loaded_at = listing, time.time()
+                    _save(_listing, _loaded_at)
+            except Exception as e:
+                print(f"⚠️ 종목표 갱신 실패 (기존 캐시 사용): {e}")
+                _loaded_at = time.time()  # 실패 시 매 호출마다 재시도하지 않도록
+        if _listing is None:
+            _listing = {}
+        return _listing
+
+def probe_ticker(code):
+    """
+    종목표에 없는 코드만 실시간 조회로 판별 (.KS -> .KQ 순)
+    """
+    for suffix in (".KS", ".KQ"):
+        ticker = f"{code}{suffix}"
+        try:
+            if yf.Ticker(ticker).fast_info.last_price:
+                return ticker
+        except: pass
+    return f"{code}.KS"
+
+def resolve_ticker(code, probe=True):
+    """종목코드 -> yfinance 티커 (종목표 O(1) 조회, 미등록 코드만 probe)"""
+    if not code or not str(code).isdigit():
+        return code
+    code = str(code).zfill(6)
+    entry = get_listing().get(code)
+    if entry:
+        return code + SUFFIX.get(entry["market"], ".KS")
+    if not probe:
+        return f"{code}.KS"
+    ticker = probe_ticker(code)
+    with _lock:
+        # 신규 상장 등 미등록 코드는 다음 갱신 전까지 메모리에 기억
+        _listing[code] = {"name": None, "market": "KOSDAQ" if ticker.endswith(".KQ") else "KOSPI"}
+    return ticker
+
+def resolve_tickers(codes, probe=True):
+    """여러 종목코드 일괄 변환: {코드: 티커}"""
+    return {code: resolve_ticker(code, probe=probe) for code in codes}
+
+if __name__ == "__main__":
+    # 스케줄 실행용: 종목표 강제 갱신
+    listing = get_listing(force_refresh=True)
+    print(f"📋 KRX 종목표 갱신 완료: {len(listing)}개")
@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import yfinance as yf
 import os
+import re
 import sys
 import logging
+import functools
+import threading
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
@@ -32,7 +36,8 @@ def safe_cache_resource(func):
         if get_script_run_ctx():
             return st.cache_resource(func)
     except: pass
-    return func
+    # 터미널 실행 시에도 프로세스당 1회만 생성
+    return functools.lru_cache(maxsize=None)(func)
 
 def safe_cache_data(**kwargs):
     def decorator(func):
@@ -66,26 +71,10 @@ def init_connection():
 # 한국 종목 티커 보정 (.KS / .KQ)
 def find_correct_ticker(code):
     """
-    코스피(.KS)인지 코스닥(.KQ)인지 판별
+    코스피(.KS)인지 코스닥(.KQ)인지 판별 (로컬 KRX 종목표 조회, 미등록 코드만 실시간 확인)
     """
-    if not code or not str(code).isdigit():
-        return code
-        
-    # 1. 코스피(.KS) 시도
-    ks_ticker = f"{code}.KS"
-    try:
-        if yf.Ticker(ks_ticker).fast_info.last_price:
-            return ks_ticker
-    except: pass
-    
-    # 2. 코스닥(.KQ) 시도
-    kq_ticker = f"{code}.KQ"
-    try:
-        if yf.Ticker(kq_ticker).fast_info.last_price:
-            return kq_ticker
-    except: pass
-    
-    return ks_ticker
+    from ticker_resolver import resolve_ticker
+    return resolve_ticker(code)
 
 # 기술적 지표 계산 (기본형 - app.py 호환 유지)
 def calculate_indicators(df):
@@ -101,20 +90,29 @@ def calculate_indicators(df):
     disparity = ((current_price - ma20.iloc[-1]) / ma20.iloc[-1]) * 100
     return rsi.iloc[-1], disparity
 
-# 주가 데이터 가져오기 (캐싱 적용)
+# 주가 이력 캐시 (float32 압축 형태로 보관 -> 캐시 적중 시 복사/역직렬화 비용 절반 이하)
 @safe_cache_data(ttl=600)
+def _cached_history(ticker, period):
+    from price_store import load_history
+    from compact_ohlcv import CompactOHLCV
+    # 로컬 저장소 경유 (마지막 저장일 이후 봉만 네트워크로 수집)
+    df = load_history(ticker, period=period)
+    if df is None or df.empty: return None
+    return CompactOHLCV.from_frame(df)
+
+# 주가 데이터 가져오기 (캐싱 적용)
 def fetch_stock_data(ticker, period="3mo"):
     if not ticker: return None
     try:
-        df = yf.download(ticker, period=period, progress=False)
-        if df.empty: return None
-        if isinstance(df.columns, pd.MultiIndex): df.columns = df.columns.get_level_values(0)
+        compact = _cached_history(ticker, period)
+        if compact is None or len(compact) == 0: return None
+        df = compact.to_frame()
 
-        current_price = df['Close'].iloc[-1]
+        current_price = float(df['Close'].iloc[-1])
         
         # 데이터가 2개 미만인 경우 (신규 상장 등) 예외 처리
         if len(df) >= 2:
-            prev_price = df['Close'].iloc[-2]
+            prev_price = float(df['Close'].iloc[-2])
             change_pct = ((current_price - prev_price) / prev_price) * 100
             rsi, disparity = calculate_indicators(df)
         else:
@@ -127,6 +125,141 @@ def fetch_stock_data(ticker, period="3mo"):
         }
     except: return None
 
+# 관심 종목 일괄 조회 (현황판용: 동시 수집 1회 + 스냅샷 지표, 캐싱 적용)
+@safe_cache_data(ttl=600, max_entries=32)
+def _cached_watchlist(tickers, period):
+    from price_store import load_histories
+    from metrics_snapshot import snapshot_metrics
+    from compact_ohlcv import CompactOHLCV
+
+    try:
+        frames, _ = load_histories(tickers, period=period)
+        snapshots = snapshot_metrics(frames, init_connection())
+    except Exception as e:
+        print(f"⚠️ 관심 종목 일괄 조회 실패: {e}")
+        return {}
+
+    result = {}
+    for ticker, snap in snapshots.items():
+        metrics = snap['metrics']
+        result[ticker] = {
+            "price": snap['price'], "change": snap['change'],
+            "rsi": metrics['rsi'], "disparity": metrics['disparity'],
+            "metrics": metrics, "history": CompactOHLCV.from_frame(frames[ticker])
+        }
+    return result
+
+def fetch_watchlist_data(tickers, period="1y"):
+    """
+    여러 종목 주가를 한 번에 수집하고 지표는 metrics_snapshot에서 읽음 (새 봉이 생긴 종목만 재계산)
+    반환: {티커: {"price", "change", "rsi", "disparity", "metrics"(analyze_stock 형태), "history"}}
+    - 캐시에는 압축 이력(CompactOHLCV)을 두고, 반환할 때만 DataFrame 보기로 변환
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    if not tickers: return {}
+    return {
+        ticker: {**data, "history": data["history"].to_frame()}
+        for ticker, data in _cached_watchlist(tickers, period).items()
+    }
+
+# 스캔 결과 일괄 반영 (keywords 테이블, keyword 기준 upsert)
+def bulk_sync_keywords(stock_list, supabase=None, update_ticker=False, demote_fixed=False):
+    """
+    스캔 결과를 중복 제거 후 일괄 upsert로 반영 (기존 상태 조회 1회 + 열 구성별 upsert 1회)
+    - update_ticker: 기존 행의 티커도 스캔 결과로 갱신
+    - demote_fixed: 기존/신규 행을 트렌드(is_fixed=False)로 지정 (아니면 신규 행 is_fixed는 DB 기본값)
+    반환: {"inserted": n, "reactivated": 비활성 -> 활성, "updated": 활성 행의 티커/고정 변경, "unchanged": n}
+    """
+    supabase = supabase or init_connection()
+    counts = {"inserted": 0, "reactivated": 0, "updated": 0, "unchanged": 0}
+    if not supabase: return counts
+
+    scanned = {}
+    for item in stock_list:
+        if item.get('keyword') and item['keyword'] not in scanned:
+            scanned[item['keyword']] = item.get('ticker')
+    if not scanned: return counts
+
+    res = supabase.table('keywords').select("keyword,ticker,is_active,is_fixed").in_('keyword', list(scanned)).execute()
+    existing = {row['keyword']: row for row in res.data or []}
+
+    rows = []
+    for keyword, ticker in scanned.items():
+        old = existing.get(keyword)
+        if old is None:
+            row = {"keyword": keyword, "ticker": ticker, "is_active": True}
+            if demote_fixed: row["is_fixed"] = False
+            rows.append(row)
+            counts["inserted"] += 1
+            continue
+        row = {
+            "keyword": keyword,
+            "ticker": ticker if update_ticker else old.get('ticker'),
+            "is_active": True,
+            "is_fixed": False if demote_fixed else old.get('is_fixed'),
+        }
+        if all(old.get(k) == v for k, v in row.items()):
+            counts["unchanged"] += 1
+        else:
+            rows.append(row)
+            counts["reactivated" if not old.get('is_active') else "updated"] += 1
+
+    # 한 요청 안의 행은 열 구성이 같아야 함 (빠진 열이 NULL로 채워지지 않도록 구성별로 전송)
+    batches = {}
+    for row in rows:
+        batches.setdefault(tuple(row), []).append(row)
+    for batch in batches.values():
+        supabase.table('keywords').upsert(batch, on_conflict='keyword').execute()
+    return counts
+
+# 활성 종목 목록 조회 (keywords 테이블)
+def get_active_targets(supabase=None):
+    supabase = supabase or init_connection()
+    if not supabase: return []
+    res = supabase.table('keywords').select("*").eq('is_active', True).execute()
+    return res.data or []
+
+# 여러 종목 주가 일괄 다운로드 (청크 단위 다중 티커 요청, 청크 안에서만 yfinance 스레드 병렬)
+_download_lock = threading.Lock()   # 다른 스레드(Streamlit 세션, asyncio.to_thread)의 동시 호출도 직렬화
+
+def fetch_bulk_history(tickers, period="1y", chunk_size=50, max_workers=4, start=None):
+    """
+    yf.download 다중 티커 호출로 여러 종목을 한 번에 수집
+    - start 지정 시 period 대신 해당 날짜 이후 데이터만 요청 (증분 수집용)
+    - 청크는 순서대로 요청 (yf.download는 모듈 전역 결과 버퍼를 매 호출마다 비우고 채우므로
+      동시에 부르면 청크끼리 결과가 섞이거나 사라짐), max_workers는 청크 안 yfinance 스레드 수
+    반환: ({티커: OHLCV DataFrame}, {티커: 실패 사유})
+    """
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    frames, failures = {}, {}
+    span = {"start": start} if start else {"period": period}
+
+    for chunk in chunks:
+        try:
+            with _download_lock:
+                data = yf.download(chunk, group_by='ticker', progress=False, threads=max(1, max_workers), **span)
+            error = None
+        except Exception as e:
+            data, error = None, str(e)
+        if error is not None or data is None or data.empty:
+            for t in chunk: failures[t] = error or "데이터 없음"
+            continue
+        for t in chunk:
+            if isinstance(data.columns, pd.MultiIndex):
+                if t not in data.columns.get_level_values(0):
+                    failures[t] = "데이터 없음"
+                    continue
+                df = data[t]
+            else:
+                df = data
+            df = df.dropna(subset=['Close'])
+            if df.empty:
+                failures[t] = "데이터 없음"
+            else:
+                frames[t] = df
+    return frames, failures
+
 # 링크 생성
 def get_links(keyword, ticker):
     news_url = f"https://search.naver.com/search.naver?where=news&query={keyword}&sm=tab_opt&sort=1"
@@ -138,3 +271,89 @@ def get_links(keyword, ticker):
         else:
             stock_url = f"https://finance.yahoo.com/quote/{ticker}"
     return stock_url, news_url
+
+# 차트 다운샘플링 (브라우저로 보내는 점 개수를 고정 예산으로 제한)
+CHART_POINTS = 200
+
+def downsample_series(series, max_points=CHART_POINTS, method="lttb"):
+    """
+    시계열을 max_points개 이하로 축소 (처음/끝 점은 항상 유지)
+    - lttb: Largest-Triangle-Three-Buckets (모양 보존)
+    - minmax: 구간별 최저/최고점 유지 (급등락 보존)
+    """
+    s = series.dropna()
+    n = len(s)
+    if n <= max_points or max_points < 3:
+        return s
+    y = s.to_numpy(dtype=float)
+
+    if method == "minmax":
+        buckets = np.array_split(np.arange(1, n - 1), max(1, (max_points - 2) // 2))
+        idx = {0, n - 1}
+        for b in buckets:
+            if len(b):
+                idx.update((b[np.argmin(y[b])], b[np.argmax(y[b])]))
+        return s.iloc[sorted(idx)]
+
+    every = (n - 2) / (max_points - 2)
+    idx = [0]
+    a = 0
+    for i in range(max_points - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # 다음 구간 평균점 (마지막 구간은 끝 점)
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if nlo >= nhi:
+            avg_x, avg_y = n - 1, y[-1]
+        else:
+            avg_x, avg_y = (nlo + nhi - 1) / 2, y[nlo:nhi].mean()
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx.append(a)
+    idx.append(n - 1)
+    return s.iloc[idx]
+
+# 관심 종목 목록 keyset 페이지네이션 (id 내림차순)
+def fetch_keywords_page(supabase, before_id=None, page_size=20, is_fixed=None, search=None, active_only=False):
+    """
+    before_id보다 작은 id부터 page_size개 조회 (OFFSET 없이 인덱스 범위 조회)
+    반환: (행 리스트, 다음 페이지 커서 또는 None)
+    """
+    q = supabase.table('keywords').select("*")
+    if is_fixed is not None: q = q.eq('is_fixed', is_fixed)
+    if active_only: q = q.eq('is_active', True)
+    if search:
+        # 검색어의 %, _는 와일드카드가 아닌 글자로 (LIKE 기본 이스케이프 문자 \)
+        pattern = re.sub(r"([\\%_])", r"\\\1", search)
+        q = q.ilike('keyword', f"%{pattern}%")
+    if before_id is not None: q = q.lt('id', before_id)
+    rows = q.order('id', desc=True).limit(page_size + 1).execute().data or []
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    return rows, (rows[-1]['id'] if has_more and rows else None)
+
+def paginated_keywords(supabase, key, page_size=20, is_fixed=None, search=None, active_only=False):
+    """
+    Streamlit용 페이지 상태 관리 + 이전/다음 버튼
+    (커서 스택을 session_state에 보관, 필터가 바뀌면 첫 페이지로)
+    반환: 현재 페이지 DataFrame
+    """
+    state_key = f"pager_{key}"
+    signature = (page_size, is_fixed, search, active_only)
+    state = st.session_state.get(state_key)
+    if not state or state["signature"] != signature:
+        state = {"signature": signature, "cursors": [None]}
+        st.session_state[state_key] = state
+
+    rows, next_cursor = fetch_keywords_page(supabase, state["cursors"][-1], page_size, is_fixed, search, active_only)
+
+    c1, c2, c3 = st.columns([1, 2, 1])
+    if c1.button("◀ 이전", key=f"{state_key}_prev", disabled=len(state["cursors"]) == 1):
+        state["cursors"].pop()
+        st.rerun()
+    c2.caption(f"{len(state['cursors'])} 페이지 · {len(rows)}개 표시")
+    if c3.button("다음 ▶", key=f"{state_key}_next", disabled=next_cursor is None):
+        state["cursors"].append(next_cursor)
+        st.rerun()
+    return pd.DataFrame(rows)
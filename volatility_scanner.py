@@ -1,12 +1,12 @@
 import os
-import requests
-import re
+import http_client
 import sys
 import pandas as pd
-from bs4 import BeautifulSoup
+from listing_parser import parse_naver_listing
 from dotenv import load_dotenv
-from supabase import create_client, Client
-import yfinance as yf
+from utils import init_connection, bulk_sync_keywords
+from ticker_resolver import resolve_ticker, SUFFIX
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # 윈도우 터미널 한글 깨짐 방지 (UTF-8 강제)
@@ -27,114 +27,112 @@ def find_correct_ticker(code):
     """
     코스피(.KS)인지 코스닥(.KQ)인지 판별
     """
-    print(f"  [Ticker Check] {code}...", end=" ", flush=True)
-    # 1. 코스피(.KS) 시도
-    ks_ticker = f"{code}.KS"
-    try:
-        if yf.Ticker(ks_ticker).fast_info.last_price:
-            print(f"-> [KOSPI] OK")
-            return ks_ticker
-    except: pass
-    
-    # 2. 코스닥(.KQ) 시도
-    kq_ticker = f"{code}.KQ"
-    try:
-        if yf.Ticker(kq_ticker).fast_info.last_price:
-            print(f"-> [KOSDAQ] OK")
-            return kq_ticker
-    except: pass
-    
-    print(f"-> [DEFAULT .KS]")
-    return ks_ticker
+    ticker = resolve_ticker(code)
+    print(f"  [Ticker Check] {code}... -> [{'KOSDAQ' if ticker.endswith('.KQ') else 'KOSPI'}] OK")
+    return ticker
+
+# 네이버 금융 시세 목록: (이름, URL, 시장별 페이지 여부(sosok), 등락률 순 정렬 여부)
+LISTINGS = {
+    "upper": ("상한가 종목", "https://finance.naver.com/sise/sise_upper.naver", False, True),
+    "rise": ("상승 종목", "https://finance.naver.com/sise/sise_rise.naver", True, True),
+    "fall": ("하락 종목", "https://finance.naver.com/sise/sise_fall.naver", True, True),
+    "volume": ("거래량 급증", "https://finance.naver.com/sise/sise_quant_high.naver", True, False),
+}
+MARKETS = {"0": "KOSPI", "1": "KOSDAQ"}   # sosok 파라미터
+MAX_PAGES = 20
+
+def _scan_listing(key, sosok, min_change, max_pages, pool, wave=4):
+    """
+    목록 하나(시장별)를 페이지 묶음(wave) 단위로 동시 수집
+    등락률 순 목록은 기준 미만 행이 나오면, 그 외는 빈/중복 페이지가 나오면 중단
+    """
+    title, url, per_market, ranked = LISTINGS[key]
+    default_market = MARKETS.get(sosok)
+    seen, found = set(), []
+
+    def fetch(page):
+        page_url = f"{url}?sosok={sosok}&page={page}" if per_market else url
+        res = http_client.get(page_url, timeout=10, conditional=True)
+        if res.status_code != 200:
+            raise RuntimeError(f"HTTP {res.status_code}")
+        return parse_naver_listing(res.text, default_market)
+
+    pages = max_pages if per_market else 1
+    for first in range(1, pages + 1, wave):
+        batch = list(range(first, min(first + wave, pages + 1)))
+        futures = [pool.submit(fetch, page) for page in batch]
+        done = False
+        for page, future in zip(batch, futures):
+            if done:
+                future.cancel()   # 중단 지점 이후 페이지는 버림
+                continue
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"  ERROR: [{title}] page {page}: {e}")
+                done = True
+                continue
+            new_rows = [r for r in rows if r.code not in seen]
+            # 마지막 페이지 이후에는 빈 페이지 또는 같은 페이지가 반복됨
+            done = not new_rows or (ranked and any(abs(r.change) < min_change for r in new_rows))
+            seen.update(r.code for r in new_rows)
+            found.extend((key, r) for r in new_rows if abs(r.change) >= min_change)
+        if done:
+            break
+    label = f"{title}/{default_market}" if default_market else title
+    print(f"  DONE: [{label}] {len(seen)} rows scanned, {len(found)} matched")
+    return found
 
-def get_volatility_stocks(min_change=5.0, limit=10):
+def scan_market_movers(min_change=5.0, listings=("upper", "rise", "fall", "volume"), max_pages=MAX_PAGES, max_workers=8):
+    """
+    코스피/코스닥 시세 목록 전체 페이지를 동시에 스캔
+    반환: 종목코드 기준 중복 제거 후 |등락률| 큰 순으로 정렬한 리스트
+          [{"keyword", "ticker", "change", "market", "sources"}]
+    """
+    streams = []
+    for key in listings:
+        per_market = LISTINGS[key][2]
+        streams.extend((key, sosok) for sosok in (MARKETS if per_market else [None]))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pages, ThreadPoolExecutor(max_workers=len(streams)) as outer:
+        results = list(outer.map(lambda s: _scan_listing(s[0], s[1], min_change, max_pages, pages), streams))
+
+    merged = {}
+    for key, row in (item for rows in results for item in rows):
+        entry = merged.get(row.code)
+        if entry is None:
+            merged[row.code] = entry = {"keyword": row.name, "code": row.code, "market": row.market, "change": row.change, "sources": []}
+        entry["market"] = entry["market"] or row.market
+        if abs(row.change) > abs(entry["change"]): entry["change"] = row.change
+        if key not in entry["sources"]: entry["sources"].append(key)
+
+    ranked = sorted(merged.values(), key=lambda e: (-abs(e["change"]), -len(e["sources"]), e["code"]))
+    for entry in ranked:
+        code, market = entry.pop("code"), entry["market"]
+        # 페이지 시장 구분으로 바로 결정, 구분이 없을 때만 종목표 조회
+        entry["ticker"] = code + SUFFIX[market] if market in SUFFIX else find_correct_ticker(code)
+    return ranked
+
+def get_volatility_stocks(min_change=5.0, limit=10, full_market=False):
     """
     네이버 금융 '등락률 상위' 페이지에서 변동성 큰 종목 수집
+    - 기본: 상한가/상승 종목 첫 페이지 (양 시장)
+    - full_market=True: 상승/상한가/하락/거래량 급증 전체 페이지
     """
     print(f"\n" + "="*50)
-    print(f"SCANNER: Market analysis started (Min Change: {min_change}%)")
+    print(f"SCANNER: Market analysis started (Min Change: {min_change}%, {'full market' if full_market else 'top pages'})")
     print("="*50)
-    
-    urls = [
-        ("상한가 종목", "https://finance.naver.com/sise/sise_upper.naver"),
-        ("상승 종목", "https://finance.naver.com/sise/sise_rise.naver"),
-    ]
-    
-    volatile_stocks = []
-    seen_codes = set()
-
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-
-    for title, url in urls:
-        print(f"\nPAGE: [{title}] Connecting to {url}")
-        try:
-            res = requests.get(url, headers=headers, timeout=10)
-            if res.status_code == 200:
-                print(f"  SUCCESS: Connected ({res.status_code})")
-            else:
-                print(f"  FAILED: Connection error ({res.status_code})")
-                continue
 
-            soup = BeautifulSoup(res.text, "html.parser")
-            rows = soup.select("table.type_2 tr")
-            print(f"  DATA: Found {len(rows)} rows.")
-            
-            row_count = 0
-            for row in rows:
-                title_tag = row.select_one("a.tltle")
-                if not title_tag:
-                    continue
-                
-                name = title_tag.get_text().strip()
-                href = title_tag['href']
-                code_match = re.search(r'code=(\d+)', href)
-                
-                if not code_match:
-                    continue
-                    
-                code = code_match.group(1)
-                if code in seen_codes:
-                    continue
-
-                # 등락률 추출
-                tds = row.find_all("td")
-                change_pct = 0.0
-                for td in tds:
-                    if '%' in td.get_text():
-                        try:
-                            change_text = td.get_text().strip().replace('%', '').replace('+', '').replace(',', '')
-                            change_pct = float(change_text)
-                            break
-                        except: pass
-                
-                # 필터링 로그
-                if change_pct >= min_change:
-                    print(f"  MATCH: {name} ({change_pct}%)")
-                    seen_codes.add(code)
-                    ticker = find_correct_ticker(code)
-                    volatile_stocks.append({
-                        "keyword": name,
-                        "ticker": ticker,
-                        "change": change_pct
-                    })
-                    row_count += 1
-                
-                if len(volatile_stocks) >= limit:
-                    print(f"  LIMIT: Reached target count ({limit})")
-                    break
-            
-            print(f"  DONE: [{title}] Analysis finished ({row_count} stocks found)")
-
-            if len(volatile_stocks) >= limit:
-                break
-                
-        except Exception as e:
-            print(f"  ERROR: {e}")
+    if full_market:
+        ranked = scan_market_movers(min_change)
+    else:
+        ranked = scan_market_movers(min_change, listings=("upper", "rise"), max_pages=1)
+    volatile_stocks = ranked[:limit] if limit else ranked
+    for stock in volatile_stocks:
+        print(f"  MATCH: {stock['keyword']} ({stock['change']}%) -> {stock['ticker']} [{', '.join(stock['sources'])}]")
 
     print("\n" + "-"*50)
-    print(f"SUMMARY: Found {len(volatile_stocks)} stocks total.")
+    print(f"SUMMARY: Found {len(volatile_stocks)} stocks total. ({len(ranked)} movers scanned)")
     print("-"*50 + "\n")
     return volatile_stocks
 
@@ -144,42 +142,18 @@ def update_database(stock_list):
         print("SKIP: Missing Supabase credentials.")
         return
 
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
     print(f"\nDB_SYNC: Updating {len(stock_list)} items...")
     
-    for item in stock_list:
-        keyword = item['keyword']
-        ticker = item['ticker']
-        
-        try:
-            # 1. 이미 존재하는지 확인
-            res = supabase.table('keywords').select("*").eq('keyword', keyword).execute()
-            
-            if res.data:
-                # 존재하면 활성화 및 업데이트 (변동성 종목은 is_fixed를 False로 유지)
-                existing_id = res.data[0]['id']
-                supabase.table('keywords').update({
-                    'is_active': True,
-                    'is_fixed': False,
-                    'ticker': ticker # 티커 업데이트
-                }).eq('id', existing_id).execute()
-                print(f"  UDPATE: '{keyword}'")
-            else:
-                # 없으면 신규 등록
-                supabase.table('keywords').insert({
-                    "keyword": keyword,
-                    "ticker": ticker, 
-                    "is_active": True,
-                    "is_fixed": False
-                }).execute()
-                print(f"  NEW: '{keyword}' ({ticker})")
-                
-        except Exception as e:
-            print(f"  ERR: DB Error ({keyword}): {e}")
+    try:
+        # 존재하면 활성화 및 티커 업데이트 (변동성 종목은 is_fixed를 False로 유지), 없으면 신규 등록
+        counts = bulk_sync_keywords(stock_list, init_connection(), update_ticker=True, demote_fixed=True)
+        print(f"  NEW: {counts['inserted']} | REACTIVATED: {counts['reactivated']} | UPDATE: {counts['updated']} | UNCHANGED: {counts['unchanged']}")
+    except Exception as e:
+        print(f"  ERR: DB Error: {e}")
 
 if __name__ == "__main__":
-    # 등락률 5.0% 이상인 종목 최대 15개 추출
-    hot_stocks = get_volatility_stocks(min_change=5.0, limit=15)
+    # 등락률 5.0% 이상인 종목 최대 15개 추출 (--full: 전체 시장 스캔)
+    hot_stocks = get_volatility_stocks(min_change=5.0, limit=15, full_market="--full" in sys.argv)
     
     if hot_stocks:
         update_database(hot_stocks)